@@ -1,16 +1,17 @@
 import os
 import sys
+import time
+import asyncio
 import base64
-import subprocess
 import json
-import shutil
-from io import BytesIO
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager, nullcontext
+from typing import Optional, Dict, Any, Awaitable, BinaryIO, Callable, List, Tuple, Union
 import logging
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.logging import RichHandler
@@ -24,14 +25,41 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 # Import enhanced modules
-from backend.latex_resume_generator.agents.resume_parser import ResumeParser
-from backend.latex_resume_generator.agents.resume_enhancer import ResumeEnhancer
+from backend.latex_resume_generator.agents.registry import AgentRegistry
 from backend.latex_resume_generator.agents.enhanced_markdown_generator import EnhancedMarkdownGenerator
-from backend.latex_resume_generator.agents.enhanced_latex_generator import EnhancedLaTeXGenerator
-from backend.latex_resume_generator.utils.pdf_reader import extract_text_from_pdf
+from backend.latex_resume_generator.agents.local_resume_parser import LocalResumeParser
+from backend.latex_resume_generator.utils.pdf_reader import (
+    PDFExtractionError, PDFPageLimitError, PDFTooLargeError, get_pdf_extractor,
+)
+from backend.latex_resume_generator.utils.latex_compiler import compile_latex_to_pdf_async
+from backend.latex_resume_generator.utils.latex_lint import lint_latex, template_commands
+from backend.latex_resume_generator.utils.tex_formats import FormatCache
+from backend.latex_resume_generator.utils.tex_pool import PoolSaturated, TexWorkerPool
+from backend.latex_resume_generator.utils.latex_repair import CompileRepairer, LatexBuildError, TexError, parse_tex_log
+from backend.latex_resume_generator.utils.concurrency import run_blocking, stage_slot
+from backend.latex_resume_generator.utils.build_workspace import BuildWorkspaceManager
+from backend.latex_resume_generator.utils.artifact_store import ArtifactStore
+from backend.latex_resume_generator.utils.job_queue import Job, JobQueue
+from backend.latex_resume_generator.utils.compile_cache import CompileCache, compile_cache_key
+from backend.latex_resume_generator.utils.llm_cache import configure_llm_cache, discard_replies_on_error, llm_cache_scope
+from backend.latex_resume_generator.utils.parse_cache import ParseCache, parse_cache_key
+from backend.latex_resume_generator.utils.session_store import LatexBuild, SessionStore
+from backend.latex_resume_generator.utils.single_flight import SingleFlight, canonical_json, request_key
+from backend.latex_resume_generator.utils.metrics import (
+    REGISTRY as metrics_registry, REQUEST_SECONDS, record_timing, request_timings, server_timing, timed, timed_stage,
+)
+from backend.latex_resume_generator.utils.incremental import (
+    BASIC_SECTIONS, changed_sections, section_hashes, splice_plan, splice_sections,
+)
+from backend.latex_resume_generator.utils.template_registry import TemplateError, TemplateInfo, TemplateRegistry
+from backend.latex_resume_generator.utils.sse import SSE_HEADERS, sse_event
+from backend.latex_resume_generator.utils.latex_renderer import LaTeXRenderer, RenderError
 from backend.latex_resume_generator.schemas.resume_schema import ResumeSchema
 from backend.latex_resume_generator.schemas.enhanced_resume_schema import EnhancedResumeSchema
 
+# Load .env once so every setting below sees it
+load_dotenv()
+
 # --- Rich Console and Logging Setup ---
 console = Console()
 logging.basicConfig(
@@ -44,32 +72,118 @@ logger = logging.getLogger("rich")
 
 console.print(Panel.fit("[bold green]Enhanced Resume Generator API Started[/]", border_style="blue"))
 
-# --- Helper Function for PDF Compilation ---
-def compile_latex_to_pdf(latex_file_path: str, output_dir: str, engine: str = "pdflatex"):
-    """Compiles a .tex file to a .pdf using a specified engine."""
-    try:
-        # Run the specified engine twice to resolve references
-        for _ in range(2):
-            command = [
-                "env", "-i", "PATH=/usr/bin:/bin:/usr/local/bin", 
-                f"/usr/bin/{engine}", "-output-directory", output_dir, 
-                "-interaction=nonstopmode", latex_file_path
-            ]
-            process = subprocess.run(command, check=True, capture_output=True, text=True, timeout=30)
-        return True, process.stdout
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
-        log = getattr(e, 'stdout', '') + "\n" + getattr(e, 'stderr', '')
-        if isinstance(e, FileNotFoundError):
-            log = f"{engine} command not found. Please install a LaTeX distribution (e.g., TeX Live)."
-        # Check if PDF was created despite errors
-        if isinstance(e, subprocess.CalledProcessError) and e.returncode == 1:
-            pdf_path = os.path.join(output_dir, os.path.splitext(os.path.basename(latex_file_path))[0] + ".pdf")
-            if os.path.exists(pdf_path):
-                return True, log
-        return False, log
+# --- Build Workspaces ---
+# Every compile gets its own scratch directory (on tmpfs when available)
+workspace_manager = BuildWorkspaceManager.from_env()
+
+# --- Compile Cache ---
+# Identical LaTeX + template assets + engine always yields the same PDF
+compile_cache = CompileCache.from_env()
+
+# --- TeX Formats ---
+# Template preambles precompiled into .fmt files, so compiles only process the body
+format_cache = FormatCache.from_env()
+
+# --- TeX Worker Pool ---
+# Engine processes started ahead of time and run under resource limits; compiles queue for a free one
+compile_pool = TexWorkerPool.from_env()
+
+# --- Artifact Store ---
+# Generated PDFs are served from disk by id instead of being embedded in responses
+artifact_store = ArtifactStore.from_env()
+
+# --- LLM Response Cache ---
+# Installed as the global langchain cache, so every agent's model calls go through it
+llm_cache = configure_llm_cache()
+
+# --- Local Resume Parser ---
+# Well-structured resumes are parsed with headings and regexes; only unresolved sections reach the LLM
+local_parser = LocalResumeParser.from_env()
+
+# --- Parse Result Cache ---
+# Re-uploads of the same PDF reuse the parsed (and enhanced) data instead of calling the LLM again
+parse_cache = ParseCache.from_env()
+
+# --- Compile Repair ---
+# Failed builds are patched by the LLM around the reported errors, within a budget
+repairer = CompileRepairer.from_env()
+
+# --- Request Coalescing ---
+# Identical requests that overlap (double submits, several tabs) share one pipeline run
+inflight = SingleFlight.from_env()
+
+# --- Builder Sessions ---
+# Remember each session's last enhancement and LaTeX so edits only regenerate the sections they touch
+sessions = SessionStore.from_env()
+
+# --- Application Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Templates are scanned once; files are re-read only when they change on disk
+    app.state.templates = TemplateRegistry.from_env()
+    # Templates with a Jinja renderer can be turned into LaTeX without the LLM
+    app.state.renderer = LaTeXRenderer(app.state.templates)
+    # Agents (and their model clients and prompts) are built once and shared by all requests
+    app.state.agents = AgentRegistry.from_env(template_registry=app.state.templates)
+    # Template preambles are dumped into TeX formats in the background so compiles skip package loading
+    if format_cache:
+        format_cache.warm(app.state.templates.list(), app.state.renderer)
+    if compile_pool:
+        await compile_pool.start(template.engine for template in app.state.templates.list())
+        if format_cache:
+            # Formats linked into waiting workers stay on disk until those workers move on
+            format_cache.in_use = compile_pool.formats_in_use
+    if app.state.agents is None:
+        logger.warning("API_KEY not found; generation endpoints will fail until it is configured.")
+    # Background jobs run the full pipeline on a local worker pool
+    app.state.jobs = JobQueue.from_env()
+    app.state.jobs.register("pipeline", run_pipeline_job)
+    await app.state.jobs.start()
+    yield
+    await app.state.jobs.stop()
+    if compile_pool:
+        await compile_pool.stop()
+    get_pdf_extractor().shutdown()
+
+
+def get_agents() -> AgentRegistry:
+    agents = getattr(app.state, "agents", None)
+    if agents is None:
+        logger.error("API_KEY not found on server.")
+        raise HTTPException(status_code=500, detail="API_KEY not found on server.")
+    return agents
+
+
+def get_templates() -> TemplateRegistry:
+    templates = getattr(app.state, "templates", None)
+    if templates is None:
+        templates = app.state.templates = TemplateRegistry.from_env()
+    return templates
+
+
+def get_jobs() -> JobQueue:
+    jobs = getattr(app.state, "jobs", None)
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="Job queue is not running.")
+    return jobs
+
+
+def get_renderer() -> LaTeXRenderer:
+    renderer = getattr(app.state, "renderer", None)
+    if renderer is None:
+        renderer = app.state.renderer = LaTeXRenderer(get_templates())
+    return renderer
+
+RENDER_MODES = ("deterministic", "llm")
+RESPONSE_FORMATS = ("artifact", "base64")
+PARSE_MODES = ("auto", "llm")
+# Upper bound on templates generated concurrently by one /api/generate-batch request
+BATCH_MAX_WORKERS = max(1, int(os.getenv("BATCH_MAX_WORKERS", "4")))
+# Refuse to compile documents the linter finds structurally broken
+LATEX_LINT_STRICT = os.getenv("LATEX_LINT_STRICT", "true").lower() == "true"
 
 # --- FastAPI App Initialization ---
-app = FastAPI(title="Enhanced Resume Generator API")
+app = FastAPI(title="Enhanced Resume Generator API", lifespan=lifespan)
 
 # --- CORS Configuration ---
 app.add_middleware(
@@ -78,8 +192,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Parse-Cache", "X-Parse-Cache-Reused", "X-Parse-Source", "X-Parse-Confidence", "X-Regenerated-Sections",
+                    "X-Latex-Repairs", "X-Latex-Passes", "X-Coalesced", "Server-Timing"],
 )
 
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """Adds a Server-Timing header with the stages run for the request and records its latency."""
+    started = time.perf_counter()
+    with request_timings() as timings:
+        response = await call_next(request)
+    total = time.perf_counter() - started
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(total, request.method, getattr(route, "path", "unmatched"), response.status_code)
+    response.headers["Server-Timing"] = server_timing(timings, total)
+    return response
+
 # --- Pydantic Models ---
 class EnhancedGenerationResponse(BaseModel):
     original_json: str
@@ -91,45 +220,474 @@ class EnhancedFinalGenerationResponse(BaseModel):
     pdf_b64: str
     enhanced_data: Dict[str, Any]
 
+class ArtifactGenerationResponse(BaseModel):
+    artifact_id: str
+    pdf_url: str
+    latex_url: str
+    pdf_size_bytes: int
+    template_name: str
+
+# --- Pipeline Steps ---
+# Shared by the JSON endpoints and their streaming variants
+
+def resolve_template(template_name: str) -> TemplateInfo:
+    try:
+        return get_templates().get(template_name)
+    except TemplateError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def pdf_http_error(e: PDFExtractionError) -> HTTPException:
+    logger.error(str(e))
+    status_code = 413 if isinstance(e, (PDFTooLargeError, PDFPageLimitError)) else 400
+    return HTTPException(status_code=status_code, detail=str(e))
+
+
+@timed_stage("extract")
+async def extract_resume_text(contents: Union[bytes, BinaryIO]) -> str:
+    try:
+        result = await run_blocking("extract", get_pdf_extractor().extract, contents)
+    except PDFExtractionError as e:
+        raise pdf_http_error(e)
+    if result.cached:
+        logger.info(f"PDF text served from cache ({result.page_count} pages).")
+    pdf_text = result.text
+    if not pdf_text.strip():
+        logger.error("Could not extract text from PDF.")
+        raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
+    return pdf_text
+
+
+@timed_stage("parse")
+async def parse_resume_text(pdf_text: str, parse_mode: str = "auto") -> Tuple[Dict[str, Any], str, Optional[float]]:
+    """
+    Turns extracted resume text into ResumeSchema data, locally first in auto
+    mode (see LocalResumeParser.aparse_resume). Returns the data, its source
+    (local, hybrid or llm) and the local parser's confidence.
+    """
+    return await local_parser.aparse_resume(pdf_text, lambda: get_agents().parser, parse_mode)
+
+
+async def spool_upload(file: UploadFile) -> Tuple[BinaryIO, str]:
+    """
+    Copies an uploaded PDF into a temporary file of our own and returns it with
+    its SHA-256, enforcing PDF_MAX_MB while copying. The request's UploadFile is
+    closed when the request ends, which can be before the work reading it is
+    done (a coalesced run other requests still wait on, or a stream).
+    """
+    try:
+        return await run_blocking("extract", get_pdf_extractor().spool, file.file)
+    except PDFExtractionError as e:
+        raise pdf_http_error(e)
+
+
+def lookup_parse_cache(digest: str, parse_mode: str, use_cache: bool) -> Tuple[Optional[str], Optional[Dict[str, Any]], str]:
+    """
+    Looks an upload's digest up in the parse cache under the requested parse
+    mode. Returns the cache key, the cached entry (or None) and the status
+    reported in X-Parse-Cache: hit, miss, bypass (use_llm_cache=false) or
+    disabled.
+    """
+    if parse_cache is None:
+        return None, None, "disabled"
+    upload_key = parse_cache_key(digest, parse_mode)
+    if not use_cache:
+        return upload_key, None, "bypass"
+    entry = parse_cache.get(upload_key)
+    return upload_key, entry, "hit" if entry else "miss"
+
+
+async def coalesce(key: str, response: Response, run: Callable[[Response], Awaitable[Any]]) -> Any:
+    """
+    Runs an endpoint body once for all concurrent requests with the same key.
+    The body sets its headers on a response of its own; they are copied to
+    every caller's response, and X-Coalesced tells whether the caller joined a
+    run already in flight. The run's stage timings go into every caller's
+    Server-Timing header.
+    """
+    if inflight is None:
+        return await run(response)
+
+    async def execute() -> Tuple[Any, Dict[str, str], List[Tuple[str, float]]]:
+        headers = Response()
+        with request_timings() as timings:
+            result = await run(headers)
+        return result, {name: value for name, value in headers.headers.items() if name.startswith("x-")}, timings
+
+    (result, headers, timings), shared = await inflight.do(key, execute)
+    if shared:
+        logger.info("Joined an identical request already in flight.")
+    for name, seconds in timings:
+        record_timing(name, seconds)
+    response.headers.update(headers)
+    response.headers["X-Coalesced"] = "true" if shared else "false"
+    return result
+
+
+def check_session_id(session_id: Optional[str]) -> None:
+    if session_id is not None and not SessionStore.valid_id(session_id):
+        raise HTTPException(status_code=400, detail="session_id must be 8-128 letters, digits, '-' or '_'.")
+
+
+@timed_stage("enhance")
+async def enhance_resume(parsed_data: Dict[str, Any], session_id: Optional[str] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Enhances resume data. Within a session only the sections that changed since
+    the session's last enhancement are sent to the enhancer; the rest are reused.
+    Returns the enhanced data and the regenerated sections (["all"] for a full run).
+    """
+    agents = get_agents()
+    session = sessions.get(session_id) if session_id else None
+    if session and session.enhanced_data:
+        changed = changed_sections(session.basic_hashes, section_hashes(parsed_data, BASIC_SECTIONS))
+        if not changed:
+            logger.info("✅ Resume unchanged since the last enhancement in this session, reusing it.")
+            return session.enhanced_data, []
+        async with stage_slot("llm_enhance"):
+            partial = await agents.enhancement.aenhance_sections(parsed_data, changed)
+        try:
+            merged = EnhancedResumeSchema.model_validate({**session.enhanced_data, **partial}).model_dump()
+            logger.info(f"✅ Re-enhanced {', '.join(changed)}; reused the other sections.")
+            return merged, changed
+        except ValidationError as e:
+            logger.warning(f"Merging the partial enhancement failed, enhancing the whole resume: {e}")
+
+    async with stage_slot("llm_enhance"):
+        enhanced_data = await agents.enhancement.aenhance(parsed_data)
+    return enhanced_data, ["all"]
+
+
+def render_latex_locally(template_name: str, enhanced_data: Dict[str, Any]) -> Optional[str]:
+    """Renders LaTeX without the LLM, or returns None when the LLM has to be used instead."""
+    renderer = get_renderer()
+    if not renderer.supports(template_name):
+        logger.warning(f"Template '{template_name}' has no deterministic renderer, falling back to the LLM.")
+        return None
+    try:
+        full_latex = renderer.render(template_name, enhanced_data)
+    except RenderError as e:
+        logger.warning(f"Deterministic rendering failed, falling back to the LLM: {e}")
+        return None
+    logger.info("✅ LaTeX rendered deterministically, skipping the LLM.")
+    return full_latex
+
+
+@timed_stage("latex")
+async def generate_latex(
+    template_name: str,
+    markdown_str: str,
+    enhanced_data: Dict[str, Any],
+    style_prefs: Optional[Dict[str, Any]],
+    render_mode: str,
+) -> str:
+    """Produces the LaTeX document for a template, locally when possible and requested."""
+    full_latex = None
+    if render_mode == "deterministic":
+        full_latex = render_latex_locally(template_name, enhanced_data)
+
+    if full_latex is None:
+        agents = get_agents()
+        async with stage_slot("llm_latex"):
+            full_latex = await agents.latex_generator.agenerate(
+                markdown_content=markdown_str, 
+                style_preferences=style_prefs, 
+                template_name=template_name
+            )
+        logger.info("✅ LaTeX generation complete.")
+    return full_latex
+
+
+def style_key(style_prefs: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(style_prefs or {}, sort_keys=True)
+
+
+async def generate_session_latex(
+    session_id: str,
+    template_name: str,
+    markdown_str: str,
+    enhanced_data: Dict[str, Any],
+    style_prefs: Optional[Dict[str, Any]],
+    render_mode: str,
+) -> Tuple[str, List[str]]:
+    """
+    Like generate_latex, but reuses the session's previous LLM-generated document
+    for this template: only the sections whose data changed are regenerated, each
+    with its own prompt, and spliced into the previous LaTeX. Returns the LaTeX
+    and the regenerated sections ([] when nothing changed, ["all"] for a full run).
+    """
+    session = sessions.get(session_id)
+    build = session.builds.get(template_name) if session else None
+    if render_mode == "llm" and build and build.render_mode == "llm" and build.style_key == style_key(style_prefs):
+        changed = changed_sections(build.section_hashes, section_hashes(enhanced_data))
+        if not changed:
+            logger.info("✅ Resume unchanged since the last build in this session, reusing its LaTeX.")
+            return build.latex, []
+        plan = splice_plan(build.latex, changed)
+        if plan is not None:
+            agents = get_agents()
+
+            async def regenerate(name: str) -> str:
+                start, stop = plan[name]
+                async with stage_slot("llm_latex"):
+                    return await agents.latex_generator.agenerate_section(
+                        name, enhanced_data.get(name), build.latex[start:stop], template_name, style_prefs
+                    )
+
+            with timed("latex"):
+                fragments = await asyncio.gather(*(regenerate(name) for name in changed))
+            logger.info(f"✅ Regenerated LaTeX for {', '.join(changed)}; reused the other sections.")
+            return splice_sections(build.latex, {plan[name]: fragment for name, fragment in zip(changed, fragments)}), changed
+        logger.info("Changed sections cannot be spliced into the previous LaTeX, regenerating the whole document.")
+
+    full_latex = await generate_latex(template_name, markdown_str, enhanced_data, style_prefs, render_mode)
+    return full_latex, ["all"]
+
+
+def prepare_latex(full_latex: str, template: TemplateInfo) -> str:
+    """
+    Lints a document before it reaches the TeX engine: stray special characters
+    are escaped in place, and structurally broken documents are rejected in
+    milliseconds instead of failing two engine passes.
+    """
+    with timed("lint"):
+        result = lint_latex(full_latex, template_commands(template))
+    if result.fixes:
+        logger.info(f"✅ LaTeX lint applied {result.fixes} fix(es) before compiling.")
+    for issue in result.issues:
+        if not issue.fixed:
+            logger.warning(f"LaTeX lint {issue.severity} at line {issue.line}: {issue.message}")
+    if result.errors and LATEX_LINT_STRICT:
+        detail = {
+            "message": "Generated LaTeX failed validation.",
+            "issues": [issue.model_dump() for issue in result.errors],
+            "latex_code": result.latex,
+        }
+        raise HTTPException(status_code=500, detail=detail)
+    return result.latex
+
+
+@timed_stage("compile")
+async def compile_pdf(full_latex: str, template: TemplateInfo, status=None) -> Tuple[bytes, int]:
+    """
+    Returns the PDF for a LaTeX document, from the compile cache or a fresh
+    build, and how many engine passes that took (0 for a cache hit).
+    """
+    cache_key = compile_cache_key(full_latex, template.directory, template.engine) if compile_cache else None
+    pdf_bytes = compile_cache.get(cache_key) if cache_key else None
+    if pdf_bytes is not None:
+        logger.info("✅ Compile cache hit, skipping PDF compilation.")
+        return pdf_bytes, 0
+
+    if status:
+        status.update("[yellow]Step 2: Preparing build workspace...")
+    logger.info("Step 2: Preparing build workspace...")
+    with workspace_manager.workspace(template.name, template.directory) as workspace:
+        logger.info(f"✅ Build workspace prepared at {workspace.path}.")
+
+        if status:
+            status.update(f"[yellow]Step 3: Compiling PDF using '{template.engine}'...")
+        logger.info(f"Step 3: Compiling PDF using '{template.engine}'...")
+        compiler = compile_pool.compile if compile_pool else compile_latex_to_pdf_async
+        # The worker pool queues compiles itself; without it the compile stage limit applies
+        try:
+            async with nullcontext() if compile_pool else stage_slot("compile"):
+                if format_cache:
+                    success, log, passes = await format_cache.compile(
+                        workspace, full_latex, template.directory, template.engine, compiler
+                    )
+                else:
+                    temp_latex_path = workspace.write_tex(full_latex)
+                    success, log, passes = await compiler(temp_latex_path, workspace.path, template.engine)
+        except PoolSaturated as e:
+            logger.warning(f"Compile rejected: {e}")
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        
+        pdf_path = workspace.pdf_path
+        
+        if not success or not os.path.exists(pdf_path):
+            error_detail = {"message": "Failed to compile LaTeX to PDF.", "log": log, "latex_code": full_latex}
+            logger.error(f"LaTeX Compilation Error: {log}")
+            raise HTTPException(status_code=500, detail=error_detail)
+        
+        with open(pdf_path, "rb") as pdf_file:
+            pdf_bytes = pdf_file.read()
+        logger.info(f"✅ PDF compilation successful after {passes} pass(es).")
+
+    if cache_key:
+        compile_cache.put(cache_key, pdf_bytes)
+    return pdf_bytes, passes
+
+
+async def build_pdf(full_latex: str, template: TemplateInfo, status=None) -> Tuple[str, bytes, int, int]:
+    """
+    Lints and compiles a document. When the build fails, the errors are parsed
+    from the linter or TeX log and the lines around them are sent to the LLM for
+    a targeted fix, then the document is rebuilt, within the repair budget.
+    Returns the compiled LaTeX, the PDF, the number of repair rounds and the
+    engine passes of the successful compile.
+    """
+    passes = 0
+
+    async def attempt(latex: str) -> Tuple[str, bytes]:
+        nonlocal passes
+        try:
+            latex = prepare_latex(latex, template)
+            pdf_bytes, passes = await compile_pdf(latex, template, status)
+            return latex, pdf_bytes
+        except HTTPException as e:
+            if not isinstance(e.detail, dict):
+                raise
+            if "issues" in e.detail:
+                errors = [TexError(line=issue["line"], message=issue["message"]) for issue in e.detail["issues"]]
+            else:
+                errors = parse_tex_log(e.detail.get("log", ""))
+            raise LatexBuildError(errors, {**e.detail, "errors": [error.model_dump() for error in errors]})
+
+    agents = getattr(app.state, "agents", None)
+
+    async def repair(region: str, errors: List[TexError]) -> str:
+        if status:
+            status.update("[yellow]Repairing LaTeX compile errors...")
+        async with stage_slot("llm_latex"):
+            return await agents.latex_generator.arepair(region, [error.model_dump() for error in errors], template.name)
+
+    try:
+        latex, pdf_bytes, repairs = await repairer.run(full_latex, attempt, repair if agents else None)
+    except LatexBuildError as e:
+        logger.error(f"LaTeX build failed after {e.detail.get('repair_attempts', 0)} repair(s): {e}")
+        raise HTTPException(status_code=500, detail=e.detail)
+    if repairs:
+        logger.info(f"✅ LaTeX compiled after {repairs} repair round(s).")
+    return latex, pdf_bytes, repairs, passes
+
+
+def build_final_response(
+    full_latex: str,
+    pdf_bytes: bytes,
+    enhanced_data: Dict[str, Any],
+    template_name: str,
+    response_format: str,
+) -> Union[ArtifactGenerationResponse, EnhancedFinalGenerationResponse]:
+    """Stores the PDF as an artifact, or embeds it as base64 for older clients."""
+    if response_format == "base64":
+        logger.info("Step 4: Encoding PDF...")
+        with timed("base64"):
+            pdf_b64 = base64.b64encode(pdf_bytes).decode('utf-8')
+        return EnhancedFinalGenerationResponse(
+            latex_str=full_latex,
+            pdf_b64=pdf_b64,
+            enhanced_data=enhanced_data
+        )
+    logger.info("Step 4: Storing PDF artifact...")
+    with timed("store"):
+        artifact_id = artifact_store.put(pdf_bytes, full_latex)
+    logger.info(f"✅ PDF stored as artifact {artifact_id}.")
+    return ArtifactGenerationResponse(
+        artifact_id=artifact_id,
+        pdf_url=f"/api/artifacts/{artifact_id}.pdf",
+        latex_url=f"/api/artifacts/{artifact_id}.tex",
+        pdf_size_bytes=len(pdf_bytes),
+        template_name=template_name,
+    )
+
+
+def check_mode(name: str, value: str, allowed=RENDER_MODES) -> None:
+    if value not in allowed:
+        raise HTTPException(status_code=400, detail=f"{name} must be one of: {', '.join(allowed)}")
+
 # --- API Endpoints ---
 
 @app.post("/api/parse-and-enhance", response_model=EnhancedGenerationResponse)
 async def parse_and_enhance_resume(
+    response: Response,
     file: Optional[UploadFile] = File(None),
     resume_data_json: Optional[str] = Form(None),
-    enhance: bool = Form(True)
+    enhance: bool = Form(True),
+    use_llm_cache: bool = Form(True),
+    markdown_mode: str = Form("deterministic"),
+    parse_mode: str = Form("auto"),
+    session_id: Optional[str] = Form(None)
 ):
     """
     Parses a resume from PDF or JSON and optionally enhances it with AI.
+    Markdown is rendered locally by default; markdown_mode=llm asks the model instead.
+    PDFs are parsed locally when the text is well structured (parse_mode=auto);
+    X-Parse-Source and X-Parse-Confidence report how the data was obtained.
+    Results for an uploaded PDF are cached by its hash; the X-Parse-Cache header
+    reports hit/miss and X-Parse-Cache-Reused lists the stages served from cache.
+    With a session_id only the sections edited since the session's previous
+    enhancement are re-enhanced; X-Regenerated-Sections lists them.
+    Identical requests arriving while one is running share its result.
+    """
+    check_mode("markdown_mode", markdown_mode)
+    check_mode("parse_mode", parse_mode, PARSE_MODES)
+    check_session_id(session_id)
+    # The shared run reads our own copy of the upload, which outlives this request
+    upload, upload_digest = await spool_upload(file) if file else (None, None)
+    key = request_key(
+        "parse-and-enhance", upload=upload_digest, resume_data=canonical_json(resume_data_json), enhance=enhance,
+        use_llm_cache=use_llm_cache, markdown_mode=markdown_mode, parse_mode=parse_mode, session_id=session_id,
+    )
+    result = await coalesce(key, response, lambda headers: run_parse_and_enhance(
+        headers, upload, upload_digest, resume_data_json, enhance, use_llm_cache, markdown_mode, parse_mode, session_id
+    ))
+    if upload is not None and response.headers.get("X-Coalesced") == "true":
+        # Joined another request's run, so ours never used its copy
+        upload.close()
+    return result
+
+
+async def run_parse_and_enhance(
+    response: Response,
+    upload: Optional[BinaryIO],
+    upload_digest: Optional[str],
+    resume_data_json: Optional[str],
+    enhance: bool,
+    use_llm_cache: bool,
+    markdown_mode: str,
+    parse_mode: str,
+    session_id: Optional[str],
+) -> EnhancedGenerationResponse:
     """
-    with console.status("[bold yellow]Processing /api/parse-and-enhance...") as status:
+    Body of /api/parse-and-enhance; headers are set on the given response.
+    Closes the spooled upload when done.
+    """
+    upload_key: Optional[str] = None
+    cached: Optional[Dict[str, Any]] = None
+    reused: List[str] = []
+    with console.status("[bold yellow]Processing /api/parse-and-enhance...") as status, llm_cache_scope(use_llm_cache):
         try:
             # --- Logging Request Details ---
             request_panel = Panel(
-                f"[bold]Source:[/bold] {'PDF Upload' if file else 'JSON Data'}\n"
-                f"[bold]Enhance Mode:[/bold] {enhance}",
+                f"[bold]Source:[/bold] {'PDF Upload' if upload is not None else 'JSON Data'}\n"
+                f"[bold]Enhance Mode:[/bold] {enhance}\n"
+                f"[bold]Markdown Mode:[/bold] {markdown_mode}\n"
+                f"[bold]Parse Mode:[/bold] {parse_mode}",
                 title="[cyan]Incoming Request: /api/parse-and-enhance[/cyan]",
                 border_style="cyan"
             )
             console.print(request_panel)
             
-            status.update("[yellow]Loading environment variables...")
-            load_dotenv()
-            api_key = os.getenv("API_KEY")
-            if not api_key:
-                logger.error("API_KEY not found on server.")
-                raise HTTPException(status_code=500, detail="API_KEY not found on server.")
-            
             status.update("[yellow]Parsing resume data...")
             logger.info("Step 1: Parsing resume data...")
-            if file:
-                contents = await file.read()
-                pdf_text = extract_text_from_pdf(BytesIO(contents))
-                if not pdf_text.strip():
-                    logger.error("Could not extract text from PDF.")
-                    raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
-                parser = ResumeParser(api_key=api_key)
-                parsed_data = parser.parse(pdf_text)
+            if upload is not None:
+                upload_key, cached, cache_status = lookup_parse_cache(upload_digest, parse_mode, use_llm_cache)
+                response.headers["X-Parse-Cache"] = cache_status
+                if cached:
+                    parsed_data = cached["parsed"]
+                    reused.append("parsed")
+                    response.headers["X-Parse-Source"] = "cache"
+                    logger.info("✅ Parsed data served from the parse cache.")
+                else:
+                    # The spooled upload is read page by page rather than loaded whole
+                    pdf_text = await extract_resume_text(upload)
+                    parsed_data, source, confidence = await parse_resume_text(pdf_text, parse_mode)
+                    response.headers["X-Parse-Source"] = source
+                    if confidence is not None:
+                        response.headers["X-Parse-Confidence"] = f"{confidence:.3f}"
+                    if upload_key:
+                        parse_cache.put_parsed(upload_key, parsed_data)
             elif resume_data_json:
                 parsed_data = json.loads(resume_data_json)
             else:
@@ -139,22 +697,46 @@ async def parse_and_enhance_resume(
             
             original_json = json.dumps(parsed_data, indent=2)
             
-            if enhance:
+            if enhance and cached and cached["enhanced"]:
+                enhanced_data = cached["enhanced"]
+                reused.append("enhanced")
+                logger.info("Step 2: Enhanced data served from the parse cache.")
+            elif enhance:
                 status.update("[yellow]Enhancing resume with AI...")
                 logger.info("Step 2: Enhancing resume content...")
-                enhancer = ResumeEnhancer(api_key=api_key)
-                enhanced_data = enhancer.enhance(parsed_data)
+                enhanced_data, regenerated = await enhance_resume(parsed_data, session_id)
+                if session_id:
+                    response.headers["X-Regenerated-Sections"] = ",".join(regenerated) or "none"
+                if upload_key:
+                    parse_cache.put_enhanced(upload_key, enhanced_data)
                 logger.info("✅ Enhancement complete.")
             else:
                 logger.info("Step 2: Skipping enhancement.")
                 enhanced_data = parsed_data
+            if enhance and session_id:
+                sessions.record_enhancement(session_id, section_hashes(parsed_data, BASIC_SECTIONS), enhanced_data)
             
             status.update("[yellow]Generating Markdown content...")
             logger.info("Step 3: Generating Markdown...")
-            markdown_generator = EnhancedMarkdownGenerator(api_key=api_key)
-            markdown_content = markdown_generator.generate(enhanced_data)
-            logger.info("✅ Markdown generation complete.")
+            # Only LLM Markdown is worth caching; the local render is instant
+            markdown_variant = f"llm:{'enhanced' if enhance else 'parsed'}"
+            with timed("markdown"):
+                if markdown_mode == "deterministic":
+                    markdown_content = EnhancedMarkdownGenerator.render(enhanced_data)
+                    logger.info("✅ Markdown rendered locally, skipping the LLM.")
+                elif cached and markdown_variant in cached["markdown"] and (not enhance or "enhanced" in reused):
+                    markdown_content = cached["markdown"][markdown_variant]
+                    reused.append("markdown")
+                    logger.info("✅ Markdown served from the parse cache.")
+                else:
+                    async with stage_slot("llm_markdown"):
+                        markdown_content = await get_agents().markdown_generator.agenerate(enhanced_data)
+                    if upload_key:
+                        parse_cache.put_markdown(upload_key, markdown_variant, markdown_content)
+                    logger.info("✅ Markdown generation complete.")
 
+            if upload is not None:
+                response.headers["X-Parse-Cache-Reused"] = ",".join(reused) or "none"
             console.print(Panel("[bold green]Request successfully completed[/bold green]", border_style="green"))
             return EnhancedGenerationResponse(
                 original_json=original_json,
@@ -162,25 +744,161 @@ async def parse_and_enhance_resume(
                 markdown_str=markdown_content
             )
 
+        except HTTPException:
+            raise
         except json.JSONDecodeError:
             logger.error("Invalid JSON format in resume_data_json.")
             raise HTTPException(status_code=400, detail="Invalid JSON format in resume_data_json.")
         except Exception as e:
             logger.exception(f"Error in parse_and_enhance: {e}")
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            if upload is not None:
+                upload.close()
+
+
+@app.post("/api/parse-and-enhance/stream")
+async def parse_and_enhance_resume_stream(
+    file: Optional[UploadFile] = File(None),
+    resume_data_json: Optional[str] = Form(None),
+    enhance: bool = Form(True),
+    use_llm_cache: bool = Form(True),
+    markdown_mode: str = Form("deterministic"),
+    parse_mode: str = Form("auto")
+):
+    """
+    Streaming variant of /api/parse-and-enhance. Emits Server-Sent Events:
+    stage, parsed, enhanced, markdown_token, markdown, then done (or error).
+    Uploads share the size limit and the parse cache with the JSON endpoint.
+    """
+    check_mode("markdown_mode", markdown_mode)
+    check_mode("parse_mode", parse_mode, PARSE_MODES)
+    if not file and not resume_data_json:
+        raise HTTPException(status_code=400, detail="Either file or resume_data_json must be provided.")
+    # The request's upload is closed once the response starts, so the stream reads a copy of its own
+    upload, upload_digest = await spool_upload(file) if file else (None, None)
+    upload_key, cached, _ = lookup_parse_cache(upload_digest, parse_mode, use_llm_cache) if upload is not None else (None, None, None)
+
+    async def events():
+        with llm_cache_scope(use_llm_cache):
+            try:
+                yield sse_event("stage", {"stage": "parsing"})
+                if cached:
+                    parsed_data, source, confidence = cached["parsed"], "cache", None
+                elif upload is not None:
+                    yield sse_event("stage", {"stage": "extracting"})
+                    pdf_text = await extract_resume_text(upload)
+                    parsed_data, source, confidence = await parse_resume_text(pdf_text, parse_mode)
+                    if upload_key:
+                        parse_cache.put_parsed(upload_key, parsed_data)
+                else:
+                    try:
+                        parsed_data = json.loads(resume_data_json)
+                    except json.JSONDecodeError:
+                        raise HTTPException(status_code=400, detail="Invalid JSON format in resume_data_json.")
+                    source, confidence = "json", None
+                yield sse_event("parsed", {"data": parsed_data, "source": source, "confidence": confidence})
+
+                if enhance and cached and cached["enhanced"]:
+                    enhanced_data = cached["enhanced"]
+                elif enhance:
+                    yield sse_event("stage", {"stage": "enhancing"})
+                    with timed("enhance"):
+                        async with stage_slot("llm_enhance"):
+                            enhanced_data = await get_agents().enhancement.aenhance(parsed_data)
+                    if upload_key:
+                        parse_cache.put_enhanced(upload_key, enhanced_data)
+                else:
+                    enhanced_data = parsed_data
+                yield sse_event("enhanced", {"data": enhanced_data})
+
+                yield sse_event("stage", {"stage": "markdown"})
+                markdown_variant = f"llm:{'enhanced' if enhance else 'parsed'}"
+                if markdown_mode == "deterministic":
+                    markdown_content = EnhancedMarkdownGenerator.render(enhanced_data)
+                    yield sse_event("markdown_token", {"text": markdown_content})
+                elif cached and markdown_variant in cached["markdown"] and (not enhance or cached["enhanced"]):
+                    markdown_content = cached["markdown"][markdown_variant]
+                    yield sse_event("markdown_token", {"text": markdown_content})
+                else:
+                    generator = get_agents().markdown_generator
+                    chunks = []
+                    async with stage_slot("llm_markdown"):
+                        async for chunk in generator.astream(enhanced_data):
+                            chunks.append(chunk)
+                            yield sse_event("markdown_token", {"text": chunk})
+                    markdown_content = generator._clean_output("".join(chunks))
+                    if upload_key:
+                        parse_cache.put_markdown(upload_key, markdown_variant, markdown_content)
+                yield sse_event("markdown", {"markdown_str": markdown_content})
 
+                yield sse_event("done", {
+                    "original_json": json.dumps(parsed_data, indent=2),
+                    "enhanced_json": json.dumps(enhanced_data, indent=2),
+                    "markdown_str": markdown_content,
+                })
+                logger.info("✅ Streaming /api/parse-and-enhance completed.")
+            except HTTPException as e:
+                yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+            except Exception as e:
+                logger.exception(f"Error in parse_and_enhance stream: {e}")
+                yield sse_event("error", {"status_code": 500, "detail": str(e)})
+            finally:
+                if upload is not None:
+                    upload.close()
 
-@app.post("/api/generate-enhanced-latex", response_model=EnhancedFinalGenerationResponse)
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.post("/api/generate-enhanced-latex", response_model=Union[ArtifactGenerationResponse, EnhancedFinalGenerationResponse])
 async def generate_enhanced_latex(
+    http_response: Response,
     markdown_str: str = Form(...),
     enhanced_data_json: str = Form(...),
     template_name: str = Form("jakes_resume"),
-    style_preferences: Optional[str] = Form(None)
+    style_preferences: Optional[str] = Form(None),
+    use_llm_cache: bool = Form(True),
+    render_mode: str = Form("llm"),
+    response_format: str = Form("artifact"),
+    session_id: Optional[str] = Form(None)
 ):
     """
     Generates enhanced LaTeX and PDF from markdown and data.
+    With render_mode=deterministic the LaTeX is rendered locally from the
+    enhanced data; templates without a renderer fall back to the LLM.
+    With a session_id, LLM-generated LaTeX from the session's previous build
+    is reused and only the edited sections are regenerated and spliced in;
+    X-Regenerated-Sections lists them.
+    The PDF is returned as a downloadable artifact unless response_format=base64.
+    Identical requests arriving while one is running share its result.
     """
-    with console.status("[bold yellow]Processing /api/generate-enhanced-latex...") as status:
+    check_mode("render_mode", render_mode)
+    check_mode("response_format", response_format, RESPONSE_FORMATS)
+    check_session_id(session_id)
+    key = request_key(
+        "generate-enhanced-latex", markdown=markdown_str, enhanced_data=canonical_json(enhanced_data_json),
+        template_name=template_name, style_preferences=canonical_json(style_preferences), use_llm_cache=use_llm_cache,
+        render_mode=render_mode, response_format=response_format, session_id=session_id,
+    )
+    return await coalesce(key, http_response, lambda headers: run_generate_enhanced_latex(
+        headers, markdown_str, enhanced_data_json, template_name, style_preferences,
+        use_llm_cache, render_mode, response_format, session_id
+    ))
+
+
+async def run_generate_enhanced_latex(
+    http_response: Response,
+    markdown_str: str,
+    enhanced_data_json: str,
+    template_name: str,
+    style_preferences: Optional[str],
+    use_llm_cache: bool,
+    render_mode: str,
+    response_format: str,
+    session_id: Optional[str],
+) -> Union[ArtifactGenerationResponse, EnhancedFinalGenerationResponse]:
+    """Body of /api/generate-enhanced-latex; headers are set on the given response."""
+    with console.status("[bold yellow]Processing /api/generate-enhanced-latex...") as status, llm_cache_scope(use_llm_cache):
         try:
             # --- Logging Request Details ---
             table = Table(title="[cyan]Incoming Request: /api/generate-enhanced-latex[/cyan]", border_style="cyan")
@@ -189,87 +907,55 @@ async def generate_enhanced_latex(
             table.add_row("Template Name", template_name)
             table.add_row("Markdown Length", f"{len(markdown_str)} chars")
             table.add_row("Style Preferences", str(style_preferences))
+            table.add_row("Render Mode", render_mode)
             console.print(table)
 
-            status.update("[yellow]Loading environment variables...")
-            load_dotenv()
-            api_key = os.getenv("API_KEY")
-            if not api_key:
-                logger.error("API_KEY not found on server.")
-                raise HTTPException(status_code=500, detail="API_KEY not found on server.")
-            
             enhanced_data = json.loads(enhanced_data_json)
             style_prefs = json.loads(style_preferences) if style_preferences else None
             
             status.update(f"[yellow]Step 1: Generating LaTeX for template '{template_name}'...")
             logger.info(f"Step 1: Generating LaTeX for template '{template_name}'...")
-            latex_generator = EnhancedLaTeXGenerator(api_key=api_key)
-            
-            template_dir = os.path.join(PROJECT_ROOT, "backend", "latex_resume_generator", "templates", template_name)
-            template_path = os.path.join(template_dir, "template.tex")
-            with open(template_path, 'r') as f:
-                template_content = f.read()
-
-            engine = "pdflatex"
-            config_path = os.path.join(template_dir, 'template.cfg')
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    for line in f:
-                        if line.startswith('engine='):
-                            engine = line.strip().split('=')[1]
-                            logger.info(f"Found custom engine '{engine}' for template '{template_name}'")
-                            break
-            
-            full_latex = latex_generator.generate(
-                markdown_content=markdown_str, 
-                style_preferences=style_prefs, 
-                template_name=template_name
-            )
-            logger.info("✅ LaTeX generation complete.")
-            
-            status.update("[yellow]Step 2: Preparing output directory...")
-            logger.info("Step 2: Preparing output directory...")
-            output_dir = os.path.join(PROJECT_ROOT, "backend", "latex_resume_generator", "output", template_name)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            for f in os.listdir(output_dir):
-                if f.endswith(('.tex', '.pdf', '.aux', '.log', '.out')):
-                    os.remove(os.path.join(output_dir, f))
-            
-            for item in os.listdir(template_dir):
-                if item.endswith(('.cls', '.sty')):
-                    shutil.copy(os.path.join(template_dir, item), output_dir)
             
-            temp_latex_path = os.path.join(output_dir, "enhanced_resume.tex")
-            with open(temp_latex_path, "w") as f:
-                f.write(full_latex)
-            logger.info("✅ Output directory prepared.")
-
-            status.update(f"[yellow]Step 3: Compiling PDF using '{engine}'...")
-            logger.info(f"Step 3: Compiling PDF using '{engine}'...")
-            success, log = compile_latex_to_pdf(temp_latex_path, output_dir, engine)
+            template = resolve_template(template_name)
+            logger.info(f"Using engine '{template.engine}' for template '{template_name}'")
             
-            pdf_path = os.path.join(output_dir, "enhanced_resume.pdf")
+            # LaTeX that cannot be built must not be replayed from the LLM cache on a resubmit
+            with discard_replies_on_error():
+                try:
+                    with discard_replies_on_error():
+                        if session_id:
+                            full_latex, regenerated = await generate_session_latex(
+                                session_id, template_name, markdown_str, enhanced_data, style_prefs, render_mode
+                            )
+                        else:
+                            full_latex = await generate_latex(template_name, markdown_str, enhanced_data, style_prefs, render_mode)
+                            regenerated = ["all"]
+                        full_latex, pdf_bytes, repairs, passes = await build_pdf(full_latex, template, status)
+                except HTTPException:
+                    if regenerated == ["all"]:
+                        raise
+                    # A spliced fragment broke the document; start over from the whole resume
+                    logger.warning("Spliced LaTeX failed to compile, regenerating the whole document.")
+                    full_latex = await generate_latex(template_name, markdown_str, enhanced_data, style_prefs, render_mode)
+                    regenerated = ["all"]
+                    full_latex, pdf_bytes, repairs, passes = await build_pdf(full_latex, template, status)
             
-            if not success or not os.path.exists(pdf_path):
-                error_detail = {"message": "Failed to compile LaTeX to PDF.", "log": log, "latex_code": full_latex}
-                logger.error(f"LaTeX Compilation Error: {log}")
-                raise HTTPException(status_code=500, detail=error_detail)
+            http_response.headers["X-Latex-Repairs"] = str(repairs)
+            http_response.headers["X-Latex-Passes"] = str(passes)
+            if session_id:
+                sessions.record_build(session_id, template_name, LatexBuild(
+                    render_mode=render_mode,
+                    style_key=style_key(style_prefs),
+                    section_hashes=section_hashes(enhanced_data),
+                    latex=full_latex,
+                ))
+                http_response.headers["X-Regenerated-Sections"] = ",".join(regenerated) or "none"
             
-            logger.info("✅ PDF compilation successful.")
-            
-            status.update("[yellow]Step 4: Encoding PDF...")
-            logger.info("Step 4: Encoding PDF...")
-            with open(pdf_path, "rb") as pdf_file:
-                pdf_b64 = base64.b64encode(pdf_file.read()).decode('utf-8')
-            logger.info("✅ PDF encoded successfully.")
+            status.update("[yellow]Step 4: Preparing response...")
+            response = build_final_response(full_latex, pdf_bytes, enhanced_data, template_name, response_format)
 
             console.print(Panel("[bold green]Request successfully completed[/bold green]", border_style="green"))
-            return EnhancedFinalGenerationResponse(
-                latex_str=full_latex,
-                pdf_b64=pdf_b64,
-                enhanced_data=enhanced_data
-            )
+            return response
         
         except HTTPException:
             raise
@@ -278,6 +964,387 @@ async def generate_enhanced_latex(
             raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/generate-enhanced-latex/stream")
+async def generate_enhanced_latex_stream(
+    markdown_str: str = Form(...),
+    enhanced_data_json: str = Form(...),
+    template_name: str = Form("jakes_resume"),
+    style_preferences: Optional[str] = Form(None),
+    use_llm_cache: bool = Form(True),
+    render_mode: str = Form("llm"),
+    response_format: str = Form("artifact")
+):
+    """
+    Streaming variant of /api/generate-enhanced-latex. Emits Server-Sent Events:
+    stage, latex_token, latex, compiled, then done (or error).
+    """
+    check_mode("render_mode", render_mode)
+    check_mode("response_format", response_format, RESPONSE_FORMATS)
+    try:
+        enhanced_data = json.loads(enhanced_data_json)
+        style_prefs = json.loads(style_preferences) if style_preferences else None
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON in enhanced_data_json or style_preferences.")
+    template = resolve_template(template_name)
+
+    async def events():
+        with llm_cache_scope(use_llm_cache):
+            try:
+                yield sse_event("stage", {"stage": "latex", "template": template_name, "engine": template.engine})
+                full_latex = None
+                if render_mode == "deterministic":
+                    full_latex = render_latex_locally(template_name, enhanced_data)
+                    if full_latex is not None:
+                        yield sse_event("latex_token", {"text": full_latex})
+
+                if full_latex is None:
+                    generator = get_agents().latex_generator
+                    chunks = []
+                    async with stage_slot("llm_latex"):
+                        async for chunk in generator.astream(
+                            markdown_content=markdown_str,
+                            style_preferences=style_prefs,
+                            template_name=template_name
+                        ):
+                            chunks.append(chunk)
+                            yield sse_event("latex_token", {"text": chunk})
+                    full_latex = generator._clean_output("".join(chunks))
+                yield sse_event("latex", {"latex_str": full_latex})
+
+                yield sse_event("stage", {"stage": "compiling"})
+                # Streamed LaTeX is not cached, but the repair replies are
+                with discard_replies_on_error():
+                    full_latex, pdf_bytes, repairs, passes = await build_pdf(full_latex, template)
+                yield sse_event("compiled", {"size_bytes": len(pdf_bytes), "repairs": repairs, "passes": passes})
+
+                response = build_final_response(full_latex, pdf_bytes, enhanced_data, template_name, response_format)
+                yield sse_event("done", response.model_dump())
+                logger.info("✅ Streaming /api/generate-enhanced-latex completed.")
+            except HTTPException as e:
+                yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+            except Exception as e:
+                logger.exception(f"Error in generate_enhanced_latex stream: {e}")
+                yield sse_event("error", {"status_code": 500, "detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.post("/api/generate-batch")
+async def generate_batch(
+    enhanced_data_json: str = Form(...),
+    templates: str = Form(...),
+    markdown_str: Optional[str] = Form(None),
+    style_preferences: Optional[str] = Form(None),
+    use_llm_cache: bool = Form(True),
+    render_mode: str = Form("llm"),
+    response_format: str = Form("artifact"),
+    max_workers: Optional[int] = Form(None)
+):
+    """
+    Generates and compiles one resume for several templates concurrently.
+    templates is a comma-separated list (or JSON array) of template names.
+    Results are streamed as Server-Sent Events: one result event per template
+    in completion order, then a done event with a summary.
+    """
+    check_mode("render_mode", render_mode)
+    check_mode("response_format", response_format, RESPONSE_FORMATS)
+    try:
+        enhanced_data = json.loads(enhanced_data_json)
+        style_prefs = json.loads(style_preferences) if style_preferences else None
+        template_names = json.loads(templates) if templates.strip().startswith("[") else templates.split(",")
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON in enhanced_data_json, style_preferences or templates.")
+    # Keep order, drop blanks and duplicates
+    template_names = list(dict.fromkeys(name.strip() for name in template_names if name and name.strip()))
+    if not template_names:
+        raise HTTPException(status_code=400, detail="templates must name at least one template.")
+    for name in template_names:
+        resolve_template(name)
+
+    # The Markdown input is shared by every template; render it once if the client did not send it
+    if not markdown_str:
+        markdown_str = EnhancedMarkdownGenerator.render(enhanced_data)
+
+    workers = min(max_workers or BATCH_MAX_WORKERS, BATCH_MAX_WORKERS, len(template_names))
+    pool = asyncio.Semaphore(max(1, workers))
+    logger.info(f"Batch generation for {len(template_names)} templates with {workers} workers")
+
+    async def run(template_name: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        async with pool:
+            try:
+                template = resolve_template(template_name)
+                with discard_replies_on_error():
+                    full_latex = await generate_latex(template_name, markdown_str, enhanced_data, style_prefs, render_mode)
+                    full_latex, pdf_bytes, _, _ = await build_pdf(full_latex, template)
+                response = build_final_response(full_latex, pdf_bytes, enhanced_data, template_name, response_format)
+                result = {"status": "ok", **response.model_dump()}
+            except HTTPException as e:
+                result = {"status": "error", "status_code": e.status_code, "detail": e.detail}
+            except Exception as e:
+                logger.exception(f"Batch generation failed for '{template_name}': {e}")
+                result = {"status": "error", "status_code": 500, "detail": str(e)}
+        result.update(template_name=template_name, elapsed_seconds=round(time.perf_counter() - started, 3))
+        return result
+
+    async def events():
+        with llm_cache_scope(use_llm_cache):
+            started = time.perf_counter()
+            tasks = [asyncio.create_task(run(name)) for name in template_names]
+            succeeded = 0
+            try:
+                yield sse_event("stage", {"stage": "batch", "templates": template_names, "workers": workers})
+                for finished in asyncio.as_completed(tasks):
+                    result = await finished
+                    succeeded += result["status"] == "ok"
+                    yield sse_event("result", result)
+                yield sse_event("done", {
+                    "total": len(template_names),
+                    "succeeded": succeeded,
+                    "failed": len(template_names) - succeeded,
+                    "elapsed_seconds": round(time.perf_counter() - started, 3),
+                })
+                logger.info(f"✅ Batch generation finished: {succeeded}/{len(template_names)} succeeded.")
+            finally:
+                # Client went away: stop the remaining generations (and their TeX processes)
+                for task in tasks:
+                    task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def run_pipeline_job(job: Job, set_stage) -> Dict[str, Any]:
+    """Runs the PDF/JSON-to-PDF pipeline for a background job, reporting each stage."""
+    params = job.params
+    with llm_cache_scope(params.get("use_llm_cache", True)):
+        enhanced_data = params.get("enhanced_data")
+        if enhanced_data is None:
+            if params.get("pdf_b64"):
+                set_stage("extracting")
+                pdf_text = await extract_resume_text(base64.b64decode(params["pdf_b64"]))
+                set_stage("parsing")
+                parsed_data, _, _ = await parse_resume_text(pdf_text, params.get("parse_mode", "auto"))
+            else:
+                parsed_data = params["resume_data"]
+
+            enhanced_data = parsed_data
+            if params.get("enhance", True):
+                set_stage("enhancing")
+                with timed("enhance"):
+                    async with stage_slot("llm_enhance"):
+                        enhanced_data = await get_agents().enhancement.aenhance(parsed_data)
+
+        markdown_str = params.get("markdown_str")
+        if not markdown_str:
+            set_stage("markdown")
+            with timed("markdown"):
+                if params.get("markdown_mode", "deterministic") == "deterministic":
+                    markdown_str = EnhancedMarkdownGenerator.render(enhanced_data)
+                else:
+                    async with stage_slot("llm_markdown"):
+                        markdown_str = await get_agents().markdown_generator.agenerate(enhanced_data)
+
+        template_name = params.get("template_name", "jakes_resume")
+        template = resolve_template(template_name)
+        with discard_replies_on_error():
+            set_stage("latex")
+            full_latex = await generate_latex(
+                template_name, markdown_str, enhanced_data, params.get("style_preferences"), params.get("render_mode", "llm")
+            )
+            set_stage("compiling")
+            full_latex, pdf_bytes, _, _ = await build_pdf(full_latex, template)
+        set_stage("storing")
+        response = build_final_response(full_latex, pdf_bytes, enhanced_data, template_name, "artifact")
+
+    return {**response.model_dump(), "markdown_str": markdown_str, "enhanced_data": enhanced_data}
+
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(
+    file: Optional[UploadFile] = File(None),
+    resume_data_json: Optional[str] = Form(None),
+    enhanced_data_json: Optional[str] = Form(None),
+    markdown_str: Optional[str] = Form(None),
+    enhance: bool = Form(True),
+    template_name: str = Form("jakes_resume"),
+    style_preferences: Optional[str] = Form(None),
+    use_llm_cache: bool = Form(True),
+    markdown_mode: str = Form("deterministic"),
+    render_mode: str = Form("llm"),
+    parse_mode: str = Form("auto")
+):
+    """
+    Queues a full generation job and returns its id immediately. The input is a
+    PDF upload, resume JSON, or already enhanced JSON (which skips parsing and
+    enhancement). Poll GET /api/jobs/{job_id} for the stage and the result.
+    """
+    check_mode("markdown_mode", markdown_mode)
+    check_mode("render_mode", render_mode)
+    check_mode("parse_mode", parse_mode, PARSE_MODES)
+    resolve_template(template_name)
+    params: Dict[str, Any] = {
+        "parse_mode": parse_mode,
+        "enhance": enhance,
+        "template_name": template_name,
+        "use_llm_cache": use_llm_cache,
+        "markdown_mode": markdown_mode,
+        "render_mode": render_mode,
+        "markdown_str": markdown_str,
+    }
+    try:
+        params["style_preferences"] = json.loads(style_preferences) if style_preferences else None
+        if file:
+            params["pdf_b64"] = base64.b64encode(await file.read()).decode("utf-8")
+        elif enhanced_data_json:
+            params["enhanced_data"] = json.loads(enhanced_data_json)
+        elif resume_data_json:
+            params["resume_data"] = json.loads(resume_data_json)
+        else:
+            raise HTTPException(status_code=400, detail="Provide a file, resume_data_json or enhanced_data_json.")
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON in the job parameters.")
+
+    job = get_jobs().submit("pipeline", params)
+    logger.info(f"Queued job {job.id} for template '{template_name}'")
+    return {"job_id": job.id, "status": job.status, "status_url": f"/api/jobs/{job.id}"}
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """Reports a job's status, current stage and, once finished, its result or error."""
+    job = get_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.public()
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Cancels a queued or running job, killing its TeX process if one is running."""
+    job = get_jobs().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.public()
+
+
+def _artifact_response(request: Request, artifact_id: str, extension: str, media_type: str) -> Response:
+    path = artifact_store.path(artifact_id, extension)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found or expired.")
+    # Artifact ids are content hashes, so they double as strong ETags
+    etag = f'"{artifact_id}{extension}"'
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"resume{extension}",
+        content_disposition_type="inline",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=86400, immutable"},
+    )
+
+
+@app.get("/api/artifacts/{artifact_id}.pdf")
+def get_pdf_artifact(artifact_id: str, request: Request):
+    """Serves a generated PDF. Supports Range and If-None-Match requests."""
+    return _artifact_response(request, artifact_id, ".pdf", "application/pdf")
+
+
+@app.get("/api/artifacts/{artifact_id}.tex")
+def get_latex_artifact(artifact_id: str, request: Request):
+    """Serves the LaTeX source a PDF artifact was compiled from."""
+    return _artifact_response(request, artifact_id, ".tex", "text/plain; charset=utf-8")
+
+
+@app.get("/api/templates")
+def list_templates():
+    """Lists the available LaTeX templates and their metadata."""
+    registry = get_templates()
+    return {
+        "templates": [
+            {
+                "name": t.name,
+                "engine": t.engine,
+                "assets": [os.path.basename(a) for a in t.assets],
+                "has_custom_prompt": t.prompt is not None,
+                "deterministic_render": t.renderer is not None,
+            }
+            for t in registry.list()
+        ],
+        "errors": registry.errors,
+    }
+
+
+@app.get("/api/cache-stats")
+def cache_stats():
+    """Reports hit/miss counters for the server-side caches."""
+    return {
+        "compile_cache": compile_cache.stats() if compile_cache else None,
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "parse_cache": parse_cache.stats() if parse_cache else None,
+        "pdf_text_cache": get_pdf_extractor().stats(),
+        "tex_formats": format_cache.stats() if format_cache else None,
+        "sessions": sessions.stats(),
+        "coalescing": inflight.stats() if inflight else None,
+    }
+
+
+@app.get("/api/repair-stats")
+def repair_stats():
+    """Reports how often failed LaTeX builds were repaired."""
+    return repairer.stats()
+
+
+@app.get("/api/compile-pool")
+def compile_pool_stats():
+    """Reports TeX worker pool utilization, queueing and limit enforcement per engine."""
+    if compile_pool is None:
+        return {"enabled": False}
+    return {"enabled": True, **compile_pool.stats()}
+
+
+@app.get("/api/jobs")
+def job_stats():
+    """Reports the job worker pool and job counts by status."""
+    return get_jobs().stats()
+
+
+def cache_counters() -> Dict[str, Dict[str, Any]]:
+    """Stats of every enabled server-side cache, by name."""
+    caches = {"compile": compile_cache, "llm": llm_cache, "parse": parse_cache, "tex_formats": format_cache}
+    counters = {name: cache.stats() for name, cache in caches.items() if cache}
+    counters["pdf_text"] = get_pdf_extractor().stats()
+    return counters
+
+
+def compile_pool_values(key: str) -> Dict[Tuple[str, ...], float]:
+    engines = compile_pool.stats()["engines"] if compile_pool else {}
+    return {(engine,): stats[key] for engine, stats in engines.items()}
+
+
+# Counters that the caches, the worker pool and the coalescer keep themselves are read at scrape time
+metrics_registry.snapshot("resume_cache_hits_total", "Cache lookups that found an entry.", "counter", ("cache",),
+                          lambda: {(name,): stats["hits"] for name, stats in cache_counters().items()})
+metrics_registry.snapshot("resume_cache_misses_total", "Cache lookups that found nothing.", "counter", ("cache",),
+                          lambda: {(name,): stats["misses"] for name, stats in cache_counters().items()})
+metrics_registry.snapshot("resume_cache_hit_ratio", "Share of cache lookups that hit since startup.", "gauge", ("cache",),
+                          lambda: {(name,): stats["hit_rate"] for name, stats in cache_counters().items()})
+metrics_registry.snapshot("resume_tex_pool_busy_workers", "TeX workers running a compile.", "gauge", ("engine",),
+                          lambda: compile_pool_values("busy"))
+metrics_registry.snapshot("resume_tex_pool_queued_compiles", "Compiles waiting for a TeX worker.", "gauge", ("engine",),
+                          lambda: compile_pool_values("queued"))
+metrics_registry.snapshot("resume_tex_pool_rejected_total", "Compiles rejected because the queue was full.", "counter", ("engine",),
+                          lambda: compile_pool_values("rejected"))
+metrics_registry.snapshot("resume_coalesced_requests_total", "Requests that joined an identical request in flight.", "counter", (),
+                          lambda: {(): inflight.coalesced} if inflight else {})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of stage timings, TeX passes, LLM calls and tokens, and cache hit rates."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def read_root():
     return {
@@ -285,7 +1352,17 @@ def read_root():
         "message": "Enhanced Resume Generator API",
         "endpoints": [
             "/api/parse-and-enhance",
-            "/api/generate-enhanced-latex"
+            "/api/parse-and-enhance/stream",
+            "/api/generate-enhanced-latex",
+            "/api/generate-enhanced-latex/stream",
+            "/api/generate-batch",
+            "/api/jobs",
+            "/api/jobs/{job_id}",
+            "/api/jobs/{job_id}/cancel",
+            "/api/artifacts/{artifact_id}.pdf",
+            "/api/artifacts/{artifact_id}.tex",
+            "/api/templates",
+            "/api/cache-stats"
         ]
     }
 
@@ -1,17 +1,20 @@
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from rich import print
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from backend.latex_resume_generator.utils.template_registry import TemplateError, TemplateRegistry
+from backend.latex_resume_generator.utils.latex_lint import lint_latex
+
 class EnhancedLaTeXGenerator:
     """
     Generates professional LaTeX code from enhanced Markdown content.
     Produces output similar to high-quality technical resumes.
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, template_registry: Optional[TemplateRegistry] = None):
         self.model = ChatGoogleGenerativeAI(
             model="gemini-2.0-flash",
             temperature=0.2,  # Very low temperature for consistent LaTeX
@@ -22,6 +25,47 @@ class EnhancedLaTeXGenerator:
         prompt_path = Path(__file__).parent.parent / "prompts" / "enhanced_latex_generation_prompt.txt"
         with open(prompt_path, 'r') as f:
             self.default_prompt_template = f.read()
+        
+        # Template prompts and skeletons are preloaded by the registry
+        self.templates = template_registry or TemplateRegistry()
+    
+    def _load_template_prompt(self, template_name: str) -> Tuple[str, str]:
+        """Returns (prompt template, template skeleton) for a template."""
+        try:
+            template = self.templates.get(template_name)
+        except TemplateError:
+            return self.default_prompt_template, ""
+        if template.prompt:
+            print(f"[bold cyan]Using template-specific prompt for {template_name}[/bold cyan]")
+        return template.prompt or self.default_prompt_template, template.skeleton
+    
+    def _build_prompt(self, markdown_content: str, style_preferences: Dict[str, Any] = None, template_name: str = None) -> str:
+        prompt_template, template_content = self.default_prompt_template, ""
+        if template_name:
+            prompt_template, template_content = self._load_template_prompt(template_name)
+        
+        # Prepare the prompt
+        final_prompt = prompt_template.replace(
+            "{markdown_resume}", markdown_content
+        ).replace(
+            "{latex_template}", template_content
+        )
+        
+        # Add style preferences if provided
+        if style_preferences:
+            style_info = f"\nStyle preferences: {json.dumps(style_preferences, indent=2)}"
+            final_prompt += style_info
+        
+        return final_prompt
+    
+    @staticmethod
+    def _clean_output(latex_code: str) -> str:
+        # Clean up code block markers if present
+        if latex_code.strip().startswith("```latex"):
+            latex_code = latex_code.split("```latex")[1].split("```")[0].strip()
+        elif latex_code.strip().startswith("```"):
+            latex_code = latex_code.strip()[3:-3].strip()
+        return latex_code
     
     def generate(self, markdown_content: str, style_preferences: Dict[str, Any] = None, template_name: str = None) -> str:
         """
@@ -38,68 +82,29 @@ class EnhancedLaTeXGenerator:
         print("[bold blue]Generating enhanced LaTeX from Markdown...[/bold blue]")
         
         try:
-            # Check for template-specific prompt first
-            prompt_template = self.default_prompt_template
-            if template_name:
-                specific_prompt_path = Path(__file__).parent.parent / "prompts" / f"{template_name}_latex_prompt.txt"
-                if specific_prompt_path.exists():
-                    print(f"[bold cyan]Using template-specific prompt for {template_name}[/bold cyan]")
-                    with open(specific_prompt_path, 'r') as f:
-                        prompt_template = f.read()
-            
-            # Handle template content differently for tibault_resume
-            template_content = ""
-            if template_name:
-                if template_name == "tibault_resume":
-                    # For Tibault template, provide clean structure instead of full template
-                    template_content = """\\documentclass[margin,line]{resume}
-
-\\usepackage[latin1]{inputenc}
-\\usepackage[english,french]{babel}
-\\usepackage[T1]{fontenc}
-\\usepackage{fontawesome}
-\\usepackage{graphicx,wrapfig}
-\\usepackage{url}
-\\usepackage[colorlinks=true, pdfstartview=FitV, linkcolor=blue, citecolor=blue, urlcolor=blue]{hyperref}
-\\pdfcompresslevel=9
-
-\\begin{document}{\\sc \\Large Curriculum Vitae -- [USER NAME]}
-\\begin{resume}
-
-% Use \\section{\\mysidestyle SectionName} for all sections
-% Use \\begin{description} and \\item[Label] for employment
-% Use \\begin{list2} for bullet points
-% Use \\small{Company \\hfill \\textsl{Date}} for job headers
-
-\\end{resume}
-\\end{document}"""
-                else:
-                    # For other templates, load the full template
-                    template_path = Path(__file__).parent.parent / "templates" / template_name / "template.tex"
-                    if template_path.exists():
-                        with open(template_path, 'r') as f:
-                            template_content = f.read()
-            
-            # Prepare the prompt
-            final_prompt = prompt_template.replace(
-                "{markdown_resume}", markdown_content
-            ).replace(
-                "{latex_template}", template_content
-            )
-            
-            # Add style preferences if provided
-            if style_preferences:
-                style_info = f"\nStyle preferences: {json.dumps(style_preferences, indent=2)}"
-                final_prompt += style_info
+            final_prompt = self._build_prompt(markdown_content, style_preferences, template_name)
             
             response = self.model.invoke(final_prompt)
-            latex_code = response.content
+            latex_code = self._clean_output(response.content)
             
-            # Clean up code block markers if present
-            if latex_code.strip().startswith("```latex"):
-                latex_code = latex_code.split("```latex")[1].split("```")[0].strip()
-            elif latex_code.strip().startswith("```"):
-                latex_code = latex_code.strip()[3:-3].strip()
+            print("[bold green]Successfully generated enhanced LaTeX code.[/bold green]")
+            return latex_code
+            
+        except Exception as e:
+            print(f"[bold red]Error generating enhanced LaTeX:[/bold red] {e}")
+            raise
+    
+    async def agenerate(self, markdown_content: str, style_preferences: Dict[str, Any] = None, template_name: str = None) -> str:
+        """
+        Async variant of generate that awaits the model without blocking the event loop.
+        """
+        print("[bold blue]Generating enhanced LaTeX from Markdown...[/bold blue]")
+        
+        try:
+            final_prompt = self._build_prompt(markdown_content, style_preferences, template_name)
+            
+            response = await self.model.ainvoke(final_prompt)
+            latex_code = self._clean_output(response.content)
             
             print("[bold green]Successfully generated enhanced LaTeX code.[/bold green]")
             return latex_code
@@ -108,20 +113,119 @@ class EnhancedLaTeXGenerator:
             print(f"[bold red]Error generating enhanced LaTeX:[/bold red] {e}")
             raise
     
-    def validate_latex(self, latex_code: str) -> bool:
+    async def astream(self, markdown_content: str, style_preferences: Dict[str, Any] = None, template_name: str = None) -> AsyncIterator[str]:
         """
-        Basic validation to ensure LaTeX code has required structure.
+        Streams the raw LaTeX text chunk by chunk as the model produces it.
+        Callers join the chunks and pass them through _clean_output.
         """
-        required_elements = [
-            r"\documentclass",
-            r"\begin{document}",
-            r"\end{document}",
-            r"\section",
-        ]
+        print("[bold blue]Streaming enhanced LaTeX from Markdown...[/bold blue]")
         
-        for element in required_elements:
-            if element not in latex_code:
-                print(f"[bold yellow]Warning: Missing {element} in LaTeX code[/bold yellow]")
-                return False
+        try:
+            final_prompt = self._build_prompt(markdown_content, style_preferences, template_name)
+            
+            async for chunk in self.model.astream(final_prompt):
+                if chunk.content:
+                    yield chunk.content
+            
+            print("[bold green]Successfully streamed enhanced LaTeX code.[/bold green]")
+            
+        except Exception as e:
+            print(f"[bold red]Error streaming enhanced LaTeX:[/bold red] {e}")
+            raise
+    
+    def _build_section_prompt(
+        self,
+        section_name: str,
+        section_data: Any,
+        current_fragment: str,
+        template_name: str = None,
+        style_preferences: Dict[str, Any] = None,
+    ) -> str:
+        prompt = f"""
+        You are updating one section of an existing LaTeX resume built from the '{template_name or "default"}' template.
+        
+        Current LaTeX for the "{section_name}" section:
+        {current_fragment}
+        
+        Updated data for this section (JSON):
+        {json.dumps(section_data, indent=2)}
+        
+        Rewrite the LaTeX fragment so it reflects the updated data exactly. Keep the same commands,
+        environments, spacing and structure as the current fragment, including any commands that open
+        or close the page layout (such as minipage or column markers). Escape LaTeX special characters
+        in the data. Output only the LaTeX fragment, without code fences or explanations.
+        """
+        if style_preferences:
+            prompt += f"\nStyle preferences: {json.dumps(style_preferences, indent=2)}"
+        return prompt
+    
+    async def agenerate_section(
+        self,
+        section_name: str,
+        section_data: Any,
+        current_fragment: str,
+        template_name: str = None,
+        style_preferences: Dict[str, Any] = None,
+    ) -> str:
+        """
+        Regenerates the LaTeX fragment of a single resume section, using the
+        fragment from the previous version of the document as the pattern.
+        """
+        print(f"[bold blue]Regenerating LaTeX for section '{section_name}'...[/bold blue]")
+        
+        try:
+            prompt = self._build_section_prompt(section_name, section_data, current_fragment, template_name, style_preferences)
+            response = await self.model.ainvoke(prompt)
+            fragment = self._clean_output(response.content)
+            
+            print(f"[bold green]Successfully regenerated section '{section_name}'.[/bold green]")
+            return fragment
+            
+        except Exception as e:
+            print(f"[bold red]Error regenerating section '{section_name}':[/bold red] {e}")
+            raise
+    
+    async def arepair(self, latex_region: str, errors: List[Dict[str, Any]], template_name: str = None) -> str:
+        """
+        Fixes the lines of a document around compile errors. Only the region is
+        sent to the model, and only the corrected region comes back.
+        """
+        print(f"[bold blue]Repairing LaTeX around {len(errors)} compile error(s)...[/bold blue]")
         
-        return True 
\ No newline at end of file
+        try:
+            problems = "\n".join(
+                f"- line {e.get('line')}: {e.get('message')}" + (f" (at: {e['context']})" if e.get('context') else "")
+                for e in errors
+            )
+            prompt = f"""
+            The following excerpt of a LaTeX resume{f" using the '{template_name}' template" if template_name else ""}
+            fails to compile with these errors (line numbers refer to the whole document):
+            {problems}
+            
+            Excerpt:
+            {latex_region}
+            
+            Return the corrected excerpt with exactly the same purpose and content. Fix only what causes the
+            errors: escape special characters, close braces and environments, replace undefined commands with
+            ones the document already uses. Keep every other line unchanged. Output only the LaTeX excerpt,
+            without code fences or explanations.
+            """
+            response = await self.model.ainvoke(prompt)
+            region = self._clean_output(response.content)
+            
+            print("[bold green]Successfully repaired LaTeX region.[/bold green]")
+            return region
+            
+        except Exception as e:
+            print(f"[bold red]Error repairing LaTeX:[/bold red] {e}")
+            raise
+    
+    def validate_latex(self, latex_code: str) -> bool:
+        """
+        Checks that LaTeX code is structurally sound (document markers, balanced
+        braces and environments) without running TeX.
+        """
+        errors = lint_latex(latex_code).errors
+        for issue in errors:
+            print(f"[bold yellow]Warning: line {issue.line}: {issue.message}[/bold yellow]")
+        return not errors
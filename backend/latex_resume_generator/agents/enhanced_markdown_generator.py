@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional
 from rich import print
 
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -21,6 +21,20 @@ class EnhancedMarkdownGenerator:
         with open(prompt_path, 'r') as f:
             self.prompt_template = f.read()
     
+    def _build_prompt(self, enhanced_resume_data: Dict[str, Any]) -> str:
+        return self.prompt_template.replace(
+            "{enhanced_resume_json}", json.dumps(enhanced_resume_data, indent=2)
+        )
+    
+    @staticmethod
+    def _clean_output(markdown_content: str) -> str:
+        # Clean up any code block markers
+        if markdown_content.strip().startswith("```markdown"):
+            markdown_content = markdown_content.split("```markdown")[1].split("```")[0].strip()
+        elif markdown_content.strip().startswith("```"):
+            markdown_content = markdown_content.strip()[3:-3].strip()
+        return markdown_content
+    
     def generate(self, enhanced_resume_data: Dict[str, Any]) -> str:
         """
         Converts enhanced resume data to professional Markdown format.
@@ -30,18 +44,27 @@ class EnhancedMarkdownGenerator:
         
         try:
             # Prepare the prompt with the enhanced data
-            final_prompt = self.prompt_template.replace(
-                "{enhanced_resume_json}", json.dumps(enhanced_resume_data, indent=2)
-            )
+            final_prompt = self._build_prompt(enhanced_resume_data)
             
             response = self.model.invoke(final_prompt)
-            markdown_content = response.content
+            markdown_content = self._clean_output(response.content)
+            
+            print("[bold green]Successfully generated enhanced Markdown content.[/bold green]")
+            return markdown_content
             
-            # Clean up any code block markers
-            if markdown_content.strip().startswith("```markdown"):
-                markdown_content = markdown_content.split("```markdown")[1].split("```")[0].strip()
-            elif markdown_content.strip().startswith("```"):
-                markdown_content = markdown_content.strip()[3:-3].strip()
+        except Exception as e:
+            print(f"[bold red]Error generating enhanced Markdown:[/bold red] {e}")
+            raise
+    
+    async def agenerate(self, enhanced_resume_data: Dict[str, Any]) -> str:
+        """
+        Async variant of generate that awaits the model without blocking the event loop.
+        """
+        print("[bold blue]Generating enhanced Markdown from structured data...[/bold blue]")
+        
+        try:
+            response = await self.model.ainvoke(self._build_prompt(enhanced_resume_data))
+            markdown_content = self._clean_output(response.content)
             
             print("[bold green]Successfully generated enhanced Markdown content.[/bold green]")
             return markdown_content
@@ -50,7 +73,141 @@ class EnhancedMarkdownGenerator:
             print(f"[bold red]Error generating enhanced Markdown:[/bold red] {e}")
             raise
     
-    def format_skills_section(self, skills_categories: List[Dict[str, Any]]) -> str:
+    async def astream(self, enhanced_resume_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Streams the raw Markdown text chunk by chunk as the model produces it.
+        Callers join the chunks and pass them through _clean_output.
+        """
+        print("[bold blue]Streaming enhanced Markdown from structured data...[/bold blue]")
+        
+        try:
+            async for chunk in self.model.astream(self._build_prompt(enhanced_resume_data)):
+                if chunk.content:
+                    yield chunk.content
+            
+            print("[bold green]Successfully streamed enhanced Markdown content.[/bold green]")
+            
+        except Exception as e:
+            print(f"[bold red]Error streaming enhanced Markdown:[/bold red] {e}")
+            raise
+    
+    @classmethod
+    def render(cls, enhanced_resume_data: Dict[str, Any]) -> str:
+        """
+        Converts resume data to Markdown locally, without calling the model.
+        Follows the layout of the Markdown generation prompt and also accepts
+        unenhanced ResumeSchema data (flat skills, project descriptions).
+        """
+        data = enhanced_resume_data
+        skills = data.get('skills') or []
+        if isinstance(skills, dict):
+            skills = [
+                {'category_name': name.replace('_', ' ').title(), 'skills': values}
+                for name, values in skills.items() if values
+            ]
+
+        sections = [cls.format_header(data.get('personal_info') or {})]
+        if data.get('summary'):
+            sections.append(f"## Summary\n\n{data['summary']}\n")
+        if data.get('experience'):
+            sections.append(cls.format_experience_section(data['experience']))
+        if data.get('projects'):
+            sections.append(cls.format_project_section(data['projects']))
+        if data.get('education'):
+            sections.append(cls.format_education_section(data['education']))
+        if skills:
+            sections.append(cls.format_skills_section(skills))
+        if data.get('publications'):
+            sections.append(cls.format_publications_section(data['publications']))
+        if data.get('certifications'):
+            sections.append(cls.format_certifications_section(data['certifications']))
+        if data.get('additional_sections'):
+            sections.append(cls.format_additional_sections(data['additional_sections']))
+
+        return '\n'.join(section.rstrip() + '\n' for section in sections if section).strip() + '\n'
+
+    @staticmethod
+    def _date_range(start: Optional[str], end: Optional[str]) -> str:
+        return ' - '.join(part for part in (start, end) if part)
+
+    @staticmethod
+    def format_header(personal_info: Dict[str, Any]) -> str:
+        """
+        Formats the name and a single pipe-separated contact line.
+        """
+        contact = []
+        for key in ('email', 'phone', 'location'):
+            if personal_info.get(key):
+                value = personal_info[key]
+                contact.append(f"[{value}](mailto:{value})" if key == 'email' else value)
+        for key, label in (('linkedin_url', 'LinkedIn'), ('github_url', 'GitHub'),
+                           ('twitter_url', 'Twitter'), ('website_url', 'Website')):
+            if personal_info.get(key):
+                contact.append(f"[{label}]({personal_info[key]})")
+        for label, url in (personal_info.get('other_links') or {}).items():
+            if url:
+                contact.append(f"[{label}]({url})")
+
+        markdown_lines = [f"# {personal_info.get('name', '')}", ""]
+        if contact:
+            markdown_lines.append(' | '.join(contact))
+            markdown_lines.append("")
+        return '\n'.join(markdown_lines)
+
+    @staticmethod
+    def format_experience_section(experience: List[Dict[str, Any]]) -> str:
+        """
+        Formats positions with location, dates and achievement bullets.
+        """
+        markdown_lines = ["## Experience", ""]
+
+        for job in experience:
+            markdown_lines.append(f"### {job.get('position', '')} | {job.get('company', '')}")
+            details = [d for d in (job.get('location'),
+                                   EnhancedMarkdownGenerator._date_range(job.get('start_date'), job.get('end_date'))) if d]
+            if details:
+                markdown_lines.append(f"*{' | '.join(details)}*")
+            markdown_lines.append("")
+
+            for point in job.get('responsibilities') or []:
+                markdown_lines.append(f"- {point}")
+            for achievement in job.get('key_achievements') or []:
+                markdown_lines.append(f"- **Achievement**: {achievement}")
+            if job.get('technologies_used'):
+                markdown_lines.append(f"- **Technologies**: {', '.join(job['technologies_used'])}")
+
+            markdown_lines.append("")
+
+        return '\n'.join(markdown_lines)
+
+    @staticmethod
+    def format_education_section(education: List[Dict[str, Any]]) -> str:
+        """
+        Formats degrees with institution, dates and optional academic details.
+        """
+        markdown_lines = ["## Education", ""]
+
+        for edu in education:
+            markdown_lines.append(f"### {edu.get('degree', '')} | {edu.get('institution', '')}")
+            details = [d for d in (edu.get('location'),
+                                   EnhancedMarkdownGenerator._date_range(edu.get('start_date'), edu.get('end_date'))) if d]
+            if details:
+                markdown_lines.append(f"*{' | '.join(details)}*")
+            markdown_lines.append("")
+
+            if edu.get('gpa'):
+                markdown_lines.append(f"- **GPA**: {edu['gpa']}")
+            if edu.get('relevant_coursework'):
+                markdown_lines.append(f"- **Relevant Coursework**: {', '.join(edu['relevant_coursework'])}")
+            for achievement in edu.get('achievements') or []:
+                markdown_lines.append(f"- {achievement}")
+
+            markdown_lines.append("")
+
+        return '\n'.join(markdown_lines)
+
+    @staticmethod
+    def format_skills_section(skills_categories: List[Dict[str, Any]]) -> str:
         """
         Formats the dynamic skills categories into Markdown.
         """
@@ -67,7 +224,8 @@ class EnhancedMarkdownGenerator:
         
         return '\n'.join(markdown_lines)
     
-    def format_project_section(self, projects: List[Dict[str, Any]]) -> str:
+    @staticmethod
+    def format_project_section(projects: List[Dict[str, Any]]) -> str:
         """
         Formats enhanced projects with detailed bullet points.
         """
@@ -81,13 +239,14 @@ class EnhancedMarkdownGenerator:
             markdown_lines.append(header)
             markdown_lines.append("")
             
-            # Brief description
-            if project.get('brief_description'):
-                markdown_lines.append(f"*{project['brief_description']}*")
+            # Brief description (plain 'description' for unenhanced projects)
+            brief_description = project.get('brief_description') or project.get('description')
+            if brief_description:
+                markdown_lines.append(f"*{brief_description}*")
                 markdown_lines.append("")
             
             # Detailed points
-            for point in project.get('detailed_points', []):
+            for point in project.get('detailed_points') or []:
                 markdown_lines.append(f"- {point}")
             
             # Technologies
@@ -95,9 +254,81 @@ class EnhancedMarkdownGenerator:
                 markdown_lines.append(f"- **Technologies**: {', '.join(project['technologies'])}")
             
             # Outcomes
-            for outcome in project.get('outcomes', []):
+            for outcome in project.get('outcomes') or []:
                 markdown_lines.append(f"- **Impact**: {outcome}")
             
             markdown_lines.append("")
         
-        return '\n'.join(markdown_lines) 
\ No newline at end of file
+        return '\n'.join(markdown_lines)
+
+    @staticmethod
+    def format_publications_section(publications: List[Dict[str, Any]]) -> str:
+        """
+        Formats publications as citation-style bullets.
+        """
+        markdown_lines = ["## Publications", ""]
+
+        for pub in publications:
+            title = f"[{pub['title']}]({pub['link']})" if pub.get('link') else pub.get('title', '')
+            citation = f"**{title}**"
+            if pub.get('authors'):
+                citation = f"{', '.join(pub['authors'])}. {citation}"
+            if pub.get('venue'):
+                citation += f", *{pub['venue']}*"
+            if pub.get('date'):
+                citation += f", {pub['date']}"
+            markdown_lines.append(f"- {citation}")
+
+        markdown_lines.append("")
+        return '\n'.join(markdown_lines)
+
+    @staticmethod
+    def format_certifications_section(certifications: List[Dict[str, Any]]) -> str:
+        """
+        Formats certifications with issuer and dates.
+        """
+        markdown_lines = ["## Certifications", ""]
+
+        for cert in certifications:
+            line = f"- **{cert.get('name', '')}**"
+            if cert.get('issuer'):
+                line += f" - {cert['issuer']}"
+            dates = EnhancedMarkdownGenerator._date_range(cert.get('date'), cert.get('expiry'))
+            if dates:
+                line += f" ({dates})"
+            if cert.get('credential_id'):
+                line += f" - Credential: {cert['credential_id']}"
+            markdown_lines.append(line)
+
+        markdown_lines.append("")
+        return '\n'.join(markdown_lines)
+
+    @staticmethod
+    def format_additional_sections(additional_sections: Dict[str, Any]) -> str:
+        """
+        Formats free-form custom sections, one level-2 header per section.
+        """
+        markdown_lines = []
+
+        for section_name, content in additional_sections.items():
+            if not content:
+                continue
+            markdown_lines.append(f"## {section_name.replace('_', ' ').title()}")
+            markdown_lines.append("")
+            if isinstance(content, str):
+                markdown_lines.append(content)
+            elif isinstance(content, dict):
+                for key, value in content.items():
+                    if isinstance(value, list):
+                        value = ', '.join(str(v) for v in value)
+                    markdown_lines.append(f"- **{key}**: {value}")
+            elif isinstance(content, list):
+                for item in content:
+                    if isinstance(item, dict):
+                        item = ' - '.join(str(v) for v in item.values() if v not in (None, '', []))
+                    markdown_lines.append(f"- {item}")
+            else:
+                markdown_lines.append(str(content))
+            markdown_lines.append("")
+
+        return '\n'.join(markdown_lines)
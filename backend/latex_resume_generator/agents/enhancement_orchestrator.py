@@ -0,0 +1,270 @@
+import asyncio
+import os
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, Dict, List
+
+from pydantic import TypeAdapter, ValidationError
+from rich import print
+
+from backend.latex_resume_generator.agents.resume_enhancer import ResumeEnhancer
+from backend.latex_resume_generator.schemas.enhanced_resume_schema import (
+    DynamicSkillCategory,
+    EnhancedProject,
+    EnhancedResumeSchema,
+    Education,
+    Experience,
+    PersonalInfo,
+)
+from backend.latex_resume_generator.utils.llm_cache import discard_replies_on_error, llm_cache_scope
+
+# Optional sections the model adds when the content calls for them; written together by one piece
+EXTRA_SECTIONS = ("publications", "certifications", "additional_sections")
+# Sections the fan-out produces
+FANOUT_SECTIONS = ("personal_info", "summary", "experience", "projects", "education", "skills") + EXTRA_SECTIONS
+
+
+class EnhancementOrchestrator:
+    """
+    Enhances a resume as many small model calls instead of one large one:
+    the summary, every experience entry, every project and the skill
+    categorization are separate pieces that run concurrently, at most
+    max_concurrency at a time per resume. Each piece is validated against its
+    sub-model of EnhancedResumeSchema and retried on its own when the call,
+    the JSON or the validation fails; a piece that keeps failing falls back to
+    the unenhanced content instead of failing the whole resume. Personal info
+    and education are carried over as they are. Publications, certifications
+    and additional sections are one piece written with the single-prompt
+    enhancer's instructions; when it fails, whatever the input had for them
+    is kept.
+
+    With fanout disabled every call goes to the single-prompt ResumeEnhancer.
+    """
+
+    def __init__(self, enhancer: ResumeEnhancer, fanout: bool = True, max_concurrency: int = 4, max_retries: int = 2):
+        self.enhancer = enhancer
+        self.fanout = fanout
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+
+    @classmethod
+    def from_env(cls, enhancer: ResumeEnhancer) -> "EnhancementOrchestrator":
+        return cls(
+            enhancer,
+            fanout=os.getenv("ENHANCE_FANOUT", "true").lower() == "true",
+            max_concurrency=int(os.getenv("ENHANCE_FANOUT_CONCURRENCY", "4")),
+            max_retries=int(os.getenv("ENHANCE_PIECE_RETRIES", "2")),
+        )
+
+    @staticmethod
+    def _role_context(basic_resume_data: Dict[str, Any]) -> str:
+        """A one-line description of the person, given to every piece."""
+        experience = basic_resume_data.get("experience") or []
+        parts = [f"{e.get('position')} at {e.get('company')}" for e in experience[:2] if e.get("position")]
+        if basic_resume_data.get("summary"):
+            parts.append(basic_resume_data["summary"])
+        return "; ".join(parts) or "Professional"
+
+    async def _run_piece(
+        self,
+        name: str,
+        semaphore: asyncio.Semaphore,
+        call: Callable[[], Awaitable[Any]],
+        build: Callable[[Any], Any],
+        fallback: Callable[[], Any],
+    ) -> Any:
+        """Calls the model for one piece and validates it, retrying only this piece on failure."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                # A retry must reach the model; the cache would hand back the reply that just failed
+                with llm_cache_scope(False) if attempt else nullcontext(), discard_replies_on_error():
+                    async with semaphore:
+                        result = await call()
+                    return build(result)
+            except Exception as e:  # model errors, malformed JSON and schema violations alike
+                error = e
+            if attempt < self.max_retries:
+                print(f"[bold yellow]Retrying {name} ({attempt + 1}/{self.max_retries}):[/bold yellow] {error}")
+                await asyncio.sleep(0.5 * (attempt + 1))
+        print(f"[bold yellow]Keeping the original {name}, enhancement failed:[/bold yellow] {error}")
+        return fallback()
+
+    def _summary_piece(self, basic_resume_data: Dict[str, Any], semaphore: asyncio.Semaphore) -> Awaitable[str]:
+        def build(result: Dict[str, Any]) -> str:
+            summary = result["summary"]
+            if not isinstance(summary, str) or not summary.strip():
+                raise ValueError("empty summary")
+            return summary.strip()
+
+        return self._run_piece(
+            "summary", semaphore,
+            lambda: self.enhancer.aenhance_summary(basic_resume_data),
+            build,
+            lambda: basic_resume_data.get("summary") or "",
+        )
+
+    def _experience_piece(self, experience: Dict[str, Any], role_context: str, semaphore: asyncio.Semaphore) -> Awaitable[Dict[str, Any]]:
+        def build(result: Dict[str, Any]) -> Dict[str, Any]:
+            fields = ("responsibilities", "technologies_used", "key_achievements")
+            return Experience.model_validate({**experience, **{k: result.get(k) for k in fields}}).model_dump()
+
+        return self._run_piece(
+            f"experience at {experience.get('company')}", semaphore,
+            lambda: self.enhancer.aenhance_experience(experience, role_context),
+            build,
+            lambda: Experience.model_validate(experience).model_dump(),
+        )
+
+    def _project_piece(self, project: Dict[str, Any], semaphore: asyncio.Semaphore) -> Awaitable[Dict[str, Any]]:
+        base = {"name": project.get("name"), "technologies": project.get("technologies") or []}
+
+        def build(result: Dict[str, Any]) -> Dict[str, Any]:
+            fields = ("brief_description", "detailed_points", "outcomes")
+            return EnhancedProject.model_validate({**base, **{k: result.get(k) for k in fields}}).model_dump()
+
+        def fallback() -> Dict[str, Any]:
+            description = project.get("description") or ""
+            return EnhancedProject.model_validate({
+                **base, "brief_description": description, "detailed_points": [description] if description else [],
+            }).model_dump()
+
+        return self._run_piece(
+            f"project {project.get('name')}", semaphore,
+            lambda: self.enhancer.aenhance_project_description(
+                project.get("name"), project.get("description") or "", project.get("technologies") or []
+            ),
+            build,
+            fallback,
+        )
+
+    @staticmethod
+    def _skill_groups(skills: Any) -> Dict[str, List[str]]:
+        """
+        Normalizes the parsed skills to technical and soft lists. Besides the
+        parser's {"technical": [...], "soft": [...]} this accepts a plain list
+        of skills (treated as technical), a list of {"category", "skills"}
+        groups and comma-separated strings.
+        """
+        def names(value: Any) -> List[str]:
+            if isinstance(value, str):
+                return [item.strip() for item in value.split(",") if item.strip()]
+            if isinstance(value, dict):
+                return names(value.get("skills"))
+            if isinstance(value, (list, tuple)):
+                return [name for item in value for name in names(item)]
+            return []
+
+        if isinstance(skills, dict):
+            return {"technical": names(skills.get("technical")), "soft": names(skills.get("soft"))}
+        return {"technical": names(skills), "soft": []}
+
+    def _skills_piece(self, skills: Any, role_context: str, semaphore: asyncio.Semaphore) -> Awaitable[List[Dict[str, Any]]]:
+        skills = self._skill_groups(skills)
+        flat = list(dict.fromkeys(skills["technical"] + skills["soft"]))
+
+        def build(result: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            if not isinstance(result, list):
+                raise ValueError("expected a list of skill categories")
+            categories = [DynamicSkillCategory.model_validate(c).model_dump() for c in result]
+            # Keep skills the model dropped rather than losing them from the resume
+            placed = {skill.lower() for c in categories for skill in c["skills"]}
+            missing = [skill for skill in flat if skill.lower() not in placed]
+            if missing:
+                categories.append(DynamicSkillCategory(category_name="Additional Skills", skills=missing).model_dump())
+            return categories
+
+        def fallback() -> List[Dict[str, Any]]:
+            groups = (("Technical Skills", skills["technical"]), ("Soft Skills", skills["soft"]))
+            return [DynamicSkillCategory(category_name=name, skills=items).model_dump() for name, items in groups if items]
+
+        if not flat:
+            return self._constant([])
+        return self._run_piece(
+            "skills", semaphore,
+            lambda: self.enhancer.acategorize_skills(flat, role_context),
+            build,
+            fallback,
+        )
+
+    @staticmethod
+    def _carried_over(basic_resume_data: Dict[str, Any], name: str) -> Any:
+        """The input's value for an optional section, validated against its schema field, or None."""
+        value = basic_resume_data.get(name)
+        if not value:
+            return None
+        adapter = TypeAdapter(EnhancedResumeSchema.model_fields[name].annotation)
+        try:
+            return adapter.dump_python(adapter.validate_python(value))
+        except ValidationError:
+            return None
+
+    def _extras_piece(self, basic_resume_data: Dict[str, Any], sections: List[str], semaphore: asyncio.Semaphore) -> Awaitable[Dict[str, Any]]:
+        def build(result: Dict[str, Any]) -> Dict[str, Any]:
+            # Keep what the input already had when the model leaves a section out
+            return {name: result.get(name) or self._carried_over(basic_resume_data, name) for name in sections}
+
+        return self._run_piece(
+            ", ".join(sections), semaphore,
+            lambda: self.enhancer.aenhance_sections(basic_resume_data, sections),
+            build,
+            lambda: {name: self._carried_over(basic_resume_data, name) for name in sections},
+        )
+
+    @staticmethod
+    async def _constant(value: Any) -> Any:
+        return value
+
+    async def aenhance_sections(self, basic_resume_data: Dict[str, Any], sections: List[str]) -> Dict[str, Any]:
+        """Enhances only the given top-level sections and returns them as a partial enhanced resume."""
+        if not self.fanout:
+            return await self.enhancer.aenhance_sections(basic_resume_data, sections)
+
+        print(f"[bold blue]Enhancing resume sections {', '.join(sections)} in parallel...[/bold blue]")
+        try:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            role_context = self._role_context(basic_resume_data)
+            pieces: Dict[str, Awaitable[Any]] = {}
+            if "personal_info" in sections:
+                info = basic_resume_data.get("personal_info") or {}
+                pieces["personal_info"] = self._constant(PersonalInfo.model_validate(info).model_dump())
+            if "summary" in sections:
+                pieces["summary"] = self._summary_piece(basic_resume_data, semaphore)
+            if "experience" in sections:
+                pieces["experience"] = asyncio.gather(*(
+                    self._experience_piece(e, role_context, semaphore) for e in basic_resume_data.get("experience") or []
+                ))
+            if "projects" in sections:
+                pieces["projects"] = asyncio.gather(*(
+                    self._project_piece(p, semaphore) for p in basic_resume_data.get("projects") or []
+                ))
+            if "education" in sections:
+                pieces["education"] = self._constant([
+                    Education.model_validate(e).model_dump() for e in basic_resume_data.get("education") or []
+                ])
+            if "skills" in sections:
+                pieces["skills"] = self._skills_piece(basic_resume_data.get("skills") or {}, role_context, semaphore)
+            extras = [name for name in EXTRA_SECTIONS if name in sections]
+            if extras:
+                pieces["extras"] = self._extras_piece(basic_resume_data, extras, semaphore)
+
+            results = await asyncio.gather(*pieces.values())
+            enhanced_data = {name: list(value) if isinstance(value, (list, tuple)) else value
+                             for name, value in zip(pieces, results)}
+            enhanced_data.update(enhanced_data.pop("extras", {}))
+
+            print("[bold green]Successfully enhanced resume sections![/bold green]")
+            return enhanced_data
+
+        except Exception as e:
+            print(f"[bold red]Error enhancing resume sections:[/bold red] {e}")
+            raise
+
+    async def aenhance(self, basic_resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enhances the whole resume, piece by piece, and merges the pieces into
+        a validated EnhancedResumeSchema dict.
+        """
+        if not self.fanout:
+            return await self.enhancer.aenhance(basic_resume_data)
+
+        partial = await self.aenhance_sections(basic_resume_data, list(FANOUT_SECTIONS))
+        return EnhancedResumeSchema.model_validate(partial).model_dump()
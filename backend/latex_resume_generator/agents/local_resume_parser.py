@@ -0,0 +1,425 @@
+import os
+import re
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+from rich import print
+
+from backend.latex_resume_generator.schemas.resume_schema import ResumeSchema
+from backend.latex_resume_generator.utils.concurrency import stage_slot
+from backend.latex_resume_generator.utils.sections import OTHER_SECTIONS, SECTION_ALIASES
+
+if TYPE_CHECKING:
+    from backend.latex_resume_generator.agents.resume_parser import ResumeParser
+
+# Heading text mapped to its section; the other headings only end the section before them
+_HEADINGS = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+_HEADINGS.update({alias: "other" for alias in OTHER_SECTIONS})
+
+# Share of the overall confidence carried by each section
+SECTION_WEIGHTS = {
+    "personal_info": 0.3,
+    "experience": 0.25,
+    "education": 0.15,
+    "skills": 0.15,
+    "projects": 0.1,
+    "summary": 0.05,
+}
+# Sections scoring below this are handed to the LLM
+SECTION_RESOLVED_SCORE = 0.8
+# Extracted lines at least this long are assumed to have wrapped at the margin
+WRAPPED_LINE_CHARS = 70
+
+_MONTH = (r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?'
+          r'|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?')
+_DATE = rf'(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|(?:Spring|Summer|Fall|Autumn|Winter)\s+\d{{4}}|\d{{4}})'
+DATE_RANGE_RE = re.compile(rf'({_DATE})\s*(?:–|—|‒|-|to)\s*({_DATE}|Present|Current|Now|Ongoing)', re.I)
+SINGLE_DATE_RE = re.compile(rf'(?:Expected\s+)?({_DATE})', re.I)
+
+BULLET_RE = re.compile(r'^[•●◦▪▫■□‣⁃∙·\-*–]\s*')
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_RE = re.compile(r'\+?\(?\d[\d\s().-]{6,}\d')
+LINKEDIN_RE = re.compile(r'(?:https?://)?(?:www\.)?linkedin\.com/[^\s|,]+', re.I)
+GITHUB_RE = re.compile(r'(?:https?://)?(?:www\.)?github\.com/[^\s|,]+', re.I)
+LOCATION_RE = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*(?:[A-Z]{2}|[A-Z][a-z]+(?:\s[A-Z][a-z]+)*)$")
+# A trailing "City, ST" on an entry heading (right-aligned in most templates)
+# A location is only stripped after a separator, so the last words of "Massachusetts Institute of Technology" stay put
+TRAILING_LOCATION_RE = re.compile(
+    r'(?:^|\s*[|,•·]\s*|\s+[—–-]\s+|\s{2,}|\t)'
+    r'(?:(?:[A-Z][a-z]+\s)?[A-Z][a-z]+,\s*(?:[A-Z]{2}|[A-Z][a-z]+)|Remote)\s*$')
+HEADER_SEPARATOR_RE = re.compile(r'\s*[|•·⋄◇]\s*|\s+[—–]\s+|\s{2,}')
+ITEM_SEPARATOR_RE = re.compile(r'\s*[,•·|;]\s*')
+TECH_LINE_RE = re.compile(r'^(?:Tools|Tech(?:nologies)?|Tech Stack|Built with|Stack)\s*[:\-–]\s*', re.I)
+
+TITLE_RE = re.compile(
+    r'\b(?:Engineer|Developer|Intern|Manager|Analyst|Assistant|Scientist|Consultant|Lead|Director|Designer'
+    r'|Researcher|Architect|Specialist|Administrator|Officer|Associate|Coordinator|Head|Founder|Co-Founder'
+    r'|Teacher|Instructor|Fellow|Programmer|Technician|President|VP|CTO|CEO|Representative|Tutor|Contributor'
+    r'|Member|Volunteer|Trainee|Apprentice|Editor|Writer)\b', re.I)
+INSTITUTION_RE = re.compile(r'\b(?:University|College|Institute|School|Academy|Polytechnic|Universidad|Université)\b', re.I)
+DEGREE_RE = re.compile(
+    r'\b(?:Bachelor|Master|B\.?\s?S\.?c?|B\.?A\.?|B\.?E\.?|B\.?Tech|M\.?S\.?c?|M\.?A\.?|M\.?Eng|M\.?Tech|MBA'
+    r'|Ph\.?\s?D|Doctor|Associate|Diploma|High School)\b')
+SOFT_SKILLS_RE = re.compile(r'soft|interpersonal|personal|leadership', re.I)
+
+
+class LocalParseResult(BaseModel):
+    """Outcome of a local parse: ResumeSchema data plus how far it can be trusted."""
+    data: Dict[str, Any]
+    confidence: float
+    section_scores: Dict[str, float]
+    unresolved: List[str]
+    section_text: Dict[str, str]
+
+    def handoff_text(self) -> str:
+        """
+        The resume text the LLM needs to fill the unresolved sections: the
+        header block plus those sections. When an unresolved section was never
+        located, the whole text is needed.
+        """
+        if any(not self.section_text.get(name) for name in self.unresolved if name != "personal_info"):
+            return self.section_text["full"]
+        parts = [self.section_text["personal_info"]]
+        parts.extend(self.section_text[name] for name in self.unresolved if name != "personal_info")
+        return "\n\n".join(part for part in parts if part)
+
+
+def _heading_key(line: str) -> Optional[str]:
+    text = line.strip().rstrip(":").strip()
+    if len(text.split()) > 5 and not re.fullmatch(r'(?:[A-Za-z&]\s)+[A-Za-z&]', text):
+        return None
+    if re.fullmatch(r'(?:[A-Za-z&]\s)+[A-Za-z&]', text):
+        text = text.replace(" ", "")  # letter-spaced headings, e.g. "E X P E R I E N C E"
+    text = re.sub(r'\s+', ' ', text.lower().replace("&", "and"))
+    return _HEADINGS.get(text)
+
+
+def _is_bullet(line: str) -> bool:
+    # A leading hyphen directly followed by a digit is a negative number or a range, not a bullet
+    return bool(BULLET_RE.match(line)) and not re.match(r'^-\d', line)
+
+
+def _strip_bullet(line: str) -> str:
+    return BULLET_RE.sub("", line, count=1).strip()
+
+
+def _take_dates(text: str) -> Tuple[str, str, str]:
+    """Removes the first date range (or single date) from text and returns (rest, start, end)."""
+    match = DATE_RANGE_RE.search(text)
+    if match:
+        return (text[:match.start()] + " " + text[match.end():]).strip(), match.group(1), match.group(2)
+    match = SINGLE_DATE_RE.search(text)
+    if match:
+        return (text[:match.start()] + " " + text[match.end():]).strip(), "", match.group(1)
+    return text, "", ""
+
+
+def _clean(text: str) -> str:
+    text = TRAILING_LOCATION_RE.sub("", text)
+    return re.sub(r'\s+', ' ', text).strip(" |,–—-")
+
+
+def _split_items(text: str) -> List[str]:
+    return [item.strip().rstrip(".") for item in ITEM_SEPARATOR_RE.split(text) if item.strip().rstrip(".")]
+
+
+def _starts_entry(line: str, previous_line: str) -> bool:
+    """Whether a non-bullet line after bullets opens a new entry rather than continuing a wrapped bullet."""
+    if line[:1].islower():
+        return False
+    if DATE_RANGE_RE.search(line) or "|" in line:
+        return True
+    # Only a line that ran to the right margin wraps onto the next one
+    return len(previous_line) < WRAPPED_LINE_CHARS or previous_line.rstrip().endswith(('.', '!', '?'))
+
+
+def _group_entries(lines: List[str]) -> List[Dict[str, List[str]]]:
+    """Groups section lines into entries of heading lines followed by bullets."""
+    entries: List[Dict[str, List[str]]] = []
+    for i, line in enumerate(lines):
+        current = entries[-1] if entries else None
+        if _is_bullet(line):
+            if current is None:
+                current = {"heading": [], "bullets": []}
+                entries.append(current)
+            current["bullets"].append(_strip_bullet(line))
+            continue
+        if current and current["bullets"]:
+            if _starts_entry(line, lines[i - 1]):
+                entries.append({"heading": [line], "bullets": []})
+            else:
+                current["bullets"][-1] += " " + line
+        elif current and len(current["heading"]) < 3 and not (
+            DATE_RANGE_RE.search(line) and any(DATE_RANGE_RE.search(h) for h in current["heading"])
+        ):
+            current["heading"].append(line)
+        else:
+            entries.append({"heading": [line], "bullets": []})
+    return entries
+
+
+class LocalResumeParser:
+    """
+    Fills ResumeSchema from resume text with section headings and regular
+    expressions, without calling the LLM. Works well on single-column resumes
+    with conventional headings, including the PDFs produced from our own
+    jakes_resume and deedy_resume templates. Every section gets a score in
+    [0, 1] and the overall confidence is their weighted mean; sections that
+    score below SECTION_RESOLVED_SCORE are reported as unresolved so only
+    they need to go to ResumeParser (see strategy()).
+    """
+
+    def __init__(self, min_hybrid_confidence: float = 0.5):
+        self.min_hybrid_confidence = min_hybrid_confidence
+
+    @classmethod
+    def from_env(cls) -> "LocalResumeParser":
+        return cls(
+            min_hybrid_confidence=float(os.getenv("LOCAL_PARSE_MIN_HYBRID_CONFIDENCE", "0.5")),
+        )
+
+    # --- Sections ---
+    @staticmethod
+    def split_sections(text: str) -> Tuple[List[str], Dict[str, List[str]], Dict[str, str]]:
+        """Returns the header lines, the lines of each canonical section and each section's raw text."""
+        header: List[str] = []
+        sections: Dict[str, List[str]] = {}
+        raw: Dict[str, List[str]] = {}
+        current: Optional[str] = None
+        for line in (re.sub(r'\s+', ' ', line).strip() for line in text.splitlines()):
+            if not line:
+                continue
+            key = _heading_key(line)
+            if key is not None:
+                current = key
+                raw.setdefault(key, []).append(line)
+                continue
+            if current is None:
+                header.append(line)
+            else:
+                sections.setdefault(current, []).append(line)
+                raw[current].append(line)
+        sections.pop("other", None)
+        raw.pop("other", None)
+        return header, sections, {name: "\n".join(lines) for name, lines in raw.items()}
+
+    @staticmethod
+    def parse_header(lines: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Extracts personal_info from the header block; returns it with the lines left over."""
+        info: Dict[str, Any] = {"name": "", "email": "", "phone": "", "location": "",
+                                "linkedin_url": None, "github_url": None}
+        leftover = []
+        for line in lines:
+            used = False
+            for token in HEADER_SEPARATOR_RE.split(line):
+                token = token.strip()
+                if not token:
+                    continue
+                if EMAIL_RE.search(token) and not info["email"]:
+                    info["email"] = EMAIL_RE.search(token).group()
+                elif LINKEDIN_RE.search(token):
+                    info["linkedin_url"] = info["linkedin_url"] or LINKEDIN_RE.search(token).group()
+                elif GITHUB_RE.search(token):
+                    info["github_url"] = info["github_url"] or GITHUB_RE.search(token).group()
+                elif PHONE_RE.fullmatch(token) and len(re.sub(r'\D', '', token)) >= 7 and not info["phone"]:
+                    info["phone"] = token
+                elif LOCATION_RE.match(token) and not info["location"]:
+                    info["location"] = token
+                elif (not info["name"] and not re.search(r'[\d@/]', token)
+                      and 1 < len(token.split()) <= 5 and not token[:1].islower()):
+                    info["name"] = token
+                else:
+                    continue
+                used = True
+            if not used:
+                leftover.append(line)
+        return info, leftover
+
+    @staticmethod
+    def parse_experience(lines: List[str]) -> List[Dict[str, Any]]:
+        jobs = []
+        for entry in _group_entries(lines):
+            heading, start, end = _take_dates(" | ".join(entry["heading"]))
+            parts = [_clean(part) for part in re.split(r'\s*\|\s*|\s+[–—]\s+', heading)]
+            parts = [part for part in parts if part]
+            if len(parts) == 1 and re.search(r'\s+at\s+', parts[0]):
+                parts = re.split(r'\s+at\s+', parts[0], maxsplit=1)
+            # Without a recognisable job title, "Company | Position" on one line is the common
+            # layout; on separate lines (jakes_resume) the position comes first
+            same_line = bool(entry["heading"]) and "|" in entry["heading"][0] and len(parts) > 1
+            default = parts[1] if same_line else (parts[0] if parts else "")
+            position = next((part for part in parts if TITLE_RE.search(part)), default)
+            company = next((part for part in parts if part != position), "")
+            jobs.append({
+                "company": company,
+                "position": position,
+                "start_date": start,
+                "end_date": end,
+                "responsibilities": entry["bullets"],
+            })
+        return jobs
+
+    @staticmethod
+    def parse_projects(lines: List[str]) -> List[Dict[str, Any]]:
+        projects = []
+        for entry in _group_entries(lines):
+            heading, _, _ = _take_dates(" ".join(entry["heading"]))
+            parts = [part.strip() for part in heading.split("|") if part.strip()]
+            technologies = _split_items(parts[1]) if len(parts) > 1 else []
+            description = []
+            for bullet in entry["bullets"]:
+                if TECH_LINE_RE.match(bullet):
+                    technologies.extend(_split_items(TECH_LINE_RE.sub("", bullet)))
+                else:
+                    description.append(bullet)
+            projects.append({
+                "name": parts[0] if parts else "",
+                "description": " ".join(description),
+                "technologies": technologies,
+            })
+        return projects
+
+    @staticmethod
+    def parse_education(lines: List[str]) -> List[Dict[str, Any]]:
+        schools: List[Dict[str, Any]] = []
+        for line in lines:
+            if _is_bullet(line):
+                continue  # GPA, coursework and honours are not part of ResumeSchema
+            text, start, end = _take_dates(line)
+            text = TRAILING_LOCATION_RE.sub("", text)
+            current = schools[-1] if schools else None
+            if INSTITUTION_RE.search(text):
+                parts = [p for p in re.split(r'\s*[,|]\s*|\s+[–—-]\s+', text) if p]
+                institution = next((p for p in parts if INSTITUTION_RE.search(p)), text)
+                degree = ", ".join(p for p in parts if p != institution and DEGREE_RE.search(p))
+                if current is None or current["institution"]:
+                    current = {"institution": "", "degree": "", "start_date": "", "end_date": ""}
+                    schools.append(current)
+                current["institution"] = _clean(institution)
+                current["degree"] = current["degree"] or degree
+            elif DEGREE_RE.search(text):
+                if current is None or current["degree"]:
+                    current = {"institution": "", "degree": "", "start_date": "", "end_date": ""}
+                    schools.append(current)
+                current["degree"] = _clean(text)
+            elif current is None:
+                continue
+            if current is not None and (start or end) and not current["end_date"]:
+                current["start_date"], current["end_date"] = start, end
+        return schools
+
+    @staticmethod
+    def parse_skills(lines: List[str]) -> Dict[str, List[str]]:
+        skills: Dict[str, List[str]] = {"technical": [], "soft": []}
+        category = ""
+        for line in lines:
+            line = _strip_bullet(line) if _is_bullet(line) else line
+            prefix, sep, rest = line.partition(":")
+            if sep and len(prefix.split()) <= 4:
+                category, items = prefix, _split_items(rest)
+            elif ITEM_SEPARATOR_RE.search(line):
+                items = _split_items(line)
+            elif len(line.split()) <= 4:
+                category = line  # a category heading whose items follow on the next line
+                continue
+            else:
+                items = _split_items(line)
+            target = "soft" if SOFT_SKILLS_RE.search(category) else "technical"
+            skills[target].extend(item for item in items if item not in skills[target])
+        return skills
+
+    # --- Scoring ---
+    @staticmethod
+    def _entry_score(entries: List[Dict[str, Any]], fields: Tuple[str, ...]) -> float:
+        if not entries:
+            return 0.0
+        return sum(sum(1 for f in fields if entry.get(f)) / len(fields) for entry in entries) / len(entries)
+
+    def score(self, data: Dict[str, Any], located: Dict[str, bool]) -> Dict[str, float]:
+        info = data["personal_info"]
+        scores = {"personal_info": sum(1 for f in ("name", "email", "phone", "location") if info[f]) / 4}
+        # A missing summary or projects section is normal; missing experience, education or skills is not
+        scores["summary"] = 1.0 if data["summary"] or not located["summary"] else 0.0
+        scores["projects"] = self._entry_score(data["projects"], ("name", "description")) if located["projects"] else 1.0
+        scores["experience"] = self._entry_score(
+            data["experience"], ("company", "position", "start_date", "end_date", "responsibilities"))
+        scores["education"] = self._entry_score(data["education"], ("institution", "degree", "end_date"))
+        # Skills are short items; sentences mean the section was not a list
+        items = data["skills"]["technical"] + data["skills"]["soft"]
+        scores["skills"] = sum(1 for item in items if len(item.split()) <= 4) / len(items) if items else 0.0
+        return scores
+
+    # --- Entry point ---
+    def parse(self, resume_text: str) -> LocalParseResult:
+        """Parses resume text into ResumeSchema data with per-section confidence."""
+        header, sections, section_text = self.split_sections(resume_text)
+        personal_info, leftover = self.parse_header(header)
+        summary_lines = sections.get("summary") or [line for line in leftover if len(line.split()) > 8]
+        data = {
+            "personal_info": personal_info,
+            "summary": " ".join(summary_lines),
+            "experience": self.parse_experience(sections.get("experience", [])),
+            "projects": self.parse_projects(sections.get("projects", [])),
+            "education": self.parse_education(sections.get("education", [])),
+            "skills": self.parse_skills(sections.get("skills", [])),
+        }
+        data = ResumeSchema.model_validate(data).model_dump()
+
+        located = {name: name in sections for name in SECTION_ALIASES}
+        scores = self.score(data, located)
+        confidence = sum(SECTION_WEIGHTS[name] * value for name, value in scores.items())
+        section_text["personal_info"] = "\n".join(header)
+        section_text["full"] = resume_text
+        return LocalParseResult(
+            data=data,
+            confidence=round(confidence, 3),
+            section_scores={name: round(value, 3) for name, value in scores.items()},
+            unresolved=[name for name in SECTION_WEIGHTS if scores[name] < SECTION_RESOLVED_SCORE],
+            section_text=section_text,
+        )
+
+    def strategy(self, result: LocalParseResult) -> str:
+        """
+        'local' when every section was resolved, 'hybrid' when only the
+        unresolved sections should go to the LLM, 'llm' when too little was
+        recognised for a partial parse to be worth it.
+        """
+        if not result.unresolved:
+            return "local"
+        if result.confidence >= self.min_hybrid_confidence:
+            return "hybrid"
+        return "llm"
+
+    async def aparse_resume(
+        self, resume_text: str, llm_parser: Callable[[], "ResumeParser"], parse_mode: str = "auto"
+    ) -> Tuple[Dict[str, Any], str, Optional[float]]:
+        """
+        Turns resume text into ResumeSchema data. In auto mode the local parse
+        runs first: a fully resolved result is used as is, a partial one has
+        only its unresolved sections parsed by the LLM. llm_parser is called
+        only when the LLM is needed, so a missing API key fails only those
+        parses. Returns the data, its source (local, hybrid or llm) and the
+        local parser's confidence.
+        """
+        confidence = None
+        if parse_mode == "auto":
+            local = self.parse(resume_text)
+            confidence = local.confidence
+            strategy = self.strategy(local)
+            print(f"Local parse confidence {local.confidence:.2f}; unresolved: {', '.join(local.unresolved) or 'none'}")
+            if strategy == "local":
+                return local.data, "local", confidence
+            if strategy == "hybrid":
+                parser = llm_parser()
+                async with stage_slot("llm_parse"):
+                    partial = await parser.aparse_sections(local.handoff_text(), local.unresolved)
+                try:
+                    merged = ResumeSchema.model_validate({**local.data, **partial}).model_dump()
+                    return merged, "hybrid", confidence
+                except ValidationError as e:
+                    print(f"[bold yellow]Merging the partial parse failed, parsing the whole resume:[/bold yellow] {e}")
+
+        parser = llm_parser()
+        async with stage_slot("llm_parse"):
+            parsed_data = await parser.aparse(resume_text)
+        return parsed_data, "llm", confidence
@@ -0,0 +1,45 @@
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from backend.latex_resume_generator.agents.resume_parser import ResumeParser
+from backend.latex_resume_generator.agents.resume_enhancer import ResumeEnhancer
+from backend.latex_resume_generator.agents.enhancement_orchestrator import EnhancementOrchestrator
+from backend.latex_resume_generator.agents.enhanced_markdown_generator import EnhancedMarkdownGenerator
+from backend.latex_resume_generator.agents.enhanced_latex_generator import EnhancedLaTeXGenerator
+from backend.latex_resume_generator.utils.metrics import LLMMetricsHandler
+from backend.latex_resume_generator.utils.template_registry import TemplateRegistry
+
+
+class AgentRegistry:
+    """
+    Holds one long-lived instance of every agent used by the API.
+
+    Constructing a ChatGoogleGenerativeAI client calls genai.configure(), which
+    resets the library's shared gRPC clients, and every agent re-reads its prompt
+    files and re-renders format instructions. Building the agents once at startup
+    keeps those connections pooled and leaves only the model call per request.
+    """
+
+    def __init__(self, api_key: str, template_registry: Optional[TemplateRegistry] = None):
+        self.api_key = api_key
+        self.templates = template_registry or TemplateRegistry()
+        self.parser = ResumeParser(api_key=api_key)
+        self.enhancer = ResumeEnhancer(api_key=api_key)
+        self.enhancement = EnhancementOrchestrator.from_env(self.enhancer)
+        self.markdown_generator = EnhancedMarkdownGenerator(api_key=api_key)
+        self.latex_generator = EnhancedLaTeXGenerator(api_key=api_key, template_registry=self.templates)
+        # Each agent's model reports its calls, latency and tokens to /metrics
+        for name, agent in (("parse", self.parser), ("enhance", self.enhancer),
+                            ("markdown", self.markdown_generator), ("latex", self.latex_generator)):
+            agent.model.callbacks = [LLMMetricsHandler(name)]
+
+    @classmethod
+    def from_env(cls, dotenv_path: Optional[str] = None, template_registry: Optional[TemplateRegistry] = None) -> Optional["AgentRegistry"]:
+        """Builds the registry from API_KEY, or returns None when no key is configured."""
+        load_dotenv(dotenv_path=dotenv_path)
+        api_key = os.getenv("API_KEY")
+        if not api_key:
+            return None
+        return cls(api_key=api_key, template_registry=template_registry)
@@ -1,13 +1,15 @@
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from rich import print
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import create_model
 
 from backend.latex_resume_generator.schemas.enhanced_resume_schema import EnhancedResumeSchema
+from backend.latex_resume_generator.utils.llm_cache import discard_replies_on_error
 
 
 class ResumeEnhancer:
@@ -43,6 +45,24 @@ class ResumeEnhancer:
         
         # Create the chain
         self.chain = self.prompt | self.model | self.parser
+        self.template = template
+        self._section_chains: Dict[Tuple[str, ...], Any] = {}
+    
+    def _section_chain(self, sections: List[str]):
+        """Builds (once per combination) a chain whose output schema holds only the given sections."""
+        key = tuple(sorted(sections))
+        if key not in self._section_chains:
+            fields = {
+                name: (EnhancedResumeSchema.model_fields[name].annotation, EnhancedResumeSchema.model_fields[name])
+                for name in key
+            }
+            parser = PydanticOutputParser(pydantic_object=create_model("PartialEnhancedResumeSchema", **fields))
+            prompt = ChatPromptTemplate.from_template(
+                self.template,
+                partial_variables={"format_instructions": parser.get_format_instructions()}
+            )
+            self._section_chains[key] = prompt | self.model | parser
+        return self._section_chains[key]
     
     def enhance(self, basic_resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -58,9 +78,11 @@ class ResumeEnhancer:
         
         try:
             # Run the enhancement chain
-            enhanced_resume = self.chain.invoke({
-                "basic_resume_json": json.dumps(basic_resume_data, indent=2)
-            })
+            # A reply the parser rejects must not be replayed from the LLM cache
+            with discard_replies_on_error():
+                enhanced_resume = self.chain.invoke({
+                    "basic_resume_json": json.dumps(basic_resume_data, indent=2)
+                })
             
             # Convert to dict
             enhanced_data = enhanced_resume.model_dump()
@@ -72,11 +94,59 @@ class ResumeEnhancer:
             print(f"[bold red]Error enhancing resume:[/bold red] {e}")
             raise
     
-    def enhance_project_description(self, project_name: str, brief_idea: str, technologies: List[str]) -> Dict[str, Any]:
+    async def aenhance(self, basic_resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Takes a minimal project description and expands it intelligently.
+        Async variant of enhance that awaits the model without blocking the event loop.
         """
-        prompt = f"""
+        print("[bold blue]Enhancing resume content with AI...[/bold blue]")
+        
+        try:
+            with discard_replies_on_error():
+                enhanced_resume = await self.chain.ainvoke({
+                    "basic_resume_json": json.dumps(basic_resume_data, indent=2)
+                })
+            enhanced_data = enhanced_resume.model_dump()
+            
+            print("[bold green]Successfully enhanced resume content![/bold green]")
+            return enhanced_data
+            
+        except Exception as e:
+            print(f"[bold red]Error enhancing resume:[/bold red] {e}")
+            raise
+    
+    async def aenhance_sections(self, basic_resume_data: Dict[str, Any], sections: List[str]) -> Dict[str, Any]:
+        """
+        Enhances only the given top-level sections (e.g. ["experience"]). The whole
+        resume is still sent as context, but the model writes just those sections.
+        """
+        print(f"[bold blue]Enhancing resume sections {', '.join(sections)} with AI...[/bold blue]")
+        
+        try:
+            with discard_replies_on_error():
+                enhanced = await self._section_chain(sections).ainvoke({
+                    "basic_resume_json": json.dumps(basic_resume_data, indent=2)
+                })
+            enhanced_data = enhanced.model_dump()
+            
+            print("[bold green]Successfully enhanced resume sections![/bold green]")
+            return enhanced_data
+            
+        except Exception as e:
+            print(f"[bold red]Error enhancing resume sections:[/bold red] {e}")
+            raise
+    
+    @staticmethod
+    def _load_json(content: str) -> Any:
+        """Parses a JSON reply, tolerating a surrounding ```json code fence."""
+        text = content.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+            text = text.rsplit("```", 1)[0]
+        return json.loads(text)
+    
+    @staticmethod
+    def _project_prompt(project_name: str, brief_idea: str, technologies: List[str]) -> str:
+        return f"""
         Given this project information:
         - Name: {project_name}
         - Brief idea: {brief_idea}
@@ -94,16 +164,10 @@ class ResumeEnhancer:
         Use crisp, professional language with action verbs. Be specific about technical details.
         Format as JSON with keys: brief_description, detailed_points, outcomes
         """
-        
-        response = self.model.invoke(prompt)
-        return json.loads(response.content)
     
-    def categorize_skills(self, skills_list: List[str], role_context: str) -> List[Dict[str, Any]]:
-        """
-        Takes a flat list of skills and organizes them into intelligent categories
-        based on the role context.
-        """
-        prompt = f"""
+    @staticmethod
+    def _skills_prompt(skills_list: List[str], role_context: str) -> str:
+        return f"""
         Given this list of skills: {', '.join(skills_list)}
         And this role context: {role_context}
         
@@ -123,6 +187,71 @@ class ResumeEnhancer:
         
         Make sure every skill is categorized appropriately.
         """
+    
+    @staticmethod
+    def _experience_prompt(experience: Dict[str, Any], role_context: str) -> str:
+        return f"""
+        Given this work experience:
+        {json.dumps(experience, indent=2)}
+        And this role context: {role_context}
+        
+        Rewrite it for a resume. Include:
+        1. 3-5 responsibilities as crisp bullet points starting with action verbs
+        2. The technologies used in this role, taken from the text above
+        3. Quantifiable achievements, only where the text supports them
+        
+        Do not invent employers, titles, dates or technologies.
+        Format as JSON with keys: responsibilities, technologies_used, key_achievements
+        """
+    
+    @staticmethod
+    def _summary_prompt(basic_resume_data: Dict[str, Any]) -> str:
+        return f"""
+        Given this resume:
+        {json.dumps(basic_resume_data, indent=2)}
         
-        response = self.model.invoke(prompt)
-        return json.loads(response.content) 
\ No newline at end of file
+        Write a 2-3 sentence professional summary for the top of the resume that highlights
+        the person's strongest experience, skills and impact. Do not invent facts.
+        Format as JSON with key: summary
+        """
+    
+    def enhance_project_description(self, project_name: str, brief_idea: str, technologies: List[str]) -> Dict[str, Any]:
+        """
+        Takes a minimal project description and expands it intelligently.
+        """
+        with discard_replies_on_error():
+            response = self.model.invoke(self._project_prompt(project_name, brief_idea, technologies))
+            return self._load_json(response.content)
+    
+    def categorize_skills(self, skills_list: List[str], role_context: str) -> List[Dict[str, Any]]:
+        """
+        Takes a flat list of skills and organizes them into intelligent categories
+        based on the role context.
+        """
+        with discard_replies_on_error():
+            response = self.model.invoke(self._skills_prompt(skills_list, role_context))
+            return self._load_json(response.content)
+    
+    async def aenhance_project_description(self, project_name: str, brief_idea: str, technologies: List[str]) -> Dict[str, Any]:
+        """Async variant of enhance_project_description."""
+        with discard_replies_on_error():
+            response = await self.model.ainvoke(self._project_prompt(project_name, brief_idea, technologies))
+            return self._load_json(response.content)
+    
+    async def acategorize_skills(self, skills_list: List[str], role_context: str) -> List[Dict[str, Any]]:
+        """Async variant of categorize_skills."""
+        with discard_replies_on_error():
+            response = await self.model.ainvoke(self._skills_prompt(skills_list, role_context))
+            return self._load_json(response.content)
+    
+    async def aenhance_experience(self, experience: Dict[str, Any], role_context: str) -> Dict[str, Any]:
+        """Rewrites one experience entry's responsibilities and pulls out technologies and achievements."""
+        with discard_replies_on_error():
+            response = await self.model.ainvoke(self._experience_prompt(experience, role_context))
+            return self._load_json(response.content)
+    
+    async def aenhance_summary(self, basic_resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Writes the professional summary from the whole resume."""
+        with discard_replies_on_error():
+            response = await self.model.ainvoke(self._summary_prompt(basic_resume_data))
+            return self._load_json(response.content)
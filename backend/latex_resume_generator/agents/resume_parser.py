@@ -1,15 +1,17 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from rich import print
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import create_model
 from dotenv import load_dotenv
 
 from backend.latex_resume_generator.schemas.resume_schema import ResumeSchema
+from backend.latex_resume_generator.utils.llm_cache import discard_replies_on_error
 
 
 class ResumeParser:
@@ -37,6 +39,22 @@ class ResumeParser:
         
         # Create the chain
         self.chain = prompt | model | self.parser
+        self.model = model
+        self.template = template
+        self._section_chains: Dict[Tuple[str, ...], Any] = {}
+
+    def _section_chain(self, sections: List[str]):
+        """Builds (once per combination) a chain whose output schema holds only the given sections."""
+        key = tuple(sorted(sections))
+        if key not in self._section_chains:
+            fields = {name: (ResumeSchema.model_fields[name].annotation, ResumeSchema.model_fields[name]) for name in key}
+            parser = PydanticOutputParser(pydantic_object=create_model("PartialResumeSchema", **fields))
+            prompt = ChatPromptTemplate.from_template(
+                self.template,
+                partial_variables={"format_instructions": parser.get_format_instructions()}
+            )
+            self._section_chains[key] = prompt | self.model | parser
+        return self._section_chains[key]
         
     def parse(self, resume_text: str) -> Dict[str, Any]:
         """Convert raw resume text to structured JSON format."""
@@ -44,7 +62,9 @@ class ResumeParser:
         
         try:
             # Run the chain
-            parsed_resume = self.chain.invoke({"resume_text": resume_text})
+            # A reply the parser rejects must not be replayed from the LLM cache
+            with discard_replies_on_error():
+                parsed_resume = self.chain.invoke({"resume_text": resume_text})
             
             # Convert Pydantic object to dict for downstream use
             structured_data = parsed_resume.model_dump()
@@ -56,6 +76,41 @@ class ResumeParser:
             print(f"[bold red]Error parsing resume text:[/bold red] {e}")
             raise
 
+    async def aparse(self, resume_text: str) -> Dict[str, Any]:
+        """Async variant of parse that awaits the model without blocking the event loop."""
+        print("Parsing resume text to structured JSON...")
+        
+        try:
+            with discard_replies_on_error():
+                parsed_resume = await self.chain.ainvoke({"resume_text": resume_text})
+            structured_data = parsed_resume.model_dump()
+            
+            print("[bold green]Successfully parsed resume text to JSON.[/bold green]")
+            return structured_data
+            
+        except Exception as e:
+            print(f"[bold red]Error parsing resume text:[/bold red] {e}")
+            raise
+
+    async def aparse_sections(self, resume_text: str, sections: List[str]) -> Dict[str, Any]:
+        """
+        Parses only the given top-level ResumeSchema sections (e.g. ["experience", "skills"]).
+        Used to fill the sections the local parser could not resolve, with a smaller prompt and output.
+        """
+        print(f"Parsing resume sections {', '.join(sections)} to structured JSON...")
+        
+        try:
+            with discard_replies_on_error():
+                parsed = await self._section_chain(sections).ainvoke({"resume_text": resume_text})
+            structured_data = parsed.model_dump()
+            
+            print("[bold green]Successfully parsed resume sections to JSON.[/bold green]")
+            return structured_data
+            
+        except Exception as e:
+            print(f"[bold red]Error parsing resume sections:[/bold red] {e}")
+            raise
+
 
 if __name__ == "__main__":
     # Load environment variables from .env file
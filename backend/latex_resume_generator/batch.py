@@ -0,0 +1,392 @@
+"""
+Bulk resume generation.
+
+Runs every PDF in an input directory through extraction, parsing,
+enhancement, Markdown and LaTeX generation and compilation for one or more
+templates, writing the results to an output directory:
+
+    python -m backend.latex_resume_generator.batch in_dir out_dir \
+        --templates jakes_resume,deedy_resume --workers 8
+
+Progress is recorded in out_dir/manifest.jsonl after every resume, so an
+interrupted run picks up where it stopped. A throughput and failure report
+is written to out_dir/report.json when the run finishes.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rich import print
+from rich.console import Console
+from rich.table import Table
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.latex_resume_generator.agents.enhanced_markdown_generator import EnhancedMarkdownGenerator
+from backend.latex_resume_generator.agents.local_resume_parser import LocalResumeParser
+from backend.latex_resume_generator.agents.registry import AgentRegistry
+from backend.latex_resume_generator.utils.build_workspace import BuildWorkspaceManager
+from backend.latex_resume_generator.utils.compile_cache import CompileCache, compile_cache_key
+from backend.latex_resume_generator.utils.concurrency import run_blocking, stage_slot
+from backend.latex_resume_generator.utils.latex_compiler import compile_latex_to_pdf_async
+from backend.latex_resume_generator.utils.latex_lint import lint_latex, template_commands
+from backend.latex_resume_generator.utils.latex_renderer import LaTeXRenderer, RenderError
+from backend.latex_resume_generator.utils.llm_cache import configure_llm_cache, discard_replies_on_error
+from backend.latex_resume_generator.utils.parse_cache import ParseCache, parse_cache_key
+from backend.latex_resume_generator.utils.pdf_reader import PDFExtractionError, get_pdf_extractor
+from backend.latex_resume_generator.utils.template_registry import TemplateError, TemplateInfo, TemplateRegistry
+from backend.latex_resume_generator.utils.tex_formats import FormatCache
+
+MANIFEST_NAME = "manifest.jsonl"
+REPORT_NAME = "report.json"
+
+
+class BatchError(Exception):
+    """A resume failed at a specific pipeline stage."""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Returns the latest manifest record per input hash. Truncated lines are ignored."""
+    records: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interruption
+            records[record["sha256"]] = record
+    return records
+
+
+class BatchRunner:
+    """Processes a directory of resume PDFs with bounded concurrency."""
+
+    def __init__(
+        self,
+        in_dir: Path,
+        out_dir: Path,
+        templates: List[str],
+        workers: int = 4,
+        enhance: bool = True,
+        markdown_mode: str = "deterministic",
+        render_mode: str = "deterministic",
+        parse_mode: str = "auto",
+        retry_failed: bool = True,
+    ):
+        self.in_dir = in_dir
+        self.out_dir = out_dir
+        self.template_names = templates
+        self.workers = max(1, workers)
+        self.enhance = enhance
+        self.markdown_mode = markdown_mode
+        self.render_mode = render_mode
+        self.parse_mode = parse_mode
+        self.retry_failed = retry_failed
+
+        self.template_registry = TemplateRegistry(auto_reload=False)
+        self.templates: Dict[str, TemplateInfo] = {name: self.template_registry.get(name) for name in templates}
+        self.renderer = LaTeXRenderer(self.template_registry)
+        self.format_cache = FormatCache.from_env()
+        if self.format_cache:
+            self.format_cache.warm(self.templates.values(), self.renderer)
+        self.agents: Optional[AgentRegistry] = AgentRegistry.from_env(template_registry=self.template_registry)
+        self.local_parser = LocalResumeParser.from_env()
+        # Shared with the API: a resume uploaded there (or batched before) is not parsed or enhanced again
+        self.parse_cache = ParseCache.from_env()
+        self.workspace_manager = BuildWorkspaceManager.from_env()
+        self.compile_cache = CompileCache.from_env()
+        self.manifest_path = out_dir / MANIFEST_NAME
+        self.stage_seconds: Dict[str, float] = {}
+
+    def _require_agents(self, stage: str) -> AgentRegistry:
+        if self.agents is None:
+            raise BatchError(stage, "API_KEY not found in environment variables.")
+        return self.agents
+
+    def _timed(self, stage: str, started: float) -> None:
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + time.perf_counter() - started
+
+    # --- Pipeline ---
+    async def _compile(self, template: TemplateInfo, full_latex: str) -> bytes:
+        cache_key = compile_cache_key(full_latex, template.directory, template.engine) if self.compile_cache else None
+        pdf_bytes = self.compile_cache.get(cache_key) if cache_key else None
+        if pdf_bytes is not None:
+            return pdf_bytes
+        with self.workspace_manager.workspace(template.name, template.directory) as workspace:
+            async with stage_slot("compile"):
+                if self.format_cache:
+                    success, log, _ = await self.format_cache.compile(workspace, full_latex, template.directory, template.engine)
+                else:
+                    tex_path = workspace.write_tex(full_latex)
+                    success, log, _ = await compile_latex_to_pdf_async(tex_path, workspace.path, template.engine)
+            if not success or not os.path.exists(workspace.pdf_path):
+                raise BatchError("compile", f"Failed to compile LaTeX to PDF: {log[-500:]}")
+            with open(workspace.pdf_path, "rb") as f:
+                pdf_bytes = f.read()
+        if cache_key:
+            self.compile_cache.put(cache_key, pdf_bytes)
+        return pdf_bytes
+
+    async def _generate_latex(self, template_name: str, markdown: str, enhanced_data: Dict[str, Any]) -> str:
+        if self.render_mode == "deterministic" and self.renderer.supports(template_name):
+            try:
+                return self.renderer.render(template_name, enhanced_data)
+            except RenderError as e:
+                print(f"[bold yellow]Deterministic rendering failed for {template_name}, using the LLM:[/bold yellow] {e}")
+        agents = self._require_agents("latex")
+        async with stage_slot("llm_latex"):
+            return await agents.latex_generator.agenerate(markdown_content=markdown, template_name=template_name)
+
+    async def process(self, pdf_path: Path, sha256: str) -> Dict[str, Any]:
+        """Runs one resume through the pipeline and returns its manifest record."""
+        started = time.perf_counter()
+        target = self.out_dir / pdf_path.stem
+        target.mkdir(parents=True, exist_ok=True)
+        record: Dict[str, Any] = {"file": pdf_path.name, "sha256": sha256, "templates": {}}
+        stage = "extract"
+        try:
+            cache_key = parse_cache_key(sha256, self.parse_mode) if self.parse_cache else None
+            cached = self.parse_cache.get(cache_key) if cache_key else None
+            if cached:
+                parsed = cached["parsed"]
+            else:
+                t = time.perf_counter()
+                try:
+                    with pdf_path.open("rb") as f:
+                        text = (await run_blocking("extract", get_pdf_extractor().extract, f)).text
+                except PDFExtractionError as e:
+                    raise BatchError("extract", str(e)) from e
+                if not text.strip():
+                    raise BatchError("extract", "Could not extract text from PDF.")
+                self._timed("extract", t)
+
+                stage = "parse"
+                t = time.perf_counter()
+                parsed, _, _ = await self.local_parser.aparse_resume(
+                    text, lambda: self._require_agents("parse").parser, self.parse_mode
+                )
+                self._timed(stage, t)
+                if cache_key:
+                    self.parse_cache.put_parsed(cache_key, parsed)
+            (target / "parsed.json").write_text(json.dumps(parsed, indent=2))
+
+            enhanced = parsed
+            if self.enhance and cached and cached["enhanced"]:
+                enhanced = cached["enhanced"]
+                (target / "enhanced.json").write_text(json.dumps(enhanced, indent=2))
+            elif self.enhance:
+                stage = "enhance"
+                t = time.perf_counter()
+                agents = self._require_agents(stage)
+                async with stage_slot("llm_enhance"):
+                    enhanced = await agents.enhancement.aenhance(parsed)
+                self._timed(stage, t)
+                if cache_key:
+                    self.parse_cache.put_enhanced(cache_key, enhanced)
+                (target / "enhanced.json").write_text(json.dumps(enhanced, indent=2))
+
+            stage = "markdown"
+            t = time.perf_counter()
+            if self.markdown_mode == "deterministic":
+                markdown = EnhancedMarkdownGenerator.render(enhanced)
+            else:
+                markdown_variant = f"llm:{'enhanced' if self.enhance else 'parsed'}"
+                # Markdown cached for this upload is only valid for the cached enhancement it came from
+                reusable = cached and (not self.enhance or cached["enhanced"])
+                if reusable and markdown_variant in cached["markdown"]:
+                    markdown = cached["markdown"][markdown_variant]
+                else:
+                    agents = self._require_agents(stage)
+                    async with stage_slot("llm_markdown"):
+                        markdown = await agents.markdown_generator.agenerate(enhanced)
+                    if cache_key:
+                        self.parse_cache.put_markdown(cache_key, markdown_variant, markdown)
+            self._timed(stage, t)
+            (target / "resume.md").write_text(markdown)
+
+            # Templates share the parsed input and run concurrently
+            results = await asyncio.gather(
+                *(self._process_template(name, markdown, enhanced, target) for name in self.template_names)
+            )
+            record["templates"] = dict(zip(self.template_names, results))
+            failed = [name for name, result in record["templates"].items() if result["status"] != "ok"]
+            record["status"] = "failed" if failed else "ok"
+            if failed:
+                record.update(stage="template", error=f"Failed templates: {', '.join(failed)}")
+        except Exception as e:
+            record.update(status="failed", stage=getattr(e, "stage", stage), error=str(e))
+
+        record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        return record
+
+    async def _process_template(self, template_name: str, markdown: str, enhanced: Dict[str, Any], target: Path) -> Dict[str, Any]:
+        template = self.templates[template_name]
+        try:
+            # LaTeX that fails lint or compilation must not be replayed from the LLM cache on a rerun
+            with discard_replies_on_error():
+                t = time.perf_counter()
+                full_latex = await self._generate_latex(template_name, markdown, enhanced)
+                self._timed("latex", t)
+                lint = lint_latex(full_latex, template_commands(template))
+                full_latex = lint.latex
+                if lint.errors:
+                    (target / f"{template_name}.tex").write_text(full_latex)
+                    raise BatchError("lint", "; ".join(f"line {issue.line}: {issue.message}" for issue in lint.errors))
+                (target / f"{template_name}.tex").write_text(full_latex)
+
+                t = time.perf_counter()
+                pdf_bytes = await self._compile(template, full_latex)
+                self._timed("compile", t)
+            (target / f"{template_name}.pdf").write_bytes(pdf_bytes)
+            return {"status": "ok", "pdf": str(target / f"{template_name}.pdf")}
+        except Exception as e:
+            return {"status": "failed", "stage": getattr(e, "stage", "latex"), "error": str(e)}
+
+    # --- Run ---
+    async def run(self) -> Dict[str, Any]:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        manifest = load_manifest(self.manifest_path)
+        inputs = sorted(p for p in self.in_dir.iterdir() if p.suffix.lower() == ".pdf" and p.is_file())
+
+        pending = []
+        skipped = 0
+        for pdf_path in inputs:
+            sha256 = file_sha256(pdf_path)
+            previous = manifest.get(sha256) or {}
+            # A finished resume is rerun only when new templates were requested for it
+            done = previous.get("status") == "ok" and set(self.template_names) <= set(previous.get("templates", {}))
+            if done or (previous.get("status") == "failed" and not self.retry_failed):
+                skipped += 1
+            else:
+                pending.append((pdf_path, sha256))
+
+        print(f"[bold cyan]{len(inputs)} resumes found, {skipped} skipped, {len(pending)} to process "
+              f"with {self.workers} workers[/bold cyan]")
+
+        pool = asyncio.Semaphore(self.workers)
+        records: List[Dict[str, Any]] = []
+        started = time.perf_counter()
+
+        with open(self.manifest_path, "a") as manifest_file:
+            async def worker(pdf_path: Path, sha256: str) -> None:
+                async with pool:
+                    record = await self.process(pdf_path, sha256)
+                # One line per finished resume; flushed so an interruption loses at most in-flight work
+                manifest_file.write(json.dumps(record) + "\n")
+                manifest_file.flush()
+                records.append(record)
+                marker = "[bold green]✓[/bold green]" if record["status"] == "ok" else "[bold red]✗[/bold red]"
+                print(f"{marker} {pdf_path.name} ({record['elapsed_seconds']}s) [{len(records)}/{len(pending)}]")
+
+            await asyncio.gather(*(worker(pdf_path, sha256) for pdf_path, sha256 in pending))
+
+        elapsed = time.perf_counter() - started
+        return self._report(records, skipped, elapsed)
+
+    def _report(self, records: List[Dict[str, Any]], skipped: int, elapsed: float) -> Dict[str, Any]:
+        succeeded = sum(1 for r in records if r["status"] == "ok")
+        pdfs = sum(1 for r in records for t in r.get("templates", {}).values() if t["status"] == "ok")
+        failures_by_stage: Dict[str, int] = {}
+        for r in records:
+            if r["status"] != "ok":
+                failures_by_stage[r.get("stage", "unknown")] = failures_by_stage.get(r.get("stage", "unknown"), 0) + 1
+        latencies = sorted(r["elapsed_seconds"] for r in records)
+        report = {
+            "templates": self.template_names,
+            "workers": self.workers,
+            "processed": len(records),
+            "succeeded": succeeded,
+            "failed": len(records) - succeeded,
+            "skipped": skipped,
+            "pdfs_written": pdfs,
+            "elapsed_seconds": round(elapsed, 3),
+            "resumes_per_minute": round(len(records) / elapsed * 60, 2) if elapsed else 0.0,
+            "latency_p50_seconds": latencies[len(latencies) // 2] if latencies else None,
+            "latency_max_seconds": latencies[-1] if latencies else None,
+            "stage_seconds": {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+            "failures_by_stage": failures_by_stage,
+            "failures": [
+                {"file": r["file"], "stage": r.get("stage"), "error": r.get("error")}
+                for r in records if r["status"] != "ok"
+            ],
+        }
+        (self.out_dir / REPORT_NAME).write_text(json.dumps(report, indent=2))
+        return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    table = Table(title="[cyan]Batch Report[/cyan]", border_style="cyan")
+    table.add_column("Metric", style="bold")
+    table.add_column("Value")
+    for key in ("processed", "succeeded", "failed", "skipped", "pdfs_written",
+                "elapsed_seconds", "resumes_per_minute", "latency_p50_seconds", "latency_max_seconds"):
+        table.add_row(key.replace("_", " ").capitalize(), str(report[key]))
+    for stage, seconds in report["stage_seconds"].items():
+        table.add_row(f"Time in {stage} (sum)", f"{seconds}s")
+    Console().print(table)
+    for failure in report["failures"][:20]:
+        print(f"[bold red]{failure['file']}[/bold red] failed at {failure['stage']}: {failure['error']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate resumes in bulk from a directory of PDFs.")
+    parser.add_argument("in_dir", type=Path, help="Directory containing resume PDFs")
+    parser.add_argument("out_dir", type=Path, help="Directory for generated files, the manifest and the report")
+    parser.add_argument("--templates", default="jakes_resume", help="Comma-separated template names")
+    parser.add_argument("--workers", type=int, default=4, help="Resumes processed concurrently")
+    parser.add_argument("--no-enhance", action="store_true", help="Skip the enhancement step")
+    parser.add_argument("--markdown-mode", choices=("deterministic", "llm"), default="deterministic")
+    parser.add_argument("--render-mode", choices=("deterministic", "llm"), default="deterministic")
+    parser.add_argument("--parse-mode", choices=("auto", "llm"), default="auto",
+                        help="auto parses well-structured resumes locally and sends only what it cannot resolve to the LLM")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry resumes that failed in an earlier run")
+    args = parser.parse_args(argv)
+
+    if not args.in_dir.is_dir():
+        parser.error(f"{args.in_dir} is not a directory")
+
+    configure_llm_cache()
+    try:
+        runner = BatchRunner(
+            in_dir=args.in_dir,
+            out_dir=args.out_dir,
+            templates=[name.strip() for name in args.templates.split(",") if name.strip()],
+            workers=args.workers,
+            enhance=not args.no_enhance,
+            markdown_mode=args.markdown_mode,
+            render_mode=args.render_mode,
+            parse_mode=args.parse_mode,
+            retry_failed=not args.skip_failed,
+        )
+    except TemplateError as e:
+        parser.error(str(e))
+    report = asyncio.run(runner.run())
+    print_report(report)
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Compile-time benchmark for precompiled TeX formats.
+
+Compiles each template's example document repeatedly, plainly and against
+the format dumped from its preamble, and reports the per-compile saving:
+
+    python -m backend.latex_resume_generator.benchmark_formats --runs 5 \
+        --templates jakes_resume,deedy_resume --json formats.json
+
+Formats are built in a scratch directory, so the server's format cache is
+left untouched.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rich import print
+from rich.console import Console
+from rich.table import Table
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backend.latex_resume_generator.utils.build_workspace import BuildWorkspaceManager
+from backend.latex_resume_generator.utils.latex_compiler import compile_latex_to_pdf
+from backend.latex_resume_generator.utils.template_registry import TemplateError, TemplateInfo, TemplateRegistry
+from backend.latex_resume_generator.utils.tex_formats import FORMAT_ENGINES, FormatCache, format_key, split_preamble
+
+
+def _time_compile(manager: BuildWorkspaceManager, template: TemplateInfo, latex: str, fmt_path: Optional[str] = None) -> float:
+    """Seconds for one full compile in a fresh workspace; raises if it fails."""
+    with manager.workspace(template.name, template.directory) as workspace:
+        fmt = None
+        if fmt_path:
+            fmt = os.path.splitext(os.path.basename(fmt_path))[0]
+            os.symlink(fmt_path, os.path.join(workspace.path, fmt + ".fmt"))
+        tex_path = workspace.write_tex(latex)
+        started = time.perf_counter()
+        success, log, _ = compile_latex_to_pdf(tex_path, workspace.path, template.engine, fmt=fmt)
+        elapsed = time.perf_counter() - started
+        if not success:
+            raise RuntimeError(log[-500:])
+    return elapsed
+
+
+def benchmark_template(manager: BuildWorkspaceManager, formats: FormatCache, template: TemplateInfo, runs: int) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"template": template.name, "engine": template.engine}
+    split = split_preamble(template.template_tex)
+    if template.engine not in FORMAT_ENGINES or split is None:
+        result["error"] = "no format support for this template"
+        return result
+    head, body = split
+
+    started = time.perf_counter()
+    fmt_path = formats.build(head, template.directory, template.engine)
+    result["format_build_seconds"] = round(time.perf_counter() - started, 3)
+    if fmt_path is None:
+        result["error"] = f"could not dump format {format_key(head, template.directory, template.engine)}"
+        return result
+    result["format_mb"] = round(os.path.getsize(fmt_path) / 1024 / 1024, 1)
+
+    try:
+        # One untimed compile each warms the OS file cache
+        _time_compile(manager, template, template.template_tex)
+        _time_compile(manager, template, body, fmt_path)
+        plain = [_time_compile(manager, template, template.template_tex) for _ in range(runs)]
+        warm = [_time_compile(manager, template, body, fmt_path) for _ in range(runs)]
+    except RuntimeError as e:
+        result["error"] = str(e)
+        return result
+
+    result["plain_ms"] = round(statistics.median(plain) * 1000, 1)
+    result["format_ms"] = round(statistics.median(warm) * 1000, 1)
+    result["saving_ms"] = round(result["plain_ms"] - result["format_ms"], 1)
+    result["saving_pct"] = round(100 * result["saving_ms"] / result["plain_ms"], 1)
+    return result
+
+
+def print_results(results: List[Dict[str, Any]], runs: int) -> None:
+    table = Table(title=f"[cyan]TeX Format Benchmark (median of {runs})[/cyan]", border_style="cyan")
+    for column in ("Template", "Format build", "Plain compile", "With format", "Saving"):
+        table.add_column(column, style="bold" if column == "Template" else None)
+    for r in results:
+        if "error" in r:
+            table.add_row(r["template"], "[red]failed[/red]", "", "", "")
+            continue
+        table.add_row(
+            r["template"],
+            f"{r['format_build_seconds']}s ({r['format_mb']} MB)",
+            f"{r['plain_ms']} ms",
+            f"{r['format_ms']} ms",
+            f"{r['saving_ms']} ms ({r['saving_pct']}%)",
+        )
+    Console().print(table)
+    for r in results:
+        if "error" in r:
+            print(f"[bold red]{r['template']}:[/bold red] {r['error']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the per-compile saving of precompiled TeX formats.")
+    parser.add_argument("--templates", default="", help="Comma-separated template names (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Timed compiles per template and mode")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    registry = TemplateRegistry(auto_reload=False)
+    names = [name.strip() for name in args.templates.split(",") if name.strip()] or [t.name for t in registry.list()]
+    try:
+        templates = [registry.get(name) for name in names]
+    except TemplateError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory(prefix="fmt-bench-") as scratch:
+        manager = BuildWorkspaceManager(root=os.path.join(scratch, "builds"), keep_failed=False)
+        formats = FormatCache(format_dir=os.path.join(scratch, "formats"), max_formats=len(templates))
+        results = [benchmark_template(manager, formats, template, max(1, args.runs)) for template in templates]
+
+    print_results(results, args.runs)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0 if all("error" not in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
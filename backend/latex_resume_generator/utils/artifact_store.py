@@ -0,0 +1,122 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Optional
+
+ARTIFACT_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+ARTIFACT_EXTENSIONS = ('.pdf', '.tex')
+
+
+def _default_artifact_root() -> str:
+    return os.path.join(tempfile.gettempdir(), "resume-artifacts")
+
+
+class ArtifactStore:
+    """
+    Keeps generated PDFs (and the LaTeX they were built from) on disk so they
+    can be downloaded by id instead of being embedded in JSON responses.
+    Ids are derived from the PDF contents, which also makes them strong ETags.
+    Artifacts expire after max_age_seconds and the oldest are dropped when the
+    store outgrows max_total_bytes.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_age_seconds: int = 24 * 3600,
+        max_total_bytes: int = 1024 * 1024 * 1024,
+        gc_interval_seconds: int = 60,
+    ):
+        self.root = root or _default_artifact_root()
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self.gc_interval_seconds = gc_interval_seconds
+        self._lock = threading.Lock()
+        self._last_gc = 0.0
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "ArtifactStore":
+        return cls(
+            root=os.getenv("ARTIFACT_DIR") or None,
+            max_age_seconds=int(os.getenv("ARTIFACT_MAX_AGE_SECONDS", str(24 * 3600))),
+            max_total_bytes=int(os.getenv("ARTIFACT_MAX_TOTAL_MB", "1024")) * 1024 * 1024,
+        )
+
+    def path(self, artifact_id: str, extension: str = ".pdf") -> Optional[str]:
+        """Returns the file path of an artifact, or None if the id is invalid or unknown."""
+        if not ARTIFACT_ID_RE.match(artifact_id) or extension not in ARTIFACT_EXTENSIONS:
+            return None
+        path = os.path.join(self.root, artifact_id + extension)
+        return path if os.path.isfile(path) else None
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def put(self, pdf_bytes: bytes, latex_code: Optional[str] = None) -> str:
+        """Stores a PDF (and optionally its LaTeX source) and returns the artifact id."""
+        self._maybe_gc()
+        artifact_id = hashlib.sha256(pdf_bytes).hexdigest()[:32]
+        pdf_path = os.path.join(self.root, artifact_id + ".pdf")
+        if os.path.exists(pdf_path):
+            os.utime(pdf_path)  # identical PDF already stored, just renew it
+        else:
+            self._write(pdf_path, pdf_bytes)
+        if latex_code is not None:
+            self._write(os.path.join(self.root, artifact_id + ".tex"), latex_code.encode("utf-8"))
+        return artifact_id
+
+    def _maybe_gc(self) -> None:
+        now = time.time()
+        if now - self._last_gc < self.gc_interval_seconds:
+            return
+        self._last_gc = now
+        self.collect_garbage()
+
+    def collect_garbage(self) -> int:
+        """
+        Removes artifacts older than max_age_seconds, then the oldest remaining
+        ones until the store fits within max_total_bytes. Returns the number of
+        files removed.
+        """
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+
+            removed = 0
+            now = time.time()
+            survivors = []
+            for mtime, path, size in entries:
+                if now - mtime > self.max_age_seconds:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except OSError:
+                        pass
+                else:
+                    survivors.append((mtime, path, size))
+
+            total = sum(size for _, _, size in survivors)
+            for mtime, path, size in sorted(survivors):
+                if total <= self.max_total_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+            return removed
@@ -0,0 +1,176 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set
+
+ASSET_EXTENSIONS = ('.cls', '.sty')
+TEX_FILENAME = "enhanced_resume.tex"
+
+
+def _default_build_root() -> str:
+    """Prefers tmpfs (/dev/shm) for scratch builds, falling back to the system temp dir."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return os.path.join(shm, "resume-builds")
+    return os.path.join(tempfile.gettempdir(), "resume-builds")
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class BuildWorkspace:
+    """A private scratch directory for a single compile job."""
+
+    def __init__(self, path: str, template_name: str):
+        self.path = path
+        self.template_name = template_name
+        self.job_id = os.path.basename(path)
+
+    @property
+    def tex_path(self) -> str:
+        return os.path.join(self.path, TEX_FILENAME)
+
+    @property
+    def pdf_path(self) -> str:
+        return os.path.splitext(self.tex_path)[0] + ".pdf"
+
+    def write_tex(self, latex_code: str) -> str:
+        # Write to a temporary name first so a reader never sees a half-written file
+        tmp_path = self.tex_path + ".part"
+        with open(tmp_path, "w") as f:
+            f.write(latex_code)
+        os.replace(tmp_path, self.tex_path)
+        return self.tex_path
+
+
+class BuildWorkspaceManager:
+    """
+    Creates isolated per-job build directories so concurrent compiles of the
+    same template never share files. Template assets (.cls/.sty) are symlinked
+    into each workspace rather than copied, and old workspaces are garbage
+    collected against an age and total-size budget.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_age_seconds: int = 3600,
+        max_total_bytes: int = 512 * 1024 * 1024,
+        gc_interval_seconds: int = 60,
+        keep_failed: bool = True,
+    ):
+        self.root = root or _default_build_root()
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self.gc_interval_seconds = gc_interval_seconds
+        self.keep_failed = keep_failed
+        self._active: Set[str] = set()
+        self._lock = threading.Lock()
+        self._last_gc = 0.0
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "BuildWorkspaceManager":
+        return cls(
+            root=os.getenv("BUILD_ROOT") or None,
+            max_age_seconds=int(os.getenv("BUILD_MAX_AGE_SECONDS", "3600")),
+            max_total_bytes=int(os.getenv("BUILD_MAX_TOTAL_MB", "512")) * 1024 * 1024,
+            keep_failed=os.getenv("BUILD_KEEP_FAILED", "true").lower() == "true",
+        )
+
+    def create(self, template_name: str, template_dir: Optional[str] = None) -> BuildWorkspace:
+        """Creates a fresh workspace and links the template's assets into it."""
+        self._maybe_gc()
+        path = os.path.join(self.root, f"{template_name}-{uuid.uuid4().hex}")
+        os.makedirs(path)
+        with self._lock:
+            self._active.add(path)
+
+        if template_dir and os.path.isdir(template_dir):
+            for item in os.listdir(template_dir):
+                if item.endswith(ASSET_EXTENSIONS):
+                    source = os.path.abspath(os.path.join(template_dir, item))
+                    target = os.path.join(path, item)
+                    try:
+                        os.symlink(source, target)
+                    except OSError:
+                        # Filesystems without symlink support get a plain copy
+                        shutil.copy(source, target)
+        return BuildWorkspace(path, template_name)
+
+    def release(self, workspace: BuildWorkspace, succeeded: bool = True) -> None:
+        """Marks a workspace as finished, deleting it unless it failed and should be kept."""
+        with self._lock:
+            self._active.discard(workspace.path)
+        if succeeded or not self.keep_failed:
+            shutil.rmtree(workspace.path, ignore_errors=True)
+
+    @contextmanager
+    def workspace(self, template_name: str, template_dir: Optional[str] = None) -> Iterator[BuildWorkspace]:
+        """Context manager that creates a workspace and releases it on exit."""
+        ws = self.create(template_name, template_dir)
+        succeeded = False
+        try:
+            yield ws
+            succeeded = True
+        finally:
+            self.release(ws, succeeded=succeeded)
+
+    def _maybe_gc(self) -> None:
+        now = time.time()
+        if now - self._last_gc < self.gc_interval_seconds:
+            return
+        self._last_gc = now
+        self.collect_garbage()
+
+    def collect_garbage(self) -> int:
+        """
+        Removes inactive workspaces older than max_age_seconds, then the oldest
+        remaining ones until the total size fits within max_total_bytes.
+        Returns the number of workspaces removed.
+        """
+        with self._lock:
+            active = set(self._active)
+
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if path in active or not os.path.isdir(path):
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            entries.append((mtime, path, _dir_size(path)))
+
+        removed = 0
+        now = time.time()
+        survivors = []
+        for mtime, path, size in entries:
+            if now - mtime > self.max_age_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+            else:
+                survivors.append((mtime, path, size))
+
+        total = sum(size for _, _, size in survivors)
+        for mtime, path, size in sorted(survivors):
+            if total <= self.max_total_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        return removed
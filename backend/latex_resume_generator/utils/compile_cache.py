@@ -0,0 +1,126 @@
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from backend.latex_resume_generator.utils.build_workspace import ASSET_EXTENSIONS
+
+
+def _default_cache_dir() -> str:
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "resume-latex", "compile")
+
+
+def compile_cache_key(latex_code: str, template_dir: Optional[str], engine: str) -> str:
+    """
+    Hashes everything that determines the compiled PDF: the final LaTeX source,
+    the template's .cls/.sty assets and the TeX engine.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"engine={engine}\0".encode())
+    if template_dir and os.path.isdir(template_dir):
+        for name in sorted(os.listdir(template_dir)):
+            if name.endswith(ASSET_EXTENSIONS):
+                digest.update(f"asset={name}\0".encode())
+                with open(os.path.join(template_dir, name), "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+    digest.update(b"tex\0")
+    digest.update(latex_code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CompileCache:
+    """
+    On-disk, size-bounded LRU store of compiled PDFs keyed by compile_cache_key.
+    Recency is tracked through file modification times so the cache survives restarts.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, _, size in self._entries())
+
+    @classmethod
+    def from_env(cls) -> Optional["CompileCache"]:
+        """Builds the cache from environment settings, or returns None when disabled."""
+        if os.getenv("COMPILE_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            cache_dir=os.getenv("COMPILE_CACHE_DIR") or None,
+            max_bytes=int(os.getenv("COMPILE_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pdf")
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, path, stat.st_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the cached PDF bytes for a key, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)  # mark as recently used
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return data
+
+    def put(self, key: str, pdf_bytes: bytes) -> None:
+        """Stores a compiled PDF and evicts least recently used entries over budget."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        with self._lock:
+            if os.path.exists(path):
+                self._total_bytes -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._total_bytes += len(pdf_bytes)
+            self.stores += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        for _, path, size in sorted(self._entries()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
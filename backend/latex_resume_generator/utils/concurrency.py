@@ -0,0 +1,51 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict
+
+# Default number of concurrent operations allowed per pipeline stage.
+# Each value can be overridden with a <STAGE>_CONCURRENCY environment variable,
+# e.g. COMPILE_CONCURRENCY=4 or LLM_LATEX_CONCURRENCY=16.
+STAGE_DEFAULTS: Dict[str, int] = {
+    "extract": 4,
+    "llm_parse": 8,
+    "llm_enhance": 8,
+    "llm_markdown": 8,
+    "llm_latex": 8,
+    "compile": 2,
+}
+
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def stage_concurrency(stage: str) -> int:
+    """Returns the configured concurrency limit for a pipeline stage."""
+    default = STAGE_DEFAULTS.get(stage, 4)
+    value = os.getenv(f"{stage.upper()}_CONCURRENCY")
+    try:
+        return max(1, int(value)) if value else default
+    except ValueError:
+        return default
+
+
+def stage_semaphore(stage: str) -> asyncio.Semaphore:
+    """Returns the shared semaphore that bounds concurrent work in a stage."""
+    if stage not in _semaphores:
+        _semaphores[stage] = asyncio.Semaphore(stage_concurrency(stage))
+    return _semaphores[stage]
+
+
+@asynccontextmanager
+async def stage_slot(stage: str):
+    """Waits for a free slot in the given stage and holds it for the block."""
+    async with stage_semaphore(stage):
+        yield
+
+
+async def run_blocking(stage: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs a blocking function in the default thread pool, bounded by the
+    concurrency limit of the given stage.
+    """
+    async with stage_slot(stage):
+        return await asyncio.to_thread(func, *args, **kwargs)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.latex_resume_generator.utils.sections import SECTION_ALIASES
+
+# Top-level sections of EnhancedResumeSchema, in document order
+RESUME_SECTIONS = ("personal_info", "summary", "experience", "projects", "education", "skills",
+                   "publications", "certifications", "additional_sections")
+# Top-level sections of the basic ResumeSchema
+BASIC_SECTIONS = ("personal_info", "summary", "experience", "projects", "education", "skills")
+
+# \section titles used by the templates and the LLM, mapped to schema sections
+_LATEX_TITLES = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+_LATEX_TITLES.update({
+    "publications": "publications",
+    "selected publications": "publications",
+    "papers": "publications",
+    "certifications": "certifications",
+    "certificates": "certifications",
+    "licenses and certifications": "certifications",
+    "links": "personal_info",  # deedy_resume lists the profile links in their own section
+    "contact": "personal_info",
+    "personal information": "personal_info",
+    "professional objective": "summary",
+    "employment history": "experience",
+})
+# \section{...} in most templates, \begin{rubric}{...} in curve_cv
+_SECTION_RE = re.compile(r'\\section\*?\s*\{|\\begin\{rubric\}\s*\{')
+_BEGIN_DOCUMENT = r'\begin{document}'
+_END_DOCUMENT = r'\end{document}'
+_COMMENT_RE = re.compile(r'(?<!\\)%.*$', re.M)
+# Preamble commands that hold contact details, e.g. curve_cv's \leftheader/\makefield or moderncv's \email
+_PREAMBLE_PERSONAL_RE = re.compile(
+    r'\\(?:leftheader|rightheader|makefield|name|firstname|familyname|address|email|phone|mobile'
+    r'|homepage|social|extrainfo|photo|author)(?![a-zA-Z@])'
+)
+# Words that make an unrecognized section title a possible home for contact details
+_PERSONAL_TITLE_WORDS = {"personal", "contact", "contacts", "information", "info", "details", "profiles"}
+
+Span = Tuple[int, int]
+
+
+def section_hashes(data: Dict[str, Any], sections: Iterable[str] = RESUME_SECTIONS) -> Dict[str, str]:
+    """Hashes each top-level section of resume data so versions can be diffed section by section."""
+    return {
+        name: hashlib.sha256(json.dumps(data.get(name), sort_keys=True, default=str).encode()).hexdigest()
+        for name in sections
+    }
+
+
+def changed_sections(previous: Dict[str, str], current: Dict[str, str]) -> List[str]:
+    """Sections whose hash differs between two versions, in document order."""
+    return [name for name in current if previous.get(name) != current[name]]
+
+
+def _braced(text: str, start: int) -> Tuple[str, int]:
+    """Returns the contents of the brace group opening at text[start - 1] and the index after it."""
+    depth, i = 1, start
+    while i < len(text) and depth:
+        if text[i] == '\\':
+            i += 2
+            continue
+        depth += {'{': 1, '}': -1}.get(text[i], 0)
+        i += 1
+    return text[start:i - 1], i
+
+
+def _normalize_title(title: str) -> str:
+    # \\ breaks a title across lines (tibault_resume's Personal\\Information)
+    text = title.replace("\\\\", " ")
+    text = re.sub(r'\\[a-zA-Z]+\*?', ' ', text)
+    text = re.sub(r'[{}~]', ' ', text).replace("&", "and").replace("\\", " ")
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def section_for_title(title: str) -> str:
+    """Maps a \\section title to a schema section; unknown titles belong to additional_sections."""
+    return _LATEX_TITLES.get(_normalize_title(title), "additional_sections")
+
+
+def split_latex_sections(latex: str) -> Dict[str, List[Span]]:
+    """
+    Locates the fragment of a LaTeX document that renders each schema section.
+    The header (everything between \\begin{document} and the first section)
+    belongs to personal_info; each section runs up to the next section start or
+    \\end{document}. A section found in several places has several spans.
+    """
+    begin = latex.find(_BEGIN_DOCUMENT)
+    end = latex.rfind(_END_DOCUMENT)
+    if begin < 0 or end < begin:
+        return {}
+    begin += len(_BEGIN_DOCUMENT)
+
+    spans: Dict[str, List[Span]] = {}
+    for name, _, span in _titled_spans(latex, begin, end):
+        spans.setdefault(name, []).append(span)
+    return spans
+
+
+def _titled_spans(latex: str, begin: int, end: int) -> List[Tuple[str, Optional[str], Span]]:
+    """(schema section, raw title or None for the header, span) of each part of a document body."""
+    starts = [m for m in _SECTION_RE.finditer(latex, begin, end)]
+    if not starts:
+        return []
+    parts: List[Tuple[str, Optional[str], Span]] = [("personal_info", None, (begin, starts[0].start()))]
+    for i, match in enumerate(starts):
+        title, _ = _braced(latex, match.end())
+        stop = starts[i + 1].start() if i + 1 < len(starts) else end
+        parts.append((section_for_title(title), title, (match.start(), stop)))
+    return parts
+
+
+def _personal_info_spliceable(latex: str) -> bool:
+    """
+    Whether the contact details are confined to the document's own
+    personal_info span. They are not when the preamble sets them (curve_cv's
+    header fields), or when a section whose title was not recognized might
+    hold them, since regenerating only the header would then leave stale
+    details in the PDF.
+    """
+    begin = latex.find(_BEGIN_DOCUMENT)
+    if _PREAMBLE_PERSONAL_RE.search(_COMMENT_RE.sub("", latex[:begin])):
+        return False
+    for name, title, _ in _titled_spans(latex, begin + len(_BEGIN_DOCUMENT), latex.rfind(_END_DOCUMENT)):
+        if name == "additional_sections" and _PERSONAL_TITLE_WORDS & set(_normalize_title(title).split()):
+            return False
+    return True
+
+
+def splice_sections(latex: str, replacements: Dict[Span, str]) -> str:
+    """Replaces the given spans of a document with new fragments."""
+    for (start, stop), fragment in sorted(replacements.items(), reverse=True):
+        if not fragment.endswith("\n"):
+            fragment += "\n"
+        latex = latex[:start] + fragment + latex[stop:]
+    return latex
+
+
+def splice_plan(latex: str, sections: List[str]) -> Optional[Dict[str, Span]]:
+    """
+    The span to regenerate for each changed section, or None when some
+    section cannot be spliced (absent from the document, found in more than
+    one place, or personal_info with contact details outside its span) and
+    the whole document has to be regenerated.
+    """
+    spans = split_latex_sections(latex)
+    plan = {}
+    for name in sections:
+        if len(spans.get(name, [])) != 1:
+            return None
+        if name == "personal_info" and not _personal_info_spliceable(latex):
+            return None
+        plan[name] = spans[name][0]
+    return plan
+
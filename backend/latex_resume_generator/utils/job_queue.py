@@ -0,0 +1,294 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from pydantic import BaseModel
+from rich import print
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class Job(BaseModel):
+    """One unit of background work and its progress."""
+    id: str
+    kind: str
+    status: str = QUEUED
+    stage: Optional[str] = None
+    params: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def public(self) -> Dict[str, Any]:
+        """The job as reported to clients; input parameters are not echoed back."""
+        return self.model_dump(exclude={"params"})
+
+
+# A handler receives the job and a callback to report the stage it is in
+JobHandler = Callable[[Job, Callable[[str], None]], Awaitable[Dict[str, Any]]]
+
+
+class JobStore(ABC):
+    """Base class for job persistence. Subclasses implement save/load/list/delete."""
+
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    def load(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def list(self, statuses: Optional[tuple] = None) -> List[Job]:
+        ...
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        ...
+
+    def prune(self, older_than: float) -> int:
+        """Deletes finished jobs that finished before the given timestamp."""
+        removed = 0
+        for job in self.list(FINISHED_STATES):
+            if job.finished_at and job.finished_at < older_than:
+                self.delete(job.id)
+                removed += 1
+        return removed
+
+
+class MemoryJobStore(JobStore):
+    """Keeps jobs in process memory; they are lost on restart."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job.model_copy(deep=True)
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy(deep=True) if job else None
+
+    def list(self, statuses: Optional[tuple] = None) -> List[Job]:
+        with self._lock:
+            jobs = [job.model_copy(deep=True) for job in self._jobs.values()]
+        return [job for job in jobs if statuses is None or job.status in statuses]
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+class SQLiteJobStore(JobStore):
+    """Persists jobs in a local SQLite database so queued work survives restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job.id, job.status, job.created_at, job.model_dump_json()),
+            )
+            self._conn.commit()
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.model_validate(json.loads(row[0])) if row else None
+
+    def list(self, statuses: Optional[tuple] = None) -> List[Job]:
+        with self._lock:
+            if statuses:
+                placeholders = ",".join("?" for _ in statuses)
+                rows = self._conn.execute(
+                    f"SELECT data FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at", statuses
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT data FROM jobs ORDER BY created_at").fetchall()
+        return [Job.model_validate(json.loads(row[0])) for row in rows]
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+
+class JobQueue:
+    """
+    Runs registered job handlers on a fixed number of asyncio workers in the
+    current process. No external broker is needed: jobs are kept in a
+    JobStore, and with the SQLite store jobs that were still queued when the
+    process stopped are picked up again on start(). Cancelling a running job
+    cancels its task, which kills any TeX subprocess it is waiting on.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = 2, retention_seconds: int = 24 * 3600):
+        self.store = store or MemoryJobStore()
+        self.workers = max(1, workers)
+        self.retention_seconds = retention_seconds
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """Builds the queue selected by JOB_BACKEND (memory or sqlite)."""
+        backend = os.getenv("JOB_BACKEND", "memory").lower()
+        if backend == "sqlite":
+            default_path = os.path.join(
+                os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                "resume-latex", "jobs.sqlite3",
+            )
+            store: JobStore = SQLiteJobStore(os.getenv("JOB_DB_PATH") or default_path)
+        else:
+            store = MemoryJobStore()
+        return cls(
+            store=store,
+            workers=int(os.getenv("JOB_WORKERS", "2")),
+            retention_seconds=int(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600))),
+        )
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    # --- Lifecycle ---
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        # Jobs interrupted by a restart cannot be resumed mid-stage
+        for job in self.store.list((RUNNING,)):
+            self._finish(job, FAILED, error={"status_code": 500, "detail": "Interrupted by a server restart."})
+        for job in self.store.list((QUEUED,)):
+            self._queue.put_nowait(job.id)
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    # --- Client API ---
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+        self.store.prune(time.time() - self.retention_seconds)
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params, created_at=time.time())
+        self.store.save(job)
+        self._queue.put_nowait(job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.load(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancels a queued or running job. Finished jobs are returned unchanged."""
+        job = self.store.load(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        self._cancel_requested.add(job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            job = self._finish(job, CANCELLED)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.store.list():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "backend": type(self.store).__name__,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": len(self._running),
+            "jobs": counts,
+        }
+
+    # --- Workers ---
+    def _finish(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[Dict[str, Any]] = None) -> Job:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        self.store.save(job)
+        self._cancel_requested.discard(job.id)
+        return job
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.load(job_id)
+        if job is None or job.status != QUEUED:
+            return  # cancelled or pruned while waiting
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        self.store.save(job)
+
+        def set_stage(stage: str) -> None:
+            job.stage = stage
+            self.store.save(job)
+
+        task = asyncio.create_task(self._handlers[job.kind](job, set_stage))
+        self._running[job.id] = task
+        try:
+            result = await task
+            self._finish(job, SUCCEEDED, result=result)
+            print(f"[bold green]Job {job.id} ({job.kind}) succeeded[/bold green]")
+        except asyncio.CancelledError:
+            if job.id not in self._cancel_requested:
+                # The worker itself is shutting down
+                self._finish(job, FAILED, error={"status_code": 500, "detail": "Worker stopped before the job finished."})
+                raise
+            self._finish(job, CANCELLED)
+            print(f"[bold yellow]Job {job.id} ({job.kind}) cancelled[/bold yellow]")
+        except Exception as e:
+            # HTTPException from the shared pipeline steps carries a status code and detail
+            detail = getattr(e, "detail", None) or str(e)
+            self._finish(job, FAILED, error={"status_code": getattr(e, "status_code", 500), "detail": detail})
+            print(f"[bold red]Job {job.id} ({job.kind}) failed:[/bold red] {detail}")
+        finally:
+            self._running.pop(job.id, None)
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import os
+import re
+import subprocess
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from backend.latex_resume_generator.utils.metrics import record_tex_pass
+
+COMPILE_TIMEOUT = 30  # seconds per engine pass
+MAX_PASSES = int(os.getenv("LATEX_MAX_PASSES", "4"))
+# Bookmarks only show in the viewer's outline pane, so by default they are not worth another pass
+RERUN_FOR_OUTLINES = os.getenv("LATEX_RERUN_FOR_OUTLINES", "false").lower() == "true"
+
+# Messages from the kernel and packages (longtable, lastpage, rerunfilecheck, ...) asking for another pass
+_RERUN_RE = re.compile(r'Label\(s\) may have changed|Table widths have changed|Temporary extra page|\brerun\b', re.IGNORECASE)
+_OUTLINE_RERUN_RE = re.compile(r'outlines', re.IGNORECASE)
+# Cross-reference data a pass writes for the next one to read
+_AUX_ENTRY_RE = re.compile(r'^\\(?:newlabel|bibcite)\b')
+_LIST_EXTENSIONS = (".toc", ".lof", ".lot")
+
+
+class CompileResult(NamedTuple):
+    success: bool
+    log: str
+    passes: int
+
+
+def build_command(latex_file_path: Optional[str], output_dir: str, engine: str, fmt: Optional[str] = None) -> List[str]:
+    # fmt names a precompiled format (found in the working directory) holding the preamble;
+    # without a file the engine waits at its ** prompt for the file name on stdin, then loads its format
+    return [
+        "env", "-i", "PATH=/usr/bin:/bin:/usr/local/bin",
+        f"/usr/bin/{engine}", "-output-directory", output_dir,
+        "-interaction=nonstopmode", "-file-line-error",
+        *([f"-fmt={fmt}"] if fmt else []), *([latex_file_path] if latex_file_path else [])
+    ]
+
+
+def _pdf_path(latex_file_path: str, output_dir: str) -> str:
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(latex_file_path))[0] + ".pdf")
+
+
+def aux_snapshot(latex_file_path: str, output_dir: str) -> Dict[str, str]:
+    """Hashes the cross-reference data in a build's auxiliary files, ignoring the boilerplate rewritten every pass."""
+    stem = os.path.join(output_dir, os.path.splitext(os.path.basename(latex_file_path))[0])
+    snapshot = {}
+    for ext in (".aux",) + _LIST_EXTENSIONS + ((".out",) if RERUN_FOR_OUTLINES else ()):
+        try:
+            with open(stem + ext, "rb") as f:
+                content = f.read()
+        except OSError:
+            continue
+        if ext == ".aux":
+            lines = content.decode("utf-8", errors="replace").splitlines()
+            content = "\n".join(line for line in lines if _AUX_ENTRY_RE.match(line)).encode()
+        if content:
+            snapshot[ext] = hashlib.sha256(content).hexdigest()
+    return snapshot
+
+
+def needs_rerun(log: str, before: Dict[str, str], after: Dict[str, str]) -> bool:
+    """
+    Decides, latexmk-style, whether another pass is needed: when the log asks
+    for one or when the cross-reference data written differs from what the
+    pass read. Documents without references, lists or page totals stop after one.
+    """
+    if before != after:
+        return True
+    for line in log.splitlines():
+        if _RERUN_RE.search(line) and (RERUN_FOR_OUTLINES or not _OUTLINE_RERUN_RE.search(line)):
+            return True
+    return False
+
+
+def compile_latex_to_pdf(latex_file_path: str, output_dir: str, engine: str = "pdflatex", fmt: Optional[str] = None) -> CompileResult:
+    """Compiles a .tex file to a .pdf using a specified engine, rerunning it only while references change."""
+    passes = 0
+    try:
+        while True:
+            before = aux_snapshot(latex_file_path, output_dir)
+            command = build_command(latex_file_path, output_dir, engine, fmt)
+            passes += 1
+            started = time.perf_counter()
+            try:
+                process = subprocess.run(command, check=True, capture_output=True, text=True, timeout=COMPILE_TIMEOUT, cwd=output_dir)
+            finally:
+                record_tex_pass(engine, passes, time.perf_counter() - started)
+            if passes >= MAX_PASSES or not needs_rerun(process.stdout, before, aux_snapshot(latex_file_path, output_dir)):
+                return CompileResult(True, process.stdout, passes)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+        log = (getattr(e, 'stdout', '') or '') + "\n" + (getattr(e, 'stderr', '') or '')
+        if isinstance(e, FileNotFoundError):
+            log = f"{engine} command not found. Please install a LaTeX distribution (e.g., TeX Live)."
+        # Check if PDF was created despite errors
+        if isinstance(e, subprocess.CalledProcessError) and e.returncode == 1:
+            if os.path.exists(_pdf_path(latex_file_path, output_dir)):
+                return CompileResult(True, log, passes)
+        return CompileResult(False, log, passes)
+
+
+async def compile_latex_to_pdf_async(latex_file_path: str, output_dir: str, engine: str = "pdflatex", fmt: Optional[str] = None) -> CompileResult:
+    """
+    Async variant of compile_latex_to_pdf. Runs the engine as an asyncio
+    subprocess so a long compile never blocks the event loop.
+    """
+    log = ""
+    passes = 0
+    try:
+        while True:
+            before = aux_snapshot(latex_file_path, output_dir)
+            passes += 1
+            command = build_command(latex_file_path, output_dir, engine, fmt)
+            started = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=output_dir,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=COMPILE_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                process.kill()
+                await process.wait()
+                raise
+            finally:
+                record_tex_pass(engine, passes, time.perf_counter() - started)
+            log = stdout.decode(errors="replace")
+            if process.returncode != 0:
+                log += "\n" + stderr.decode(errors="replace")
+                # Check if PDF was created despite errors
+                if process.returncode == 1 and os.path.exists(_pdf_path(latex_file_path, output_dir)):
+                    return CompileResult(True, log, passes)
+                return CompileResult(False, log, passes)
+            if passes >= MAX_PASSES or not needs_rerun(log, before, aux_snapshot(latex_file_path, output_dir)):
+                return CompileResult(True, log, passes)
+    except asyncio.TimeoutError:
+        return CompileResult(False, log + f"\n{engine} timed out after {COMPILE_TIMEOUT} seconds.", passes)
+    except FileNotFoundError:
+        return CompileResult(False, f"{engine} command not found. Please install a LaTeX distribution (e.g., TeX Live).", passes)
@@ -0,0 +1,295 @@
+import re
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from backend.latex_resume_generator.utils.template_registry import TemplateInfo
+
+# Commands that are fine in any document body, whatever the template
+BASE_COMMANDS = frozenset("""
+    begin end item section subsection subsubsection paragraph textbf textit texttt textsc textsf
+    textrm textup textmd textnormal emph underline uline mbox makebox fbox framebox parbox raisebox
+    href url hyperlink hypertarget nolinkurl small footnotesize scriptsize tiny normalsize large Large
+    LARGE huge Huge bfseries itshape scshape ttfamily sffamily rmfamily mdseries upshape normalfont
+    centering raggedright raggedleft noindent indent par newline linebreak pagebreak newpage clearpage
+    hfill vfill hspace vspace smallskip medskip bigskip quad qquad enspace thinspace hrule vrule rule
+    hline cline textwidth linewidth columnwidth paperwidth textheight baselineskip parskip parindent
+    tabcolsep arraystretch extracolsep setlength addtolength setcounter stepcounter addtocounter
+    newcommand renewcommand providecommand def let relax ifx else fi color textcolor colorbox
+    definecolor includegraphics label ref pageref cite footnote today LaTeX TeX ldots dots cdot
+    textbullet bullet textbar textendash textemdash textasciitilde textasciicircum textbackslash
+    textdegree textregistered texttrademark copyright S P pounds euro checkmark times pm rightarrow
+    leftarrow Rightarrow to sim approx leq geq neq infty alpha beta gamma delta mu pi sigma lambda
+    frac sqrt sum int mathbf mathrm mathit mathcal text textsuperscript textsubscript ensuremath
+    multicolumn multirow thispagestyle pagestyle fancyhf fancyhead fancyfoot setmainfont
+    setsansfont fontsize selectfont faIcon faEnvelope faPhone faGithub faLinkedin faGlobe faMapMarker faMapMarkerAlt faLink faTwitter faHome faLinkedinIn
+    input include vskip hskip kern nobreak hbox vbox strut phantom hphantom vphantom null space
+    nopagebreak enlargethispage columnbreak maketitle title author date and thanks
+""".split())
+
+# Environments whose rows are separated by &
+ALIGNMENT_ENVIRONMENTS = ("tabular", "tabular*", "tabularx", "tabulary", "longtable", "array", "align",
+                          "align*", "alignat", "eqnarray", "matrix", "pmatrix", "bmatrix", "cases")
+# Environments whose contents are not LaTeX text
+VERBATIM_ENVIRONMENTS = ("verbatim", "verbatim*", "lstlisting", "minted", "comment")
+# Commands whose arguments are names, paths or URLs rather than text
+_RAW_ARGUMENT_RE = re.compile(
+    r'\\(?:url|href|hyperlink|hypertarget|includegraphics|label|ref|pageref|cite|input|include|usepackage'
+    r'|RequirePackage|documentclass|begin|end|setlength|definecolor|color|textcolor|photo)\*?\s*(?:\[[^\]]*\]\s*)?\{'
+)
+_DEFINITION_RE = re.compile(
+    r'\\(?:newcommand|renewcommand|providecommand|DeclareRobustCommand|NewDocumentCommand|RenewDocumentCommand'
+    r'|DeclareMathOperator|newlength|newcounter|newsavebox|newif)\*?\s*\{?\\?([A-Za-z@]+)'
+    r'|\\(?:def|gdef|edef|xdef|let)\s*\\([A-Za-z@]+)'
+    r'|\\newenvironment\*?\s*\{([A-Za-z@*]+)\}'
+)
+_COMMAND_RE = re.compile(r'\\([A-Za-z@]+)')
+_ENVIRONMENT_RE = re.compile(r'\\(begin|end)\s*\{([^}]*)\}')
+_BEGIN_DOCUMENT = r'\begin{document}'
+_END_DOCUMENT = r'\end{document}'
+
+
+class LintIssue(BaseModel):
+    line: int
+    severity: str  # "error" prevents compilation, "warning" does not
+    message: str
+    fixed: bool = False
+
+
+class LintResult(BaseModel):
+    """The (possibly auto-fixed) document and everything found in it."""
+    latex: str
+    issues: List[LintIssue] = []
+
+    @property
+    def errors(self) -> List[LintIssue]:
+        return [issue for issue in self.issues if issue.severity == "error"]
+
+    @property
+    def fixes(self) -> int:
+        return sum(issue.fixed for issue in self.issues)
+
+
+def _escaped(text: str, i: int) -> bool:
+    """True if text[i] is preceded by an odd number of backslashes."""
+    count = 0
+    while i > 0 and text[i - 1] == '\\':
+        count += 1
+        i -= 1
+    return count % 2 == 1
+
+
+def _split_comment(line: str) -> Tuple[str, str]:
+    """Splits a line at its first unescaped % into code and comment."""
+    for i, char in enumerate(line):
+        if char == '%' and not _escaped(line, i):
+            return line[:i], line[i:]
+    return line, ""
+
+
+def _brace_end(text: str, start: int) -> int:
+    """Index just after the brace group whose contents start at text[start]."""
+    depth, i = 1, start
+    while i < len(text) and depth:
+        if text[i] == '\\':
+            i += 2
+            continue
+        depth += {'{': 1, '}': -1}.get(text[i], 0)
+        i += 1
+    return i
+
+
+def _protected_spans(code: str) -> List[Tuple[int, int]]:
+    """Spans of a line that must not be touched: raw command arguments and inline math."""
+    spans = []
+    for match in _RAW_ARGUMENT_RE.finditer(code):
+        spans.append((match.start(), _brace_end(code, match.end())))
+    for match in re.finditer(r'\\\(.*?\\\)|\\\[.*?\\\]', code):
+        spans.append(match.span())
+    dollars = [i for i, char in enumerate(code) if char == '$' and not _escaped(code, i)]
+    for open_, close in zip(dollars[::2], dollars[1::2]):
+        spans.append((open_, close + 1))
+    return spans
+
+
+def _fix_line(code: str, in_alignment: bool) -> Tuple[str, List[str]]:
+    """Escapes stray special characters in the text of one line. Returns the line and what was fixed."""
+    fixed: List[str] = []
+
+    # "$100K": an odd number of $ on a line usually means a currency amount
+    dollars = [i for i, char in enumerate(code) if char == '$' and not _escaped(code, i)]
+    if len(dollars) % 2:
+        for i in reversed(dollars):
+            if i + 1 < len(code) and code[i + 1].isdigit():
+                code = code[:i] + '\\' + code[i:]
+                fixed.append("$")
+                break
+
+    spans = _protected_spans(code)
+    out = []
+    for i, char in enumerate(code):
+        if (char in '&#_' and not _escaped(code, i)
+                and not (char == '&' and in_alignment)
+                and not any(start <= i < stop for start, stop in spans)):
+            out.append('\\' + char)
+            fixed.append(char)
+        else:
+            out.append(char)
+    return "".join(out), fixed
+
+
+def _escape_percent_signs(line: str) -> Tuple[str, int]:
+    """Escapes % that follows a number ("40%"), which LLMs leave unescaped and TeX reads as a comment."""
+    count = 0
+    i = 0
+    while i < len(line):
+        if line[i] == '%' and not _escaped(line, i):
+            if i > 0 and (line[i - 1].isdigit() or (line[i - 1] == ' ' and i > 1 and line[i - 2].isdigit())):
+                line = line[:i] + '\\' + line[i:]
+                count += 1
+                i += 2
+                continue
+            break  # a real comment
+        i += 1
+    return line, count
+
+
+def _aligned(environments: List[str]) -> bool:
+    return any(env in ALIGNMENT_ENVIRONMENTS for env in environments)
+
+
+def _track(environments: List[str], kind: str, name: str) -> None:
+    """Updates the stack of open environments for one \\begin or \\end."""
+    if kind == "begin":
+        environments.append(name)
+    elif name in environments:
+        del environments[len(environments) - 1 - environments[::-1].index(name)]
+
+
+def definitions(text: str) -> FrozenSet[str]:
+    """Names of the commands and environments defined in some LaTeX source."""
+    names = set()
+    for match in _DEFINITION_RE.finditer(text):
+        names.update(group for group in match.groups() if group)
+    return frozenset(names)
+
+
+_template_commands: Dict[Tuple[str, Tuple], FrozenSet[str]] = {}
+
+
+def template_commands(template: TemplateInfo) -> FrozenSet[str]:
+    """
+    Commands a document for this template may use: everything the template's
+    own example document uses, and everything its class and style files define.
+    """
+    key = (template.name, template.fingerprint)
+    if key not in _template_commands:
+        names = set(_COMMAND_RE.findall(template.template_tex)) | set(_COMMAND_RE.findall(template.skeleton))
+        for asset in template.assets:
+            if asset.endswith((".cls", ".sty")):
+                try:
+                    names |= definitions(Path(asset).read_text(errors="replace"))
+                except OSError:
+                    continue
+        _template_commands[key] = frozenset(names)
+    return _template_commands[key]
+
+
+def lint_latex(latex: str, known_commands: Optional[Iterable[str]] = None) -> LintResult:
+    """
+    Checks a LaTeX document without running TeX and repairs what is safe to repair:
+    unescaped & % $ # _ in text, and a missing \\end{document}. Unbalanced braces
+    or environments are errors; commands unknown to the template are warnings.
+    """
+    issues: List[LintIssue] = []
+
+    if r'\documentclass' not in latex:
+        issues.append(LintIssue(line=1, severity="error", message="Missing \\documentclass."))
+    if _BEGIN_DOCUMENT not in latex:
+        issues.append(LintIssue(line=1, severity="error", message="Missing \\begin{document}."))
+        return LintResult(latex=latex, issues=issues)
+    if _END_DOCUMENT not in latex:
+        latex = latex.rstrip() + "\n" + _END_DOCUMENT + "\n"
+        issues.append(LintIssue(line=latex.count("\n"), severity="warning",
+                                message="Missing \\end{document}; appended it.", fixed=True))
+
+    lines = latex.split("\n")
+    body_start = next(i for i, line in enumerate(lines) if _BEGIN_DOCUMENT in _split_comment(line)[0])
+
+    # --- Escape repairs, body only: the preamble legitimately uses # and & in definitions ---
+    environments: List[str] = []
+    for number in range(body_start + 1, len(lines)):
+        code, comment = _split_comment(lines[number])
+        if _DEFINITION_RE.search(code) or any(env in VERBATIM_ENVIRONMENTS for env in environments):
+            for kind, name in _ENVIRONMENT_RE.findall(code):
+                _track(environments, kind, name)
+            continue
+
+        line, percents = _escape_percent_signs(lines[number])
+        code, comment = _split_comment(line)
+        # Fix each stretch between environment markers in the context it sits in
+        pieces, fixed, last = [], ["%"] * percents, 0
+        for match in _ENVIRONMENT_RE.finditer(code):
+            piece, piece_fixed = _fix_line(code[last:match.start()], _aligned(environments))
+            pieces += [piece, match.group(0)]
+            fixed += piece_fixed
+            _track(environments, match.group(1), match.group(2))
+            last = match.end()
+        piece, piece_fixed = _fix_line(code[last:], _aligned(environments))
+        pieces.append(piece)
+        fixed += piece_fixed
+        if fixed:
+            lines[number] = "".join(pieces) + comment
+            issues.append(LintIssue(line=number + 1, severity="warning", fixed=True,
+                                    message=f"Escaped {' '.join(sorted(set(fixed)))} in text."))
+    latex = "\n".join(lines)
+
+    # --- Structure: braces and environments, ignoring comments ---
+    depth = 0
+    opened: List[int] = []
+    stack: List[Tuple[str, int]] = []
+    for number, line in enumerate(lines, start=1):
+        code, _ = _split_comment(line)
+        for kind, name in _ENVIRONMENT_RE.findall(code):
+            if kind == "begin":
+                stack.append((name, number))
+            elif name not in (env for env, _ in stack):
+                issues.append(LintIssue(line=number, severity="error", message=f"\\end{{{name}}} without a matching \\begin."))
+            else:
+                while stack[-1][0] != name:
+                    env, begun = stack.pop()
+                    issues.append(LintIssue(line=begun, severity="error",
+                                            message=f"\\begin{{{env}}} is closed by \\end{{{name}}} on line {number}."))
+                stack.pop()
+        if any(env in VERBATIM_ENVIRONMENTS for env, _ in stack):
+            continue
+        for i, char in enumerate(code):
+            if char in '{}' and not _escaped(code, i):
+                if char == '{':
+                    depth += 1
+                    opened.append(number)
+                elif depth:
+                    depth -= 1
+                    opened.pop()
+                else:
+                    issues.append(LintIssue(line=number, severity="error", message="Unmatched closing brace."))
+    for name, number in stack:
+        issues.append(LintIssue(line=number, severity="error", message=f"\\begin{{{name}}} is never closed."))
+    if depth:
+        issues.append(LintIssue(line=opened[0], severity="error",
+                                message=f"{depth} unclosed brace{'s' if depth > 1 else ''}, the first opened here."))
+
+    # --- Commands the template does not know ---
+    if known_commands is not None:
+        known = BASE_COMMANDS | frozenset(known_commands) | definitions(latex)
+        seen = set()
+        for number in range(body_start, len(lines)):
+            code, _ = _split_comment(lines[number])
+            for name in _COMMAND_RE.findall(code):
+                if name not in known and name not in seen:
+                    seen.add(name)
+                    issues.append(LintIssue(line=number + 1, severity="warning",
+                                            message=f"Unknown command \\{name} for this template."))
+
+    return LintResult(latex=latex, issues=sorted(issues, key=lambda issue: issue.line))
@@ -0,0 +1,222 @@
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from jinja2 import Environment, StrictUndefined, Template
+from pydantic import ValidationError
+
+from backend.latex_resume_generator.schemas.enhanced_resume_schema import EnhancedResumeSchema
+from backend.latex_resume_generator.utils.template_registry import TemplateError, TemplateRegistry
+
+LATEX_SPECIAL_CHARS = {
+    '\\': r'\textbackslash{}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+}
+_LATEX_SPECIAL_RE = re.compile('|'.join(re.escape(c) for c in LATEX_SPECIAL_CHARS))
+
+
+class RenderError(ValueError):
+    """Raised when resume data cannot be rendered deterministically."""
+
+
+class LaTeXString(str):
+    """A string that is already valid LaTeX and must not be escaped again."""
+
+
+def escape_latex(text: Any) -> str:
+    """Escapes characters with special meaning in LaTeX."""
+    if text is None:
+        return ""
+    if isinstance(text, LaTeXString):
+        return text
+    return _LATEX_SPECIAL_RE.sub(lambda m: LATEX_SPECIAL_CHARS[m.group()], str(text))
+
+
+def escape_url(url: Any) -> LaTeXString:
+    """Prepares a URL for \\href: adds a scheme if missing and escapes what hyperref cannot take raw."""
+    url = str(url or "").strip()
+    if url and not re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*:', url):
+        url = "https://" + url
+    return LaTeXString(url.replace('\\', '/').replace('%', r'\%').replace('#', r'\#'))
+
+
+def display_url(url: Any) -> str:
+    """Shortens a URL for display by dropping the scheme, 'www.' and trailing slash."""
+    url = re.sub(r'^[a-zA-Z][a-zA-Z0-9+.-]*://', '', str(url or "").strip())
+    return re.sub(r'^www\.', '', url).rstrip('/')
+
+
+def latex_join(items: Optional[List[Any]], separator: str = ", ") -> LaTeXString:
+    """Escapes each item and joins them with a raw LaTeX separator."""
+    return LaTeXString(separator.join(escape_latex(item) for item in (items or []) if item))
+
+
+def raw(value: Any) -> LaTeXString:
+    """Marks trusted template text as LaTeX so it is emitted unescaped."""
+    return LaTeXString(value)
+
+
+def _finalize(value: Any) -> str:
+    # Every << >> expression goes through here, so escaping is the default
+    return escape_latex(value)
+
+
+def date_range(start: Optional[str], end: Optional[str]) -> LaTeXString:
+    parts = [p.strip() for p in (start, end) if p and p.strip()]
+    return LaTeXString(" -- ".join(escape_latex(p) for p in parts))
+
+
+def section_items(value: Any) -> List[str]:
+    """Flattens a free-form additional section into a list of display lines."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [f"{k}: {v}" if not isinstance(v, (list, dict)) else f"{k}: {', '.join(section_items(v))}"
+                for k, v in value.items()]
+    if isinstance(value, list):
+        lines = []
+        for item in value:
+            if isinstance(item, dict):
+                lines.append(" -- ".join(str(v) for v in item.values() if v not in (None, "", [])))
+            else:
+                lines.append(str(item))
+        return [line for line in lines if line]
+    return [str(value)]
+
+
+def normalize_resume_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validates resume data against EnhancedResumeSchema. Data in the basic
+    ResumeSchema shape (enhancement skipped) is converted first: flat
+    technical/soft skills become categories and project descriptions become
+    brief descriptions.
+    """
+    data = dict(data)
+    skills = data.get("skills")
+    if isinstance(skills, dict):
+        data["skills"] = [
+            {"category_name": name.replace("_", " ").title(), "skills": values}
+            for name, values in skills.items() if values
+        ]
+    projects = []
+    for project in data.get("projects") or []:
+        project = dict(project)
+        if "brief_description" not in project:
+            project["brief_description"] = project.pop("description", "")
+        project.setdefault("detailed_points", [])
+        project.setdefault("technologies", [])
+        projects.append(project)
+    data["projects"] = projects
+
+    try:
+        return EnhancedResumeSchema.model_validate(data).model_dump()
+    except ValidationError as e:
+        raise RenderError(f"Resume data does not match EnhancedResumeSchema: {e}") from e
+
+
+def contact_items(personal_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Builds the ordered contact line shared by all templates."""
+    items = []
+    if personal_info.get("phone"):
+        phone = personal_info["phone"]
+        items.append({"kind": "phone", "label": None, "text": phone, "url": "tel:" + re.sub(r'[^0-9+]', '', phone)})
+    if personal_info.get("email"):
+        email = personal_info["email"]
+        items.append({"kind": "email", "label": None, "text": email, "url": "mailto:" + email})
+    if personal_info.get("location"):
+        items.append({"kind": "location", "label": None, "text": personal_info["location"], "url": None})
+    for kind, label in (("linkedin", "LinkedIn"), ("github", "GitHub"), ("twitter", "Twitter"), ("website", "Website")):
+        url = personal_info.get(f"{kind}_url")
+        if url:
+            items.append({"kind": kind, "label": label, "text": display_url(url), "url": url})
+    for label, url in (personal_info.get("other_links") or {}).items():
+        if url:
+            items.append({"kind": "other", "label": label, "text": display_url(url), "url": url})
+    return items
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    parts = (name or "").split()
+    if len(parts) < 2:
+        return name or "", ""
+    return " ".join(parts[:-1]), parts[-1]
+
+
+def _build_environment() -> Environment:
+    # LaTeX-friendly delimiters: braces and % are everywhere in TeX sources
+    env = Environment(
+        block_start_string='<%',
+        block_end_string='%>',
+        variable_start_string='<<',
+        variable_end_string='>>',
+        comment_start_string='<#',
+        comment_end_string='#>',
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+        autoescape=False,
+        finalize=_finalize,
+        undefined=StrictUndefined,
+    )
+    env.filters.update({
+        "url": escape_url,
+        "display_url": display_url,
+        "latex_join": latex_join,
+        "raw": raw,
+    })
+    env.globals.update({
+        "date_range": date_range,
+        "section_items": section_items,
+        "split_name": split_name,
+    })
+    return env
+
+
+class LaTeXRenderer:
+    """
+    Renders EnhancedResumeSchema data straight into a template's .tex file using
+    the template's Jinja renderer (the 'renderer' key in template.cfg), without
+    calling the LLM. Templates without a renderer are reported as unsupported.
+    """
+
+    def __init__(self, template_registry: Optional[TemplateRegistry] = None):
+        self.templates = template_registry or TemplateRegistry()
+        self.env = _build_environment()
+        self._compiled: Dict[Tuple[str, str], Template] = {}
+
+    def supports(self, template_name: str) -> bool:
+        try:
+            return self.templates.get(template_name).renderer is not None
+        except TemplateError:
+            return False
+
+    def _compile(self, template_name: str, source: str) -> Template:
+        # Keyed on the source hash so a hot-reloaded renderer is recompiled
+        key = (template_name, hashlib.sha256(source.encode()).hexdigest())
+        if key not in self._compiled:
+            self._compiled[key] = self.env.from_string(source)
+        return self._compiled[key]
+
+    def render(self, template_name: str, resume_data: Dict[str, Any]) -> str:
+        """Renders resume data into a complete LaTeX document for a template."""
+        template = self.templates.get(template_name)
+        if template.renderer is None:
+            raise RenderError(f"Template '{template_name}' has no deterministic renderer")
+
+        resume = normalize_resume_data(resume_data)
+        context = dict(resume)
+        context["contact"] = contact_items(resume["personal_info"])
+        try:
+            return self._compile(template_name, template.renderer).render(**context)
+        except Exception as e:
+            raise RenderError(f"Failed to render template '{template_name}': {e}") from e
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from backend.latex_resume_generator.utils.build_workspace import TEX_FILENAME
+
+# "./enhanced_resume.tex:42: Undefined control sequence." (-file-line-error)
+_FILE_LINE_ERROR_RE = re.compile(r'^(.*?\.(?:tex|cls|sty|def|cfg)):(\d+): (.*)$')
+# "! Undefined control sequence." followed a few lines later by "l.42 \foo"
+_BANG_ERROR_RE = re.compile(r'^! (.*)$')
+_LINE_MARKER_RE = re.compile(r'^l\.(\d+)\s?(.*)$')
+# Follow-up messages that only repeat that the run failed
+_NOISE = ("Emergency stop", "==> Fatal error occurred", "Job aborted", "no output PDF file produced")
+
+
+class TexError(BaseModel):
+    """One error reported by the TeX engine (or the linter)."""
+    file: Optional[str] = None
+    line: Optional[int] = None
+    message: str
+    context: str = ""
+
+
+def parse_tex_log(log: str) -> List[TexError]:
+    """Extracts the errors from a TeX log, in the order TeX reported them."""
+    errors: List[TexError] = []
+    lines = log.splitlines()
+    for i, text in enumerate(lines):
+        match = _FILE_LINE_ERROR_RE.match(text)
+        bang = _BANG_ERROR_RE.match(text)
+        if not match and not bang:
+            continue
+        file, line, message = (match.group(1), int(match.group(2)), match.group(3)) if match else (None, None, bang.group(1))
+        if any(noise in message for noise in _NOISE):
+            continue
+        context = ""
+        # The offending source line follows as "l.<n> <text>"
+        for follow in lines[i + 1:i + 12]:
+            marker = _LINE_MARKER_RE.match(follow)
+            if marker:
+                line = line or int(marker.group(1))
+                context = marker.group(2).strip()
+                break
+            if _FILE_LINE_ERROR_RE.match(follow) or _BANG_ERROR_RE.match(follow):
+                break
+        error = TexError(file=file, line=line, message=message.strip(), context=context)
+        if error not in errors:
+            errors.append(error)
+    return errors
+
+
+def error_regions(latex: str, errors: List[TexError], context_lines: int = 6, max_regions: int = 3) -> List[Tuple[int, int, List[TexError]]]:
+    """
+    Groups errors into non-overlapping line windows of the document
+    (0-based start, exclusive stop) with the errors that fall in each.
+    """
+    total = latex.count("\n") + 1
+    windows: List[Tuple[int, int, List[TexError]]] = []
+    for error in sorted((e for e in errors if e.line), key=lambda e: e.line):
+        start = max(0, error.line - 1 - context_lines)
+        stop = min(total, error.line + context_lines)
+        if windows and start <= windows[-1][1]:
+            prev_start, prev_stop, prev_errors = windows[-1]
+            windows[-1] = (prev_start, max(prev_stop, stop), prev_errors + [error])
+        else:
+            windows.append((start, stop, [error]))
+    return windows[:max_regions]
+
+
+def replace_lines(latex: str, replacements: Dict[Tuple[int, int], str]) -> str:
+    """Replaces line windows of a document, given as (start, stop) -> new text."""
+    lines = latex.split("\n")
+    for (start, stop), text in sorted(replacements.items(), reverse=True):
+        lines[start:stop] = text.rstrip("\n").split("\n")
+    return "\n".join(lines)
+
+
+class LatexBuildError(Exception):
+    """A document failed to build; errors are what the log or linter reported."""
+
+    def __init__(self, errors: List[TexError], detail: Any):
+        super().__init__(errors[0].message if errors else "LaTeX build failed")
+        self.errors = errors
+        self.detail = detail
+
+
+# Builds a document, returning it as compiled (e.g. after lint fixes) and the PDF
+CompileFn = Callable[[str], Awaitable[Tuple[str, bytes]]]
+RepairFn = Callable[[str, List[TexError]], Awaitable[str]]
+
+
+class CompileRepairer:
+    """
+    Bounded repair loop around a compile: when a build fails, only the lines
+    around each reported error are sent back to the model for a fix, and the
+    patched document is rebuilt, up to max_attempts repairs and deadline_seconds
+    of total time. Counts how often repairs succeed.
+    """
+
+    def __init__(self, max_attempts: int = 2, deadline_seconds: float = 90.0, context_lines: int = 6):
+        self.max_attempts = max(0, max_attempts)
+        self.deadline_seconds = deadline_seconds
+        self.context_lines = context_lines
+        self.builds = 0
+        self.failed_builds = 0
+        self.repair_attempts = 0
+        self.repaired = 0
+        self.gave_up: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CompileRepairer":
+        return cls(
+            max_attempts=int(os.getenv("LATEX_REPAIR_ATTEMPTS", "2")),
+            deadline_seconds=float(os.getenv("LATEX_REPAIR_DEADLINE_SECONDS", "90")),
+        )
+
+    def _give_up(self, reason: str, error: LatexBuildError, attempts: int) -> LatexBuildError:
+        with self._lock:
+            self.gave_up[reason] = self.gave_up.get(reason, 0) + 1
+        if isinstance(error.detail, dict):
+            error.detail = {**error.detail, "repair_attempts": attempts, "repair_stopped": reason}
+        return error
+
+    async def _repair(self, latex: str, errors: List[TexError], repair: RepairFn) -> str:
+        regions = error_regions(latex, errors, self.context_lines)
+        lines = latex.split("\n")
+        fixed = await asyncio.gather(*(
+            repair("\n".join(lines[start:stop]), region_errors) for start, stop, region_errors in regions
+        ))
+        return replace_lines(latex, {(start, stop): text for (start, stop, _), text in zip(regions, fixed)})
+
+    async def run(self, latex: str, compile: CompileFn, repair: Optional[RepairFn]) -> Tuple[str, bytes, int]:
+        """
+        Builds the document, repairing it after failures. Returns the final
+        LaTeX, the PDF and the number of repairs; raises LatexBuildError
+        (with repair details in its detail) when the budget runs out.
+        """
+        deadline = time.monotonic() + self.deadline_seconds
+        attempts = 0
+        with self._lock:
+            self.builds += 1
+        while True:
+            try:
+                latex, pdf_bytes = await compile(latex)
+                if attempts:
+                    with self._lock:
+                        self.repaired += 1
+                return latex, pdf_bytes, attempts
+            except LatexBuildError as error:
+                if attempts == 0:
+                    with self._lock:
+                        self.failed_builds += 1
+                repairable = [e for e in error.errors if e.line and (not e.file or os.path.basename(e.file) == TEX_FILENAME)]
+                if repair is None:
+                    raise self._give_up("no_model", error, attempts)
+                if not repairable:
+                    raise self._give_up("no_located_errors", error, attempts)
+                if attempts >= self.max_attempts:
+                    raise self._give_up("attempts", error, attempts)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._give_up("deadline", error, attempts)
+                attempts += 1
+                with self._lock:
+                    self.repair_attempts += 1
+                try:
+                    latex = await asyncio.wait_for(self._repair(latex, repairable, repair), timeout=remaining)
+                except asyncio.TimeoutError:
+                    raise self._give_up("deadline", error, attempts)
+                except Exception as e:
+                    if isinstance(error.detail, dict):
+                        error.detail = {**error.detail, "repair_error": str(e)}
+                    raise self._give_up("repair_failed", error, attempts)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "builds": self.builds,
+                "failed_builds": self.failed_builds,
+                "repair_attempts": self.repair_attempts,
+                "repaired": self.repaired,
+                "repair_success_rate": self.repaired / self.failed_builds if self.failed_builds else 0.0,
+                "gave_up": dict(self.gave_up),
+                "max_attempts": self.max_attempts,
+                "deadline_seconds": self.deadline_seconds,
+            }
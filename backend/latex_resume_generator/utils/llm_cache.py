@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.load.dump import dumps
+from langchain_core.load.load import loads
+
+# When True, cache lookups are skipped for the current request/task. Fresh
+# responses are still written so the next cached call sees the newest result.
+_lookup_bypassed: ContextVar[bool] = ContextVar("llm_cache_lookup_bypassed", default=False)
+# Keys of the responses read or written inside the innermost discard_replies_on_error() block
+_touched_keys: ContextVar[Optional[List[str]]] = ContextVar("llm_cache_touched_keys", default=None)
+
+
+@contextmanager
+def llm_cache_scope(enabled: bool = True):
+    """Enables or bypasses LLM cache lookups for everything run inside the block."""
+    token = _lookup_bypassed.set(not enabled)
+    try:
+        yield
+    finally:
+        _lookup_bypassed.reset(token)
+
+
+@contextmanager
+def discard_replies_on_error():
+    """
+    Evicts the cached responses read or written inside the block when it
+    raises. The cache sits in front of the model, before any output parser,
+    so a reply the caller rejected (malformed JSON, a schema violation, LaTeX
+    that does not build) would otherwise be replayed on every retry and
+    resubmit. Keys from a nested block are also evicted if an outer one fails.
+    """
+    keys: List[str] = []
+    token = _touched_keys.set(keys)
+    try:
+        yield
+    except Exception:
+        cache = get_llm_cache()
+        if isinstance(cache, ResponseCache):
+            cache.discard(keys)
+        raise
+    finally:
+        _touched_keys.reset(token)
+        outer = _touched_keys.get()
+        if outer is not None:
+            outer.extend(keys)
+
+
+def _touch(key: str) -> None:
+    keys = _touched_keys.get()
+    if keys is not None:
+        keys.append(key)
+
+
+def llm_cache_key(prompt: str, llm_string: str) -> str:
+    """
+    Hashes the rendered prompt together with the model description. The
+    llm_string produced by langchain includes the model name and temperature.
+    """
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache(BaseCache, ABC):
+    """
+    Base class for the deterministic LLM response caches. Plugged in as the
+    global langchain cache, it sits in front of every chat model call made by
+    the agents. Subclasses only implement raw key/value storage.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.discarded = 0
+        self._lock = threading.Lock()
+
+    # --- Storage hooks ---
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Tuple[float, RETURN_VAL_TYPE]]:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        ...
+
+    @abstractmethod
+    def _delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def _clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def _size(self) -> int:
+        ...
+
+    # --- langchain BaseCache interface ---
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if _lookup_bypassed.get():
+            self.bypassed += 1
+            return None
+        key = llm_cache_key(prompt, llm_string)
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None and self.ttl_seconds and time.time() - entry[0] > self.ttl_seconds:
+                self._delete(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        _touch(key)
+        return entry[1]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = llm_cache_key(prompt, llm_string)
+        with self._lock:
+            self._set(key, return_val)
+        _touch(key)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Removes entries whose replies were rejected by their caller."""
+        with self._lock:
+            for key in set(keys):
+                if self._get(key) is not None:
+                    self._delete(key)
+                    self.discarded += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._clear()
+
+    # Lookups are local and fast, so the async variants run inline rather than
+    # hopping to a thread (which would also lose the per-request bypass flag).
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        self.clear(**kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._size()
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "discarded": self.discarded,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache of LLM responses."""
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: int = 1000):
+        super().__init__(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._entries: "OrderedDict[str, Tuple[float, RETURN_VAL_TYPE]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Tuple[float, RETURN_VAL_TYPE]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _set(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self._entries[key] = (time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+
+    def _size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Persistent LLM response cache stored in a local SQLite database."""
+
+    def __init__(self, path: str, ttl_seconds: Optional[int] = None, max_entries: int = 10000):
+        super().__init__(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (accessed_at)")
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[Tuple[float, RETURN_VAL_TYPE]]:
+        row = self._conn.execute("SELECT created_at, value FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            generations = [loads(item) for item in json.loads(row[1])]
+        except Exception:
+            # Entries written by an incompatible langchain version are treated as misses
+            self._delete(key)
+            return None
+        self._conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return row[0], generations
+
+    def _set(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps([dumps(item) for item in value]), now, now),
+        )
+        overflow = self._size() - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+        self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def _clear(self) -> None:
+        self._conn.execute("DELETE FROM llm_responses")
+        self._conn.commit()
+
+    def _size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+
+def configure_llm_cache() -> Optional[ResponseCache]:
+    """
+    Builds the response cache selected by LLM_CACHE_BACKEND (memory, sqlite
+    or none) and installs it as the global langchain cache.
+    """
+    backend = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    ttl_value = os.getenv("LLM_CACHE_TTL_SECONDS")
+    ttl_seconds = int(ttl_value) if ttl_value else None
+
+    if backend == "memory":
+        cache = MemoryResponseCache(
+            ttl_seconds=ttl_seconds,
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+        )
+    elif backend == "sqlite":
+        default_path = os.path.join(
+            os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+            "resume-latex", "llm_cache.sqlite3",
+        )
+        cache = SQLiteResponseCache(
+            path=os.getenv("LLM_CACHE_PATH") or default_path,
+            ttl_seconds=ttl_seconds,
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+        )
+    else:
+        cache = None
+
+    set_llm_cache(cache)
+    return cache
@@ -0,0 +1,273 @@
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# (name, seconds) of the stages run for the current request, reported in its Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, values: Sequence[Any]) -> Tuple[str, ...]:
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {tuple(values)}")
+        return tuple(str(value) for value in values)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: count per bucket (not cumulative), sum of observations
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _labels(self.label_names + ("le",), key + (_number(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Snapshot(_Metric):
+    """Values kept elsewhere (e.g. a cache's own counters), read each time metrics are rendered."""
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Sequence[str], read: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, help, label_names)
+        self.kind = kind
+        self.read = read
+
+    def render(self) -> List[str]:
+        try:
+            values = sorted(self.read().items())
+        except Exception:
+            return []
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in values]
+
+
+class MetricsRegistry:
+    """Holds the process's metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> Any:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, label_names, buckets))
+
+    def snapshot(self, name: str, help: str, kind: str, label_names: Sequence[str], read: Callable[[], Dict[Tuple[str, ...], float]]) -> Snapshot:
+        return self._add(Snapshot(name, help, kind, label_names, read))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header() + samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "resume_stage_duration_seconds", "Time spent in each pipeline stage.", ("stage",)
+)
+TEX_PASS_SECONDS = REGISTRY.histogram(
+    "resume_tex_pass_duration_seconds", "Duration of single TeX engine passes.", ("engine", "pass")
+)
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "resume_llm_call_duration_seconds", "Latency of LLM calls answered by the model.", ("agent",)
+)
+LLM_CALLS = REGISTRY.counter(
+    "resume_llm_calls_total", "LLM calls by outcome: answered by the model, from the LLM cache, or failed.", ("agent", "outcome")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "resume_llm_tokens_total", "Tokens of LLM calls answered by the model, as reported or estimated from text length.", ("agent", "direction")
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "resume_http_request_duration_seconds", "HTTP request latency until the response starts.", ("method", "route", "status")
+)
+
+
+@contextmanager
+def request_timings() -> Iterator[List[Tuple[str, float]]]:
+    """Collects the stage timings recorded while handling one request."""
+    timings: List[Tuple[str, float]] = []
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def record_timing(name: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Times a pipeline stage into resume_stage_duration_seconds and the request's Server-Timing."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage)
+        record_timing(stage, seconds)
+
+
+def timed_stage(stage: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorates an async function so every call is timed as a pipeline stage."""
+    def decorate(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed(stage):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_tex_pass(engine: str, number: int, seconds: float) -> None:
+    TEX_PASS_SECONDS.observe(seconds, engine, number)
+    record_timing(f"tex-pass-{number}", seconds)
+
+
+def server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    """Formats timings as a Server-Timing header value, in milliseconds."""
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """
+    Records the outcome, latency and token counts of one agent's chat model
+    calls. Answers from the LLM cache come back without llm_output and count
+    as cache calls. The Gemini client in use does not report usage, so tokens
+    are estimated at about four characters each unless usage metadata is present.
+    """
+
+    CHARS_PER_TOKEN = 4
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._runs: Dict[UUID, Tuple[float, int]] = {}
+        self._streamed: set = set()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        chars = sum(len(str(message.content)) for batch in messages for message in batch)
+        self._runs[run_id] = (time.perf_counter(), chars)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._streamed.add(run_id)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started, prompt_chars = self._runs.pop(run_id, (None, 0))
+        streamed = run_id in self._streamed
+        self._streamed.discard(run_id)
+        if response.llm_output is None and not streamed:
+            LLM_CALLS.inc(self.agent, "cache")
+            return
+        LLM_CALLS.inc(self.agent, "model")
+        if started is not None:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started, self.agent)
+
+        generations = [generation for batch in response.generations for generation in batch]
+        usage = next((
+            generation.message.usage_metadata for generation in generations
+            if getattr(getattr(generation, "message", None), "usage_metadata", None)
+        ), None)
+        if usage:
+            prompt_tokens, completion_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        else:
+            prompt_tokens = prompt_chars // self.CHARS_PER_TOKEN
+            completion_tokens = sum(len(generation.text) for generation in generations) // self.CHARS_PER_TOKEN
+        LLM_TOKENS.inc(self.agent, "prompt", amount=prompt_tokens)
+        LLM_TOKENS.inc(self.agent, "completion", amount=completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._runs.pop(run_id, None)
+        self._streamed.discard(run_id)
+        LLM_CALLS.inc(self.agent, "error")
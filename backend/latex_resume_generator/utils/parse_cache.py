@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.latex_resume_generator.schemas.enhanced_resume_schema import EnhancedResumeSchema
+from backend.latex_resume_generator.schemas.resume_schema import ResumeSchema
+
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+# Prompts whose output is stored in the cache; editing one invalidates old entries
+CACHED_PROMPTS = (
+    "resume_parsing_prompt.txt",
+    "resume_enhancement_prompt.txt",
+    "enhanced_markdown_generation_prompt.txt",
+)
+
+
+def parse_pipeline_version() -> str:
+    """Hashes the prompts and schemas that shape cached results."""
+    digest = hashlib.sha256()
+    for name in CACHED_PROMPTS:
+        path = PROMPTS_DIR / name
+        if path.exists():
+            digest.update(f"prompt={name}\0".encode())
+            digest.update(path.read_bytes())
+    for schema in (ResumeSchema, EnhancedResumeSchema):
+        digest.update(json.dumps(schema.model_json_schema(), sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def parse_cache_key(digest: str, parse_mode: str) -> str:
+    """An upload's cache key: its SHA-256 plus the parse mode, so an llm parse never returns a local one."""
+    return f"{parse_mode}:{digest}"
+
+
+class ParseCache:
+    """
+    Persistent, entry-bounded store of pipeline results per uploaded PDF,
+    keyed by the SHA-256 of the upload and the parse mode (parse_cache_key). The parsed ResumeSchema dict is
+    stored first; the enhanced data and LLM-generated Markdown are attached as
+    they are produced. Replacing an earlier stage clears the stages derived
+    from it. Entries written with different prompts or schemas are ignored.
+    """
+
+    def __init__(self, path: str, max_entries: int = 2000, version: Optional[str] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.version = version or parse_pipeline_version()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_results ("
+            " key TEXT PRIMARY KEY,"
+            " version TEXT NOT NULL,"
+            " parsed TEXT NOT NULL,"
+            " enhanced TEXT,"
+            " markdown TEXT NOT NULL DEFAULT '{}',"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_results_accessed ON parse_results (accessed_at)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["ParseCache"]:
+        """Builds the cache from environment settings, or returns None when disabled."""
+        if os.getenv("PARSE_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        default_path = os.path.join(
+            os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+            "resume-latex", "parse_cache.sqlite3",
+        )
+        return cls(
+            path=os.getenv("PARSE_CACHE_PATH") or default_path,
+            max_entries=int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "2000")),
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns {"parsed", "enhanced", "markdown"} for an upload, or None on a miss.
+        enhanced is None when it was never stored; markdown maps variant names to text.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, parsed, enhanced, markdown FROM parse_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != self.version:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE parse_results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return {
+            "parsed": json.loads(row[1]),
+            "enhanced": json.loads(row[2]) if row[2] else None,
+            "markdown": json.loads(row[3]),
+        }
+
+    def put_parsed(self, key: str, parsed: Dict[str, Any]) -> None:
+        """Stores a fresh parse, dropping any enhanced data and Markdown derived from an older one."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_results (key, version, parsed, enhanced, markdown, created_at, accessed_at)"
+                " VALUES (?, ?, ?, NULL, '{}', ?, ?)",
+                (key, self.version, json.dumps(parsed), now, now),
+            )
+            self.stores += 1
+            overflow = self._conn.execute("SELECT COUNT(*) FROM parse_results").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM parse_results WHERE key IN "
+                    "(SELECT key FROM parse_results ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def put_enhanced(self, key: str, enhanced: Dict[str, Any]) -> None:
+        """Attaches enhanced data to a stored parse; Markdown built from enhanced data is dropped."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE parse_results SET enhanced = ?, markdown = '{}' WHERE key = ? AND version = ?",
+                (json.dumps(enhanced), key, self.version),
+            )
+            self._conn.commit()
+
+    def put_markdown(self, key: str, variant: str, markdown: str) -> None:
+        """Attaches Markdown for one variant (e.g. 'llm:enhanced') to a stored parse."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT markdown FROM parse_results WHERE key = ? AND version = ?", (key, self.version)
+            ).fetchone()
+            if row is None:
+                return
+            variants = json.loads(row[0])
+            variants[variant] = markdown
+            self._conn.execute(
+                "UPDATE parse_results SET markdown = ? WHERE key = ?", (json.dumps(variants), key)
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM parse_results").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "version": self.version,
+        }
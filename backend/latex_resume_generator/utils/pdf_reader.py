@@ -1,29 +1,257 @@
-from pypdf import PdfReader
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from pypdf import PdfReader
+from pypdf.errors import DependencyError, PdfReadError
+
+# Spooled copies of uploads stay in memory up to this size and move to disk beyond it
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+class PDFExtractionError(ValueError):
+    """Base class for errors raised while extracting text from a PDF."""
+
+
+class PDFTooLargeError(PDFExtractionError):
+    """The PDF exceeds the configured byte limit."""
+
+
+class PDFPageLimitError(PDFExtractionError):
+    """The PDF has more pages than the configured limit."""
+
+
+class PDFReadError(PDFExtractionError):
+    """The file is not a readable PDF (corrupt, truncated or encrypted)."""
+
 
-def extract_text_from_pdf(pdf_file: BytesIO) -> str:
+class ExtractionResult(NamedTuple):
+    text: str
+    page_count: int
+    sha256: str
+    cached: bool
+
+
+def _open_reader(stream: BinaryIO) -> PdfReader:
+    try:
+        reader = PdfReader(stream)
+        if reader.is_encrypted and not reader.decrypt(""):
+            raise PDFReadError("PDF is encrypted.")
+        return reader
+    except PdfReadError as e:  # also covers empty files and truncated streams
+        raise PDFReadError(f"Could not read PDF: {e}") from e
+    except DependencyError as e:  # AES-encrypted without a crypto library installed
+        raise PDFReadError(f"Could not decrypt PDF: {e}") from e
+
+
+def _extract_page_range(data: bytes, start: int, end: int) -> List[str]:
+    """Extracts pages [start, end) in a worker process."""
+    reader = _open_reader(BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+class PDFExtractor:
+    """
+    Extracts resume text from PDFs with pypdf.
+
+    Pages are read one at a time from the stream, so an upload spooled to disk
+    is never loaded whole for ordinary documents. Documents with at least
+    parallel_min_pages pages are split into page ranges extracted in a process
+    pool. Byte and page limits are enforced before any text is extracted, and
+    results are cached by the SHA-256 of the file. Problems raise subclasses of
+    PDFExtractionError instead of being returned as text.
     """
-    Extracts text content from an uploaded PDF file using pypdf.
+
+    def __init__(
+        self,
+        max_bytes: int = 10 * 1024 * 1024,
+        max_pages: int = 30,
+        processes: int = 0,
+        parallel_min_pages: int = 8,
+        cache_entries: int = 256,
+    ):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.processes = processes if processes > 0 else min(4, os.cpu_count() or 1)
+        self.parallel_min_pages = parallel_min_pages
+        self.cache_entries = cache_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, ExtractionResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "PDFExtractor":
+        return cls(
+            max_bytes=int(os.getenv("PDF_MAX_MB", "10")) * 1024 * 1024,
+            max_pages=int(os.getenv("PDF_MAX_PAGES", "30")),
+            processes=int(os.getenv("PDF_EXTRACT_PROCESSES", "0")),
+            parallel_min_pages=int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8")),
+            cache_entries=int(os.getenv("PDF_CACHE_ENTRIES", "256")),
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a multi-threaded server process is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    @staticmethod
+    def _as_stream(source: Union[bytes, BinaryIO]) -> BinaryIO:
+        return BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+    def _hash_blocks(self, stream: BinaryIO, sink: Optional[Callable[[bytes], object]] = None) -> str:
+        digest = hashlib.sha256()
+        size = 0
+        stream.seek(0)
+        for block in iter(lambda: stream.read(1024 * 1024), b""):
+            size += len(block)
+            if size > self.max_bytes:
+                raise PDFTooLargeError(f"PDF exceeds the {self.max_bytes // (1024 * 1024)} MB limit.")
+            digest.update(block)
+            if sink is not None:
+                sink(block)
+        stream.seek(0)
+        return digest.hexdigest()
+
+    def digest(self, source: Union[bytes, BinaryIO]) -> str:
+        """Returns the SHA-256 of the PDF, hashing in blocks and failing as soon as it exceeds max_bytes."""
+        return self._hash_blocks(self._as_stream(source))
+
+    def spool(self, source: Union[bytes, BinaryIO]) -> Tuple[BinaryIO, str]:
+        """
+        Copies the PDF into a temporary file owned by the caller and returns it
+        with its SHA-256. Like digest, it reads in blocks and fails as soon as
+        the file exceeds max_bytes, so an oversized upload is never held whole.
+        """
+        copy = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        try:
+            sha256 = self._hash_blocks(self._as_stream(source), copy.write)
+        except BaseException:
+            copy.close()
+            raise
+        copy.seek(0)
+        return copy, sha256
+
+    def _check_pages(self, reader: PdfReader) -> int:
+        try:
+            page_count = len(reader.pages)
+        except Exception as e:
+            raise PDFReadError(f"Could not read PDF: {e}") from e
+        if page_count > self.max_pages:
+            raise PDFPageLimitError(f"PDF has {page_count} pages; the limit is {self.max_pages}.")
+        return page_count
+
+    def iter_pages(self, source: Union[bytes, BinaryIO]) -> Iterator[str]:
+        """Yields the text of each page in order, enforcing the byte and page limits."""
+        stream = self._as_stream(source)
+        self.digest(stream)
+        reader = _open_reader(stream)
+        self._check_pages(reader)
+        for page in reader.pages:
+            try:
+                yield page.extract_text() or ""
+            except Exception as e:
+                raise PDFReadError(f"Could not extract page text: {e}") from e
+
+    def _extract_parallel(self, stream: BinaryIO, page_count: int) -> List[str]:
+        stream.seek(0)
+        data = stream.read()
+        chunk = -(-page_count // self.processes)  # ceiling division
+        ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+        futures = [self._get_pool().submit(_extract_page_range, data, start, end) for start, end in ranges]
+        pages: List[str] = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+
+    def extract(self, source: Union[bytes, BinaryIO]) -> ExtractionResult:
+        """Extracts the text of a whole PDF, serving repeated files from the cache."""
+        stream = self._as_stream(source)
+        sha256 = self.digest(stream)
+
+        with self._lock:
+            cached = self._cache.get(sha256)
+            if cached is not None:
+                self._cache.move_to_end(sha256)
+                self.hits += 1
+                return cached._replace(cached=True)
+            self.misses += 1
+
+        reader = _open_reader(stream)
+        page_count = self._check_pages(reader)
+        pages: Optional[List[str]] = None
+        if page_count >= self.parallel_min_pages and self.processes > 1:
+            try:
+                pages = self._extract_parallel(stream, page_count)
+            except BrokenProcessPool:
+                # A worker died; drop the pool and extract in this thread instead
+                self.shutdown()
+        if pages is None:
+            try:
+                pages = [page.extract_text() or "" for page in reader.pages]
+            except Exception as e:
+                raise PDFReadError(f"Could not extract page text: {e}") from e
+
+        result = ExtractionResult(text="\n".join(pages), page_count=page_count, sha256=sha256, cached=False)
+        with self._lock:
+            self._cache[sha256] = result
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._cache),
+            "max_bytes": self.max_bytes,
+            "max_pages": self.max_pages,
+            "processes": self.processes,
+        }
+
+
+_default_extractor: Optional[PDFExtractor] = None
+
+
+def get_pdf_extractor() -> PDFExtractor:
+    """Returns the shared extractor configured from the environment."""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = PDFExtractor.from_env()
+    return _default_extractor
+
+
+def extract_text_from_pdf(pdf_file: Union[bytes, BinaryIO]) -> str:
+    """
+    Extracts text content from a PDF file using pypdf.
 
     Args:
-        pdf_file: A file-like object (BytesIO) from Streamlit's file uploader.
+        pdf_file: The PDF as bytes or a seekable binary file object.
 
     Returns:
         The extracted text as a single string.
+
+    Raises:
+        PDFExtractionError: if the file is too large, has too many pages or cannot be read.
     """
-    try:
-        # Create a PDF reader object from the in-memory buffer
-        reader = PdfReader(pdf_file)
-        
-        # Initialize an empty list to hold the text from each page
-        text_parts = []
-        
-        # Iterate through each page and extract text
-        for page in reader.pages:
-            text_parts.append(page.extract_text() or "")
-            
-        return "\n".join(text_parts)
-    
-    except Exception as e:
-        # Return an error message if something goes wrong
-        return f"Error processing PDF file with pypdf: {e}" 
\ No newline at end of file
+    return get_pdf_extractor().extract(pdf_file).text
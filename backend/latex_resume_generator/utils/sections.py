@@ -0,0 +1,16 @@
+# Canonical ResumeSchema sections and the headings that introduce them. Shared by the
+# local parser (headings in extracted PDF text) and incremental regeneration (\section titles).
+SECTION_ALIASES = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history"),
+    "projects": ("projects", "personal projects", "academic projects", "selected projects", "key projects"),
+    "education": ("education", "academic background", "education and training"),
+    "skills": ("skills", "technical skills", "skills and interests", "core competencies", "technologies",
+               "skills and technologies"),
+}
+# Headings that end a section but have no place in ResumeSchema
+OTHER_SECTIONS = ("publications", "certifications", "certificates", "awards", "honors", "honors and awards",
+                  "achievements", "activities", "leadership", "volunteer", "volunteering", "interests",
+                  "languages", "links", "references", "coursework", "extracurricular activities")
@@ -0,0 +1,88 @@
+import copy
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,128}$')
+
+
+class LatexBuild(BaseModel):
+    """The last LaTeX document generated for one template in a session."""
+    render_mode: str
+    style_key: str
+    section_hashes: Dict[str, str]
+    latex: str
+
+
+class SessionState(BaseModel):
+    """What a builder session produced last, so the next request can regenerate only what changed."""
+    basic_hashes: Dict[str, str] = {}
+    enhanced_data: Optional[Dict[str, Any]] = None
+    builds: Dict[str, LatexBuild] = {}
+    updated_at: float = 0.0
+
+
+class SessionStore:
+    """
+    In-memory LRU of builder sessions, keyed by a client-chosen session id.
+    Sessions expire after ttl_seconds of inactivity; only the most recently
+    used max_sessions are kept. Losing a session only costs a full regeneration.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: int = 6 * 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        return cls(
+            max_sessions=int(os.getenv("SESSION_MAX_ENTRIES", "1000")),
+            ttl_seconds=int(os.getenv("SESSION_TTL_SECONDS", str(6 * 3600))),
+        )
+
+    @staticmethod
+    def valid_id(session_id: Optional[str]) -> bool:
+        return bool(session_id) and bool(SESSION_ID_RE.match(session_id))
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Returns a copy of the session, or None if it is unknown or expired."""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            if time.time() - state.updated_at > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return state.model_copy(deep=True)
+
+    def save(self, session_id: str, state: SessionState) -> None:
+        state = state.model_copy(deep=True)
+        state.updated_at = time.time()
+        with self._lock:
+            self._sessions[session_id] = state
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def record_enhancement(self, session_id: str, basic_hashes: Dict[str, str], enhanced_data: Dict[str, Any]) -> None:
+        state = self.get(session_id) or SessionState()
+        state.basic_hashes = basic_hashes
+        state.enhanced_data = copy.deepcopy(enhanced_data)
+        self.save(session_id, state)
+
+    def record_build(self, session_id: str, template_name: str, build: LatexBuild) -> None:
+        state = self.get(session_id) or SessionState()
+        state.builds[template_name] = build
+        self.save(session_id, state)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"sessions": len(self._sessions), "max_sessions": self.max_sessions, "ttl_seconds": self.ttl_seconds}
@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def canonical_json(text: Optional[str]) -> Any:
+    """Parses a JSON form field so formatting and key order don't matter; invalid JSON is kept as given."""
+    if text is None:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def request_key(endpoint: str, **inputs: Any) -> str:
+    """Hashes an endpoint name and its inputs (JSON-serializable) into a coalescing key."""
+    payload = json.dumps({"endpoint": endpoint, **inputs}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key starts
+    the work as a task, and callers arriving while it runs await that same
+    task instead of running it again. Nothing is kept after the task ends, so
+    only duplicates that overlap in time are merged.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["SingleFlight"]:
+        """Builds the coalescer, or returns None when disabled."""
+        if os.getenv("REQUEST_COALESCING_ENABLED", "true").lower() != "true":
+            return None
+        return cls()
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Every caller may have gone away; mark a failure as retrieved so it isn't reported as lost
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Returns func()'s result, or raises its exception, and whether the call
+        was shared with one already in flight. A caller that is cancelled
+        leaves the work running for the others.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / requests if requests else 0.0,
+        }
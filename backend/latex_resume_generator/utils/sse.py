@@ -0,0 +1,14 @@
+import json
+from typing import Any
+
+# Disable proxy buffering (nginx) and caching so events reach the client immediately
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Formats one Server-Sent Event with a JSON payload."""
+    payload = json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict
+from rich import print
+
+from backend.latex_resume_generator.utils.build_workspace import ASSET_EXTENSIONS
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+SUPPORTED_ENGINES = ("pdflatex", "xelatex", "lualatex")
+REQUIRED_MARKERS = (r"\documentclass", r"\begin{document}", r"\end{document}")
+
+
+class TemplateError(ValueError):
+    """Raised when a template directory is missing or malformed."""
+
+
+class TemplateInfo(BaseModel):
+    """Immutable, preloaded description of one LaTeX template."""
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    directory: str
+    engine: str = "pdflatex"
+    assets: Tuple[str, ...] = ()
+    template_tex: str
+    skeleton: str
+    prompt: Optional[str] = None
+    renderer: Optional[str] = None
+    config: Dict[str, str] = {}
+    fingerprint: Tuple[Tuple[str, float], ...] = ()
+
+
+def parse_template_cfg(path: Path) -> Dict[str, str]:
+    """Parses the key=value lines of a template.cfg file."""
+    config: Dict[str, str] = {}
+    if not path.exists():
+        return config
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            config[key.strip()] = value.strip()
+    return config
+
+
+class TemplateRegistry:
+    """
+    Scans the templates directory once and keeps every template's engine,
+    assets, LLM prompt and skeleton in memory. Templates are reloaded when
+    their files change on disk (checked at most every reload_interval seconds).
+    """
+
+    def __init__(
+        self,
+        templates_dir: Optional[Path] = None,
+        prompts_dir: Optional[Path] = None,
+        auto_reload: bool = True,
+        reload_interval: float = 2.0,
+    ):
+        self.templates_dir = Path(templates_dir or TEMPLATES_DIR)
+        self.prompts_dir = Path(prompts_dir or PROMPTS_DIR)
+        self.auto_reload = auto_reload
+        self.reload_interval = reload_interval
+        self.errors: Dict[str, str] = {}
+        self._templates: Dict[str, TemplateInfo] = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self.load()
+
+    @classmethod
+    def from_env(cls) -> "TemplateRegistry":
+        return cls(
+            templates_dir=os.getenv("TEMPLATES_DIR") or None,
+            auto_reload=os.getenv("TEMPLATE_AUTO_RELOAD", "true").lower() == "true",
+        )
+
+    # --- Loading ---
+    def _prompt_path(self, name: str, config: Dict[str, str]) -> Path:
+        return self.prompts_dir / config.get("prompt", f"{name}_latex_prompt.txt")
+
+    def _fingerprint(self, directory: Path, prompt_path: Path) -> Tuple[Tuple[str, float], ...]:
+        files = [p for p in directory.iterdir() if p.is_file()]
+        if prompt_path.exists():
+            files.append(prompt_path)
+        return tuple(sorted((str(p), p.stat().st_mtime) for p in files))
+
+    def _load_template(self, directory: Path) -> TemplateInfo:
+        name = directory.name
+        template_path = directory / "template.tex"
+        if not template_path.exists():
+            raise TemplateError(f"Template '{name}' has no template.tex")
+
+        config = parse_template_cfg(directory / "template.cfg")
+        engine = config.get("engine", "pdflatex")
+        if engine not in SUPPORTED_ENGINES:
+            raise TemplateError(f"Template '{name}' uses unsupported engine '{engine}'")
+
+        with open(template_path, 'r') as f:
+            template_tex = f.read()
+        missing = [marker for marker in REQUIRED_MARKERS if marker not in template_tex]
+        if missing:
+            raise TemplateError(f"Template '{name}' is missing {', '.join(missing)}")
+
+        # Some templates give the LLM a clean skeleton instead of the full example document
+        skeleton = template_tex
+        if "prompt_skeleton" in config:
+            skeleton_path = directory / config["prompt_skeleton"]
+            if not skeleton_path.exists():
+                raise TemplateError(f"Template '{name}' skeleton {skeleton_path.name} not found")
+            with open(skeleton_path, 'r') as f:
+                skeleton = f.read()
+
+        # Optional Jinja source for deterministic rendering without the LLM
+        renderer = None
+        if "renderer" in config:
+            renderer_path = directory / config["renderer"]
+            if not renderer_path.exists():
+                raise TemplateError(f"Template '{name}' renderer {renderer_path.name} not found")
+            with open(renderer_path, 'r') as f:
+                renderer = f.read()
+
+        prompt = None
+        prompt_path = self._prompt_path(name, config)
+        if prompt_path.exists():
+            with open(prompt_path, 'r') as f:
+                prompt = f.read()
+
+        assets = tuple(sorted(
+            str(p.resolve()) for p in directory.iterdir() if p.name.endswith(ASSET_EXTENSIONS)
+        ))
+
+        return TemplateInfo(
+            name=name,
+            directory=str(directory.resolve()),
+            engine=engine,
+            assets=assets,
+            template_tex=template_tex,
+            skeleton=skeleton,
+            prompt=prompt,
+            renderer=renderer,
+            config=config,
+            fingerprint=self._fingerprint(directory, prompt_path),
+        )
+
+    def load(self) -> None:
+        """(Re)scans the templates directory, keeping only templates that validate."""
+        templates: Dict[str, TemplateInfo] = {}
+        errors: Dict[str, str] = {}
+        for directory in sorted(self.templates_dir.iterdir()):
+            if not directory.is_dir() or not (directory / "template.tex").exists():
+                continue
+            try:
+                templates[directory.name] = self._load_template(directory)
+            except (TemplateError, OSError) as e:
+                errors[directory.name] = str(e)
+                print(f"[bold red]Skipping template {directory.name}:[/bold red] {e}")
+        with self._lock:
+            self._templates = templates
+            self.errors = errors
+            self._last_check = time.time()
+
+    def _changed(self) -> bool:
+        with self._lock:
+            templates = dict(self._templates)
+        on_disk = {
+            d.name for d in self.templates_dir.iterdir()
+            if d.is_dir() and (d / "template.tex").exists()
+        }
+        if on_disk != set(templates) | set(self.errors):
+            return True
+        for name, info in templates.items():
+            directory = Path(info.directory)
+            try:
+                if self._fingerprint(directory, self._prompt_path(name, info.config)) != info.fingerprint:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def reload_if_changed(self) -> bool:
+        """Reloads the registry if any template file changed. Returns True on reload."""
+        self._last_check = time.time()
+        if self._changed():
+            print("[bold cyan]Template files changed, reloading template registry[/bold cyan]")
+            self.load()
+            return True
+        return False
+
+    def _maybe_reload(self) -> None:
+        if self.auto_reload and time.time() - self._last_check >= self.reload_interval:
+            self.reload_if_changed()
+
+    # --- Lookup ---
+    def get(self, name: str) -> TemplateInfo:
+        """Returns a template by name, raising TemplateError if it is unknown or invalid."""
+        self._maybe_reload()
+        with self._lock:
+            info = self._templates.get(name)
+        if info is None:
+            if name in self.errors:
+                raise TemplateError(self.errors[name])
+            raise TemplateError(f"Unknown template '{name}'")
+        return info
+
+    def names(self) -> List[str]:
+        self._maybe_reload()
+        with self._lock:
+            return sorted(self._templates)
+
+    def list(self) -> List[TemplateInfo]:
+        self._maybe_reload()
+        with self._lock:
+            return [self._templates[name] for name in sorted(self._templates)]
@@ -0,0 +1,344 @@
+import hashlib
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from rich import print
+
+from backend.latex_resume_generator.utils.build_workspace import ASSET_EXTENSIONS, TEX_FILENAME, BuildWorkspace
+from backend.latex_resume_generator.utils.latex_compiler import CompileResult, compile_latex_to_pdf_async
+from backend.latex_resume_generator.utils.latex_repair import parse_tex_log
+from backend.latex_resume_generator.utils.template_registry import TemplateInfo
+
+FORMAT_BUILD_TIMEOUT = 120  # seconds
+# Engines whose formats can hold the loaded packages; XeTeX and LuaTeX cannot dump OpenType fonts
+FORMAT_ENGINES = ("pdflatex",)
+
+_LOAD_RE = re.compile(r'^\s*\\(?:documentclass|usepackage|RequirePackage)\b')
+_IF_RE = re.compile(r'(?<!\\newif)\\if[a-zA-Z@]*')
+_FI_RE = re.compile(r'\\fi(?![a-zA-Z@])')
+_COMMENT_RE = re.compile(r'(?<!\\)%.*$')
+# Compiles a .tex file in a directory: (tex path, output dir, engine, fmt=...)
+CompileFn = Callable[..., Awaitable[CompileResult]]
+# What TeX prints when the format named by -fmt is gone
+_MISSING_FORMAT = "can't find the format file"
+# Rendered once per template at startup so the renderer's own preamble gets a format too
+PLACEHOLDER_RESUME = {
+    "personal_info": {"name": "Placeholder", "email": "placeholder@example.com", "phone": "0"},
+    "summary": "", "experience": [], "projects": [], "education": [], "skills": [],
+}
+
+
+def _default_format_dir() -> str:
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "resume-latex", "formats")
+
+
+def split_preamble(latex: str) -> Optional[Tuple[str, str]]:
+    """
+    Splits a document into its package-loading head (\\documentclass through the
+    last \\usepackage, which is what makes startup slow and what can be dumped
+    into a format) and the rest. The head's lines are left blank in the rest so
+    line numbers in TeX logs still match the full document. Returns None when
+    the document has no head that can be cut cleanly.
+    """
+    begin = latex.find(r'\begin{document}')
+    if begin < 0:
+        return None
+    # Only whole lines can move into the format; the last one holds \begin{document}
+    lines = latex[:begin].split("\n")[:-1]
+    codes = [_COMMENT_RE.sub("", line) for line in lines]
+    last = max((i for i, code in enumerate(codes) if _LOAD_RE.match(code)), default=-1)
+    if last < 0:
+        return None
+
+    braces = conditionals = 0
+    for i, code in enumerate(codes):
+        braces += code.count("{") - code.count("\\{") - code.count("}") + code.count("\\}")
+        conditionals += len(_IF_RE.findall(code)) - len(_FI_RE.findall(code))
+        if i >= last and braces == 0 and conditionals <= 0:
+            end = i + 1
+            break
+    else:
+        return None
+
+    head = "\n".join(lines[:end]) + "\n"
+    return head, "\n" * end + latex[len(head):]
+
+
+def errors_in_body(log: str, latex: str) -> bool:
+    """
+    Whether every error in a failed compile's log lies in the document body,
+    after \\begin{document}. Those errors are the document's own and a compile
+    without the format would fail the same way. Errors in the preamble, in
+    package files or without a line may come from the format.
+    """
+    errors = parse_tex_log(log)
+    begin_line = latex[:latex.find(r'\begin{document}')].count("\n") + 1
+    return bool(errors) and all(
+        e.line and e.line > begin_line and (not e.file or os.path.basename(e.file) == TEX_FILENAME) for e in errors
+    )
+
+
+def normalize_head(head: str) -> str:
+    """Drops comments and blank lines, so heads that differ only in those share a format."""
+    lines = (_COMMENT_RE.sub("", line).rstrip() for line in head.split("\n"))
+    return "\n".join(line for line in lines if line.strip()) + "\n"
+
+
+def format_key(head: str, template_dir: Optional[str], engine: str) -> str:
+    """Hashes everything a dumped format depends on: engine, normalized head and template assets."""
+    digest = hashlib.sha256()
+    digest.update(f"engine={engine}\0".encode())
+    if template_dir and os.path.isdir(template_dir):
+        for name in sorted(os.listdir(template_dir)):
+            if name.endswith(ASSET_EXTENSIONS):
+                with open(os.path.join(template_dir, name), "rb") as f:
+                    digest.update(f"asset={name}\0".encode() + hashlib.sha256(f.read()).digest())
+    digest.update(normalize_head(head).encode("utf-8"))
+    return "resume-" + digest.hexdigest()[:24]
+
+
+def _link_assets(template_dir: Optional[str], target_dir: str) -> None:
+    if not template_dir or not os.path.isdir(template_dir):
+        return
+    for item in os.listdir(template_dir):
+        if item.endswith(ASSET_EXTENSIONS):
+            target = os.path.join(target_dir, item)
+            if not os.path.exists(target):
+                os.symlink(os.path.abspath(os.path.join(template_dir, item)), target)
+
+
+class FormatCache:
+    """
+    Precompiled TeX formats (.fmt) for template preambles. Each format holds a
+    preamble's class and packages already loaded, so a compile only reads the
+    document body. Formats are built in the background: for every template at
+    startup, and for any other head after its first plain compile. A document
+    whose format fails falls back to a plain compile and that head is not
+    tried again. Only the most recently used max_formats files are kept,
+    apart from formats a compile is using or in_use() reports (the TeX
+    worker pool's waiting processes), which are never evicted.
+    """
+
+    def __init__(self, format_dir: Optional[str] = None, max_formats: int = 8):
+        self.format_dir = format_dir or _default_format_dir()
+        self.max_formats = max_formats
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.build_failures = 0
+        self.fallbacks = 0
+        self._building: Set[str] = set()
+        self._unsupported: Set[str] = set()
+        # Compiles currently running against each format
+        self._compiling: Dict[str, int] = {}
+        self.in_use: Callable[[], Set[str]] = set
+        self._lock = threading.Lock()
+        os.makedirs(self.format_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["FormatCache"]:
+        """Builds the cache from environment settings, or returns None when disabled."""
+        if os.getenv("TEX_FORMAT_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            format_dir=os.getenv("TEX_FORMAT_DIR") or None,
+            max_formats=int(os.getenv("TEX_FORMAT_MAX", "8")),
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.format_dir, key + ".fmt")
+
+    def lookup(self, latex: str, template_dir: Optional[str], engine: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Returns (key, format path or None, body to compile against it) for a document."""
+        if engine not in FORMAT_ENGINES:
+            return None, None, None
+        split = split_preamble(latex)
+        if split is None:
+            return None, None, None
+        head, body = split
+        key = format_key(head, template_dir, engine)
+        path = self._path(key)
+        with self._lock:
+            usable = key not in self._unsupported and os.path.exists(path)
+            if usable:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not usable:
+            return key, None, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return key, path, body
+
+    def build(self, head: str, template_dir: Optional[str], engine: str) -> Optional[str]:
+        """Dumps a format for a preamble head. Returns its path, or None if TeX could not dump it."""
+        key = format_key(head, template_dir, engine)
+        path = self._path(key)
+        if os.path.exists(path):
+            return path
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="fmt-", dir=self.format_dir) as work_dir:
+            _link_assets(template_dir, work_dir)
+            with open(os.path.join(work_dir, "head.tex"), "w") as f:
+                f.write(normalize_head(head) + "\\dump\n")
+            command = [
+                "env", "-i", "PATH=/usr/bin:/bin:/usr/local/bin",
+                f"/usr/bin/{engine}", "-ini", "-interaction=nonstopmode", f"-jobname={key}",
+                f"&{engine}", "head.tex",
+            ]
+            try:
+                subprocess.run(command, capture_output=True, text=True, timeout=FORMAT_BUILD_TIMEOUT, cwd=work_dir)
+            except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+                print(f"[bold yellow]Could not build TeX format {key}:[/bold yellow] {e}")
+            built = os.path.join(work_dir, key + ".fmt")
+            if not os.path.exists(built):
+                with self._lock:
+                    self.build_failures += 1
+                    self._unsupported.add(key)
+                return None
+            os.replace(built, path)
+        with self._lock:
+            self.builds += 1
+        print(f"[bold green]Built TeX format {key} in {time.perf_counter() - started:.1f}s[/bold green]")
+        self._evict()
+        return path
+
+    def build_in_background(self, latex: str, template_dir: Optional[str], engine: str) -> None:
+        """Starts building the format for a document's head unless it exists, failed before or is underway."""
+        if engine not in FORMAT_ENGINES:
+            return
+        split = split_preamble(latex)
+        if split is None:
+            return
+        key = format_key(split[0], template_dir, engine)
+        with self._lock:
+            if key in self._building or key in self._unsupported or os.path.exists(self._path(key)):
+                return
+            self._building.add(key)
+
+        def run():
+            try:
+                self.build(split[0], template_dir, engine)
+            finally:
+                with self._lock:
+                    self._building.discard(key)
+
+        threading.Thread(target=run, name=f"fmt-{key}", daemon=True).start()
+
+    def warm(self, templates: Iterable[TemplateInfo], renderer: Any = None) -> None:
+        """
+        Builds, in the background, the formats for the preambles documents of
+        each template are expected to have: the example document, the skeleton
+        given to the LLM and the deterministic renderer's output.
+        """
+        for template in templates:
+            documents = {template.template_tex, template.skeleton}
+            if renderer is not None and renderer.supports(template.name):
+                try:
+                    documents.add(renderer.render(template.name, PLACEHOLDER_RESUME))
+                except Exception as e:
+                    print(f"[bold yellow]Could not render {template.name} to warm its format:[/bold yellow] {e}")
+            for document in documents:
+                self.build_in_background(document, template.directory, template.engine)
+
+    def mark_unsupported(self, key: str) -> None:
+        with self._lock:
+            self._unsupported.add(key)
+            self.fallbacks += 1
+
+    def _pin(self, key: str) -> None:
+        with self._lock:
+            self._compiling[key] = self._compiling.get(key, 0) + 1
+
+    def _unpin(self, key: str) -> None:
+        with self._lock:
+            self._compiling[key] -= 1
+            if not self._compiling[key]:
+                del self._compiling[key]
+
+    def _evict(self) -> None:
+        with self._lock:
+            pinned = set(self._compiling)
+        pinned |= self.in_use()
+        formats = sorted(
+            (os.path.getmtime(os.path.join(self.format_dir, name)), os.path.join(self.format_dir, name))
+            for name in os.listdir(self.format_dir) if name.endswith(".fmt")
+        )
+        evictable = [path for _, path in formats if os.path.basename(path)[:-len(".fmt")] not in pinned]
+        for path in evictable[:max(0, len(formats) - self.max_formats)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def compile(
+        self,
+        workspace: BuildWorkspace,
+        latex: str,
+        template_dir: Optional[str],
+        engine: str,
+        compiler: CompileFn = compile_latex_to_pdf_async,
+    ) -> CompileResult:
+        """
+        Compiles a document in a workspace against its preamble's format when
+        one is ready, otherwise plainly (and queues the format for next time).
+        A failed format compile is retried plainly only when the format may be
+        at fault: it is missing, or the errors are not all in the body.
+        Passes count every engine run, including those of a failed format attempt.
+        """
+        key, path, body = self.lookup(latex, template_dir, engine)
+        failed_passes = 0
+        missing = False
+        if path:
+            self._pin(key)
+            try:
+                os.symlink(path, os.path.join(workspace.path, key + ".fmt"))
+                tex_path = workspace.write_tex(body)
+                result = await compiler(tex_path, workspace.path, engine, fmt=key)
+            finally:
+                self._unpin(key)
+            if result.success:
+                return result
+            # Evicted or deleted between lookup and compile: not the format's fault
+            missing = not os.path.exists(path) or _MISSING_FORMAT in result.log
+            if not missing and errors_in_body(result.log, latex):
+                # The document itself is broken; compiling it again without the format would not help
+                return result
+            print(f"[bold yellow]Compile against format {key} failed{' (format file missing)' if missing else ''}, "
+                  f"retrying without it[/bold yellow]")
+            failed_passes = result.passes
+            for ext in (".pdf", ".aux", ".toc", ".lof", ".lot", ".out"):
+                leftover = os.path.splitext(workspace.pdf_path)[0] + ext
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+        tex_path = workspace.write_tex(latex)
+        result = await compiler(tex_path, workspace.path, engine)
+        if result.success and path and not missing:
+            # The document is fine, so the format was at fault
+            self.mark_unsupported(key)
+        elif result.success and key:
+            self.build_in_background(latex, template_dir, engine)
+        return result._replace(passes=result.passes + failed_passes)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        formats = [name for name in os.listdir(self.format_dir) if name.endswith(".fmt")]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "builds": self.builds,
+            "build_failures": self.build_failures,
+            "fallbacks": self.fallbacks,
+            "formats": len(formats),
+            "max_formats": self.max_formats,
+        }
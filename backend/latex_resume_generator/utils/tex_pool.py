@@ -0,0 +1,329 @@
+import asyncio
+import os
+import resource
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from rich import print
+
+from backend.latex_resume_generator.utils.concurrency import stage_concurrency
+from backend.latex_resume_generator.utils.latex_compiler import (
+    COMPILE_TIMEOUT,
+    MAX_PASSES,
+    CompileResult,
+    aux_snapshot,
+    build_command,
+    needs_rerun,
+)
+from backend.latex_resume_generator.utils.metrics import record_tex_pass
+
+
+def _default_pool_dir() -> str:
+    """Prefers tmpfs (/dev/shm) for worker directories, falling back to the system temp dir."""
+    shm = "/dev/shm"
+    base = shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else tempfile.gettempdir()
+    return os.path.join(base, "resume-tex-workers")
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker for an engine is busy and the wait queue is full."""
+
+
+class _Worker:
+    """A sandbox directory and the engine process waiting at its ** prompt for the next file."""
+
+    def __init__(self, engine: str, directory: str):
+        self.engine = engine
+        self.directory = directory
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.fmt: Optional[str] = None
+        self.busy = False
+
+    @property
+    def ready(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+
+class TexWorkerPool:
+    """
+    Keeps, per engine, a fixed number of worker directories, each with an
+    engine process that has already been started and is waiting at its **
+    prompt for the file to compile. TeX only loads its format once it has
+    read that line, so this saves the process start-up (exec, loading the
+    binary, reading texmf.cnf), not the format load. A compile links its
+    workspace into a free worker, feeds the file name to the waiting process
+    and moves the outputs back; a fresh process is started straight away for
+    the next pass or job. Every process runs under CPU, memory and file-size
+    limits and a wall-clock timeout. Compiles beyond the pool size wait in a
+    bounded queue, and are rejected with PoolSaturated once it is full.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_queue: int = 16,
+        root: Optional[str] = None,
+        cpu_seconds: int = COMPILE_TIMEOUT,
+        memory_mb: int = 2048,
+        file_mb: int = 64,
+        timeout: int = COMPILE_TIMEOUT,
+    ):
+        self.size = max(1, size)
+        self.max_queue = max(0, max_queue)
+        self.root = root or _default_pool_dir()
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.file_mb = file_mb
+        self.timeout = timeout
+        self._workers: Dict[str, List[_Worker]] = {}
+        self._available: Dict[str, asyncio.Condition] = {}
+        self._waiting: Dict[str, int] = {}
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["TexWorkerPool"]:
+        """Builds the pool from environment settings, or returns None when disabled."""
+        if os.getenv("TEX_POOL_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            size=int(os.getenv("TEX_POOL_SIZE") or stage_concurrency("compile")),
+            max_queue=int(os.getenv("TEX_POOL_MAX_QUEUE", "16")),
+            root=os.getenv("TEX_POOL_DIR") or None,
+            cpu_seconds=int(os.getenv("TEX_POOL_CPU_SECONDS", str(COMPILE_TIMEOUT))),
+            memory_mb=int(os.getenv("TEX_POOL_MEMORY_MB", "2048")),
+            file_mb=int(os.getenv("TEX_POOL_FILE_MB", "64")),
+        )
+
+    # --- Lifecycle ---
+    async def start(self, engines: Iterable[str]) -> None:
+        """Starts the workers of each engine; other engines get theirs on first use."""
+        for engine in sorted(set(engines)):
+            await self._ensure_engine(engine)
+        print(f"[bold green]TeX worker pool ready: {self.size} worker(s) for {', '.join(sorted(self._workers))}[/bold green]")
+
+    async def stop(self) -> None:
+        for workers in self._workers.values():
+            for worker in workers:
+                await self._kill(worker)
+                shutil.rmtree(worker.directory, ignore_errors=True)
+        self._workers.clear()
+
+    async def _ensure_engine(self, engine: str) -> None:
+        if engine in self._workers:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        workers = [_Worker(engine, tempfile.mkdtemp(prefix=f"{engine}-", dir=self.root)) for _ in range(self.size)]
+        self._workers[engine] = workers
+        self._available[engine] = asyncio.Condition()
+        self._waiting[engine] = 0
+        self._counters[engine] = dict.fromkeys(
+            ("jobs", "passes", "warm_starts", "cold_starts", "rejected", "timeouts", "limit_kills", "queued", "queue_wait_seconds"), 0
+        )
+        for worker in workers:
+            await self._spawn(worker, None)
+
+    # --- Processes ---
+    def _limit(self, pid: int) -> None:
+        """
+        Caps a started process's CPU time, address space and output file size.
+        Applied from outside with prlimit because preexec_fn is not safe while
+        the server runs other threads; the limits outlast the exec from env.
+        """
+        resource.prlimit(pid, resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + 1))
+        memory = self.memory_mb * 1024 * 1024
+        resource.prlimit(pid, resource.RLIMIT_AS, (memory, memory))
+        file_size = self.file_mb * 1024 * 1024
+        resource.prlimit(pid, resource.RLIMIT_FSIZE, (file_size, file_size))
+
+    async def _exec(self, worker: _Worker, tex_name: Optional[str], fmt: Optional[str]) -> asyncio.subprocess.Process:
+        process = await asyncio.create_subprocess_exec(
+            *build_command(tex_name, ".", worker.engine, fmt),
+            stdin=asyncio.subprocess.PIPE if tex_name is None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=worker.directory,
+        )
+        try:
+            self._limit(process.pid)
+        except ProcessLookupError:
+            pass  # Already exited; its return code tells the pass what happened
+        except OSError:
+            # Never leave an engine running without its limits
+            process.kill()
+            await process.wait()
+            raise
+        return process
+
+    async def _spawn(self, worker: _Worker, fmt: Optional[str]) -> None:
+        """Starts the process for the worker's next pass, set to load fmt (or the engine's own format)."""
+        await self._kill(worker)
+        worker.process = await self._exec(worker, None, fmt)
+        worker.fmt = fmt
+
+    @staticmethod
+    async def _kill(worker: _Worker) -> None:
+        process, worker.process = worker.process, None
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    async def _pass(self, worker: _Worker, tex_name: str, fmt: Optional[str]) -> Tuple[int, str]:
+        """Runs one engine pass in the worker, on its waiting process when that was started with the right format."""
+        counters = self._counters[worker.engine]
+        if worker.ready and worker.fmt == fmt:
+            process, worker.process = worker.process, None
+            feed = (tex_name + "\n").encode()
+            counters["warm_starts"] += 1
+        else:
+            await self._kill(worker)
+            process = await self._exec(worker, tex_name, fmt)
+            feed = None
+            counters["cold_starts"] += 1
+        counters["passes"] += 1
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(feed), timeout=self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            process.kill()
+            await process.wait()
+            raise
+        log = stdout.decode(errors="replace")
+        if process.returncode != 0:
+            log += "\n" + stderr.decode(errors="replace")
+        if process.returncode < 0:
+            counters["limit_kills"] += 1
+            log += (f"\n{worker.engine} was killed by signal {-process.returncode} "
+                    f"(limits: {self.cpu_seconds}s CPU, {self.memory_mb} MB memory).")
+        return process.returncode, log
+
+    # --- Scheduling ---
+    def _free(self, engine: str, fmt: Optional[str]) -> Optional[_Worker]:
+        """A free worker, preferring one whose waiting process was started with fmt."""
+        free = [worker for worker in self._workers[engine] if not worker.busy]
+        for worker in free:
+            if worker.ready and worker.fmt == fmt:
+                return worker
+        return free[0] if free else None
+
+    async def _acquire(self, engine: str, fmt: Optional[str]) -> _Worker:
+        condition = self._available[engine]
+        counters = self._counters[engine]
+        async with condition:
+            worker = self._free(engine, fmt)
+            if worker is None:
+                if self._waiting[engine] >= self.max_queue:
+                    counters["rejected"] += 1
+                    raise PoolSaturated(
+                        f"All {self.size} {engine} workers are busy and {self._waiting[engine]} compiles are already queued."
+                    )
+                self._waiting[engine] += 1
+                counters["queued"] += 1
+                started = time.perf_counter()
+                try:
+                    while worker is None:
+                        await condition.wait()
+                        worker = self._free(engine, fmt)
+                finally:
+                    self._waiting[engine] -= 1
+                    counters["queue_wait_seconds"] += time.perf_counter() - started
+            worker.busy = True
+            counters["jobs"] += 1
+            return worker
+
+    async def _release(self, worker: _Worker) -> None:
+        condition = self._available[worker.engine]
+        async with condition:
+            worker.busy = False
+            condition.notify()
+
+    # --- Compiling ---
+    @staticmethod
+    def _link(source_dir: str, worker_dir: str) -> None:
+        """Links every file of the job's directory (document, assets, format) into the worker's."""
+        for name in os.listdir(source_dir):
+            target = os.path.join(worker_dir, name)
+            if os.path.lexists(target):
+                os.remove(target)
+            os.symlink(os.path.realpath(os.path.join(source_dir, name)), target)
+
+    @staticmethod
+    def _collect(worker: _Worker, output_dir: str) -> None:
+        """Moves what the engine wrote back to the job's directory and clears the worker's, keeping its format."""
+        keep = f"{worker.fmt}.fmt" if worker.fmt else None
+        for name in os.listdir(worker.directory):
+            path = os.path.join(worker.directory, name)
+            if name == keep and worker.ready:
+                continue
+            if os.path.islink(path):
+                os.remove(path)
+            else:
+                shutil.move(path, os.path.join(output_dir, name))
+
+    async def compile(self, latex_file_path: str, output_dir: str, engine: str = "pdflatex", fmt: Optional[str] = None) -> CompileResult:
+        """
+        Drop-in for compile_latex_to_pdf_async that runs the passes on a pooled
+        worker. Waits for a free worker; raises PoolSaturated when the queue is full.
+        """
+        await self._ensure_engine(engine)
+        worker = await self._acquire(engine, fmt)
+        tex_name = os.path.basename(latex_file_path)
+        tex_path = os.path.join(worker.directory, tex_name)
+        log = ""
+        passes = 0
+        try:
+            self._link(output_dir, worker.directory)
+            while True:
+                before = aux_snapshot(tex_path, worker.directory)
+                passes += 1
+                started = time.perf_counter()
+                try:
+                    returncode, log = await self._pass(worker, tex_name, fmt)
+                finally:
+                    record_tex_pass(engine, passes, time.perf_counter() - started)
+                # The next process starts up while this pass's output is inspected
+                await self._spawn(worker, fmt)
+                if returncode != 0:
+                    # Check if PDF was created despite errors
+                    pdf_created = os.path.exists(os.path.splitext(tex_path)[0] + ".pdf")
+                    return CompileResult(returncode == 1 and pdf_created, log, passes)
+                if passes >= MAX_PASSES or not needs_rerun(log, before, aux_snapshot(tex_path, worker.directory)):
+                    return CompileResult(True, log, passes)
+        except asyncio.TimeoutError:
+            self._counters[engine]["timeouts"] += 1
+            return CompileResult(False, log + f"\n{engine} timed out after {self.timeout} seconds.", passes)
+        finally:
+            if not worker.ready:
+                await self._spawn(worker, fmt)
+            self._collect(worker, output_dir)
+            await self._release(worker)
+
+    def formats_in_use(self) -> Set[str]:
+        """Formats the workers' waiting processes were started with, which must not be evicted."""
+        return {worker.fmt for workers in list(self._workers.values()) for worker in workers if worker.fmt}
+
+    def stats(self) -> Dict[str, Any]:
+        engines = {}
+        for engine, workers in self._workers.items():
+            counters = self._counters[engine]
+            busy = sum(worker.busy for worker in workers)
+            engines[engine] = {
+                "workers": len(workers),
+                "busy": busy,
+                "ready": sum(worker.ready and not worker.busy for worker in workers),
+                "queued": self._waiting[engine],
+                "utilization": busy / len(workers),
+                "jobs": int(counters["jobs"]),
+                "passes": int(counters["passes"]),
+                "warm_starts": int(counters["warm_starts"]),
+                "cold_starts": int(counters["cold_starts"]),
+                "rejected": int(counters["rejected"]),
+                "timeouts": int(counters["timeouts"]),
+                "limit_kills": int(counters["limit_kills"]),
+                "avg_queue_wait_ms": 1000 * counters["queue_wait_seconds"] / counters["queued"] if counters["queued"] else 0.0,
+            }
+        return {
+            "max_queue": self.max_queue,
+            "limits": {"cpu_seconds": self.cpu_seconds, "memory_mb": self.memory_mb, "file_mb": self.file_mb, "timeout_seconds": self.timeout},
+            "engines": engines,
+        }
@@ -216,6 +216,7 @@ export default function IndexPage() {
                 formData.append('markdown_str', markdownContent);
                 formData.append('enhanced_data_json', JSON.stringify(enhancedData || {}));
                 formData.append('template_name', selectedTemplate);
+                formData.append('response_format', 'base64');
 
                 const response = await fetch('http://localhost:8000/api/generate-enhanced-latex', {
                     method: 'POST',
@@ -0,0 +1,38 @@
+"""
+Checks that a planned personal_info splice covers every contact detail in the
+rendered templates, so regenerating only that section cannot leave stale
+details behind (as curve_cv's preamble header and tibault_resume's
+Personal\\Information section used to).
+"""
+
+import pytest
+
+from backend.latex_resume_generator.utils.incremental import splice_plan
+from backend.latex_resume_generator.utils.latex_renderer import LaTeXRenderer
+from backend.latex_resume_generator.utils.template_registry import TemplateRegistry
+
+PERSONAL_INFO = {
+    "name": "Casey Placeholder",
+    "email": "casey@example.org",
+    "phone": "555-0100",
+    "location": "Springfield",
+    "linkedin_url": "https://linkedin.com/in/casey-placeholder",
+}
+CONTACT_DETAILS = ("Casey", "casey@example.org", "555-0100", "Springfield", "casey-placeholder")
+
+registry = TemplateRegistry(auto_reload=False)
+renderer = LaTeXRenderer(registry)
+
+
+@pytest.mark.parametrize("template_name", [t.name for t in registry.list() if renderer.supports(t.name)])
+def test_personal_info_splice_covers_contact_details(template_name):
+    latex = renderer.render(template_name, {
+        "personal_info": PERSONAL_INFO, "summary": "Placeholder summary.", "experience": [], "education": [],
+        "skills": [{"category_name": "Languages", "skills": ["Python"]}],
+    })
+    plan = splice_plan(latex, ["personal_info"])
+    if plan is None:
+        pytest.skip("personal_info is regenerated with the whole document")
+    start, stop = plan["personal_info"]
+    outside = latex[:start] + latex[stop:]
+    assert [detail for detail in CONTACT_DETAILS if detail in outside] == []
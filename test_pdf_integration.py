@@ -6,6 +6,7 @@ Test script to verify PDF integration with the enhanced backend API
 import requests
 import os
 import json
+import base64
 from pathlib import Path
 
 # Configuration
@@ -47,26 +48,49 @@ def test_pdf_to_latex_pipeline():
     print(f"   - Enhanced data length: {len(parse_result['enhanced_json'])} chars")
     print(f"   - Markdown length: {len(parse_result['markdown_str'])} chars")
     
-    # Step 2: Generate LaTeX with different templates
+    # Step 2: Generate LaTeX with all templates in one concurrent batch
     templates = ['jakes_resume', 'deedy_resume', 'curve_cv', 'tibault_resume']
+    print(f"\n🎨 Step 2: Generating LaTeX for templates: {', '.join(templates)}")
     
-    for template in templates:
-        print(f"\n🎨 Step 2: Generating LaTeX with template: {template}")
-        
-        data = {
-            'markdown_str': parse_result['markdown_str'],
-            'enhanced_data_json': parse_result['enhanced_json'],
-            'template_name': template
-        }
+    data = {
+        'markdown_str': parse_result['markdown_str'],
+        'enhanced_data_json': parse_result['enhanced_json'],
+        'templates': ','.join(templates),
+        'response_format': 'base64'
+    }
+    
+    response = requests.post(
+        f"{API_BASE_URL}/api/generate-batch",
+        data=data,
+        stream=True
+    )
+    
+    if response.status_code != 200:
+        print(f"❌ Failed to start batch generation: {response.status_code}")
+        print(response.json())
+        return
+    
+    # Results arrive as Server-Sent Events, one 'result' event per template
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+            continue
+        if not line.startswith("data: "):
+            continue
+        payload = json.loads(line[len("data: "):])
         
-        response = requests.post(
-            f"{API_BASE_URL}/api/generate-enhanced-latex",
-            data=data
-        )
+        if event == "done":
+            print(f"\n⏱️  Batch finished in {payload['elapsed_seconds']}s: "
+                  f"{payload['succeeded']} succeeded, {payload['failed']} failed")
+            continue
+        if event != "result":
+            continue
         
-        if response.status_code != 200:
-            print(f"❌ Failed to generate LaTeX for {template}: {response.status_code}")
-            error_detail = response.json().get('detail', {})
+        template = payload['template_name']
+        if payload['status'] != 'ok':
+            print(f"❌ Failed to generate LaTeX for {template}: {payload['status_code']}")
+            error_detail = payload.get('detail', {})
             if isinstance(error_detail, dict):
                 print(f"   Error: {error_detail.get('message', 'Unknown error')}")
                 if 'log' in error_detail:
@@ -75,8 +99,8 @@ def test_pdf_to_latex_pipeline():
                 print(f"   Error: {error_detail}")
             continue
         
-        latex_result = response.json()
-        print(f"✅ LaTeX generated for {template}")
+        latex_result = payload
+        print(f"✅ LaTeX generated for {template} in {payload['elapsed_seconds']}s")
         print(f"   - LaTeX length: {len(latex_result['latex_str'])} chars")
         print(f"   - PDF size: {len(latex_result['pdf_b64']) * 3 / 4 / 1024:.1f} KB (approx)")
         
@@ -85,7 +109,6 @@ def test_pdf_to_latex_pipeline():
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Decode and save PDF
-        import base64
         pdf_bytes = base64.b64decode(latex_result['pdf_b64'])
         pdf_path = output_dir / "resume.pdf"
         with open(pdf_path, 'wb') as f: